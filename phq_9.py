@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List
 from textwrap import dedent
 
@@ -13,14 +13,115 @@ import platform, shutil  # ← ORCA 자동탐지용
 
 import streamlit.components.v1 as components  # ← 창 닫기용
 
+from phq_core import (
+    PHQ9,
+    SEVERITY_SEGMENTS,
+    TS_FORMAT,
+    InvalidResultToken,
+    decode_result,
+    encode_result,
+    policy_total,
+    invite_pseudonym,
+)
+from phq_instruments import CompiledInstrument, available_instruments, load_instrument
+from phq_alerts import pipeline_from_env, safety_event
+from phq_history import Administration, fetch_history
+from phq_irt import eap_for
+from phq_norms import load_norms, lookup
+from phq_store import connect, make_record, writer_from_env
+from phq_report import (
+    APP_CSS,
+    BRAND,
+    INK,
+    SUBTLE,
+    build_domain_section_html,
+    build_guidance_section_html,
+    build_norm_profile_html,
+    build_summary_section_html,
+    build_theta_html,
+    build_unanswered_html,
+    fragments,
+    instrument_of,
+    needs_safety_block,
+)
+
+RESULT_PARAM = "r"      # 결과 토큰 쿼리 파라미터
+INSTRUMENT_PARAM = "i"  # 실시할 검사 (instruments/*.json, 기본 phq9)
+MODE_PARAM = "mode"     # "adaptive": PHQ-2 선별 문항 먼저 실시
+RESPONDENT_PARAM = "rid"  # 기관이 발급한 서명된 응답자 초대 값 (가명을 결과 토큰에 담아 이력을 잇는다)
+
+# 적응형 실시: 문항 1·2(PHQ-2)가 양성 기준 이상일 때만 나머지 7문항을 연다.
+PHQ2 = load_instrument("phq2")
+PHQ2_POSITIVE_CUT = PHQ2.band_cuts[0]   # 3점
+
+
+def _current_instrument() -> CompiledInstrument:
+    instrument_id = st.query_params.get(INSTRUMENT_PARAM, PHQ9.id)
+    return load_instrument(instrument_id) if instrument_id in available_instruments() else PHQ9
+
+
+def _adaptive_enabled() -> bool:
+    mode = st.query_params.get(MODE_PARAM) or os.environ.get("PHQ_SURVEY_MODE", "")
+    return mode == "adaptive"
+
+
+@st.cache_resource
+def _result_writer():
+    """PHQ_STORE_PATH가 설정된 배포에서만 결과 저장 스레드 (프로세스당 1개)"""
+    return writer_from_env()
+
+
+@st.cache_resource
+def _alert_pipeline():
+    """PHQ_ALERT_WEBHOOK이 설정된 배포에서만 안전 문항 알림 배달 스레드 (프로세스당 1개)"""
+    return pipeline_from_env()
+
+
+STORE_ENABLED = _result_writer() is not None
+STORE_CHIP = "결과 기관 저장" if STORE_ENABLED else "응답 저장 없음"
+STORE_FAQ = (
+    "이 배포에서는 제출한 점수와 검사 시각이 기관 데이터베이스에 기록됩니다. 이름 등 신원 정보는 받지 않으며, "
+    "결과는 서명된 결과 링크(URL)로도 다시 확인할 수 있습니다."
+    if STORE_ENABLED
+    else "앱은 응답을 저장하지 않으며, 결과는 서명된 결과 링크(URL)에만 담겨 해당 링크로 다시 확인할 수 있습니다."
+)
+
+
+def _complete(scores: List[int], missing: List[bool], functional: str | None, inst: CompiledInstrument) -> None:
+    """결과 토큰을 쿼리에 싣고 결과 페이지로 이동. 저장/알림은 큐에만 넣는다(대기 없음)."""
+    when = datetime.now()
+    writer = _result_writer()
+    respondent = _respondent() if writer is not None else None
+    token = encode_result(scores, missing, functional, when, inst, respondent=respondent)
+    st.query_params[RESULT_PARAM] = token
+    if writer is not None:
+        # 저장 스레드가 멈췄거나 재시도 중·큐 초과면 결과 페이지에서 링크 보관을 안내한다.
+        queued = writer.submit(make_record(scores, missing, functional, when, inst, respondent))
+        st.session_state.store_unhealthy = not (queued and writer.healthy())
+    alerts = _alert_pipeline()
+    if alerts is not None:
+        total = policy_total(sum(s for s, m in zip(scores, missing) if not m), sum(missing), inst)
+        event = safety_event(scores, total, when.isoformat(timespec="minutes"), inst, token)
+        if event is not None:
+            alerts.enqueue(event)
+    st.session_state.page = "result"
+
+
+def _respondent() -> str | None:
+    """?rid= 초대 값(phq_history.py invite로 발급)의 서명을 확인한 응답자 가명. 없거나 틀리면 None"""
+    invite = st.query_params.get(RESPONDENT_PARAM, "")
+    return invite_pseudonym(invite) if invite else None
+
+
 def _reset_state(target_page: str = "landing") -> None:
     """앱 상태 초기화 후 지정한 페이지로 이동"""
     st.session_state.answers = {}
     st.session_state.functional = None
-    st.session_state.summary = None
+    st.query_params.pop(RESULT_PARAM, None)
     for i in range(1, 10):
         st.session_state.pop(f"q{i}", None)
     st.session_state.pop("functional-impact", None)
+    st.session_state.pop("adaptive_stage", None)
     st.session_state.page = target_page
 
 
@@ -48,710 +149,9 @@ def _init_orca():
 
 _ORCA_PATH = _init_orca()
 
-# 색상 토큰 (라이트 테마 기본값 – CSS 변수로 재정의)
-INK     = "#0F172A"   # primary text (dark navy)
-SUBTLE  = "#475569"   # secondary text (slate)
-CARD_BG = "#FFFFFF"   # cards are clean white
-APP_BG  = "#F6F8FB"   # off-white app background
-BORDER  = "#E2E8F0"   # subtle border
-BRAND   = "#2563EB"   # keep as-is (brand blue)
-ACCENT  = "#DC2626"   # keep as-is (danger)
-
 # ──────────────────────────────────────────────────────────────────────────────
 # 전역 스타일
-st.markdown(f"""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&family=Noto+Sans+KR:wght@400;500;700;900&display=swap');
-
-:root {{
-  --bg: #F6F8FB;
-  --card: #FFFFFF;
-  --ink: #0F172A;
-  --subtle: #334155;
-  --muted: #475569;
-  --border: #E2E8F0;
-  --brand: #2563EB;
-  --accent: #DC2626;
-  --soft: #F8FAFC;
-  --shell-bg: rgba(255,255,255,0.98);
-  --inner-card: #FFFFFF;
-  --chip-bg: #FFFFFF;
-  --chip-border: #CBD5E1;
-  --chip-text: #0F172A;
-}}
-
-[data-testid="stAppViewContainer"] {{
-  color-scheme: light !important;
-  background: var(--bg) !important;
-}}
-
-html, body {{
-  color-scheme: light !important;
-  background: var(--bg);
-  color: var(--ink);
-  font-family: "Inter","Noto Sans KR",system-ui,-apple-system,Segoe UI,Roboto,Apple SD Gothic Neo,Helvetica,Arial,sans-serif;
-  -webkit-font-smoothing: antialiased;
-  text-rendering: optimizeLegibility;
-}}
-
-body, p, div, span, li, button, label {{
-  font-family: "Inter","Noto Sans KR",system-ui,-apple-system,Segoe UI,Roboto,Apple SD Gothic Neo,Helvetica,Arial,sans-serif !important;
-}}
-
-[data-testid="block-container"] {{
-  max-width: 1100px;
-  padding: 0 1.5rem 3rem;
-  margin: 0 auto;
-}}
-
-.hero-section {{
-  max-width: 1120px;
-  margin: 24px auto 18px;
-  background: var(--card);
-  border: 1px solid var(--border);
-  border-radius: 32px;
-  padding: 48px 56px;
-  box-shadow: 0 12px 28px rgba(15, 23, 42, 0.08);
-}}
-
-.hero-badge {{
-  display: inline-flex;
-  padding: 6px 14px;
-  border-radius: 999px;
-  background: rgba(37,99,235,0.12);
-  color: var(--brand);
-  font-weight: 700;
-  font-size: 12px;
-  border: 1px solid rgba(37,99,235,0.25);
-  width: fit-content;
-}}
-
-.hero-title {{
-  font-size: 2.2rem;
-  font-weight: 900;
-  letter-spacing: -0.6px;
-  margin: 14px 0 10px;
-  line-height: 1.2;
-}}
-
-.hero-subtitle {{
-  font-size: 1.05rem;
-  color: var(--subtle);
-  line-height: 1.6;
-  margin-bottom: 18px;
-}}
-
-.meta-chips {{
-  display: flex;
-  flex-wrap: wrap;
-  gap: 10px;
-}}
-
-.meta-chip {{
-  padding: 6px 12px;
-  border-radius: 999px;
-  background: var(--soft);
-  border: 1px solid var(--border);
-  font-size: 0.85rem;
-  font-weight: 600;
-  color: var(--ink);
-}}
-
-.section {{
-  max-width: 960px;
-  margin: 22px auto 16px;
-}}
-
-.survey-shell {{
-  max-width: 960px;
-  margin: 0 auto;
-  padding: 0 14px;
-}}
-
-.survey-shell div[data-testid="stVerticalBlock"] {{
-  max-width: 960px;
-  margin: 0 auto;
-}}
-
-.survey-shell div[data-testid="stButton"] {{
-  max-width: 960px;
-  margin: 18px auto 0;
-}}
-
-.section-title {{
-  font-size: 1.12rem;
-  font-weight: 800;
-  letter-spacing: -0.3px;
-  margin-bottom: 12px;
-}}
-
-.section-card {{
-  background: var(--card);
-  border: 1px solid var(--border);
-  border-radius: 24px;
-  padding: 26px 30px;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-}}
-
-.q-card {{
-  background: #fff;
-  border: 1px solid var(--border);
-  border-radius: 18px;
-  padding: 18px 20px;
-  box-shadow: 0 10px 24px rgba(15,23,42,0.08);
-  margin: 0 auto 14px;
-  width: 100%;
-}}
-
-.q-no {{
-  font-size: 12px;
-  font-weight: 800;
-  color: var(--brand);
-}}
-
-.q-text {{
-  font-size: 1.02rem;
-  font-weight: 700;
-  color: var(--ink);
-  margin-top: 6px;
-  line-height: 1.5;
-}}
-
-.feature-grid {{
-  display: grid;
-  grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
-  gap: 18px;
-}}
-
-.feature-card {{
-  background: var(--card);
-  border: 1px solid var(--border);
-  border-radius: 20px;
-  padding: 22px 24px;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-}}
-
-.feature-card h4 {{
-  margin: 0 0 8px;
-  font-size: 1rem;
-  font-weight: 800;
-}}
-
-.feature-card p {{
-  margin: 0;
-  color: var(--subtle);
-  line-height: 1.6;
-}}
-
-.stepper {{
-  background: var(--soft);
-  border: 1px solid var(--border);
-  border-radius: 24px;
-  padding: 22px 24px;
-}}
-
-.steps {{
-  display: grid;
-  grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-  gap: 16px;
-}}
-
-.step-card {{
-  background: var(--card);
-  border: 1px solid var(--border);
-  border-radius: 18px;
-  padding: 18px 20px;
-  box-shadow: 0 8px 20px rgba(15, 23, 42, 0.06);
-}}
-
-.step-index {{
-  font-size: 0.75rem;
-  font-weight: 800;
-  color: var(--brand);
-  letter-spacing: 0.8px;
-  text-transform: uppercase;
-}}
-
-.faq-item {{
-  background: var(--card);
-  border: 1px solid var(--border);
-  border-radius: 18px;
-  padding: 18px 20px;
-  box-shadow: 0 8px 20px rgba(15, 23, 42, 0.05);
-  margin-bottom: 12px;
-}}
-
-.notice-card {{
-  background: #FFFFFF;
-  border: 1px solid #F1C28E;
-  border-radius: 20px;
-  padding: 20px 22px;
-  color: #7C2D12;
-  box-shadow: 0 8px 20px rgba(15, 23, 42, 0.06);
-}}
-
-.cta-row {{
-  display: flex;
-  flex-wrap: wrap;
-  gap: 12px;
-  align-items: center;
-}}
-
-.cta-row .nav-chip {{
-  display: inline-flex;
-  padding: 8px 14px;
-  border-radius: 999px;
-  border: 1px solid var(--border);
-  background: var(--card);
-  color: var(--ink);
-  font-weight: 600;
-  text-decoration: none;
-  font-size: 0.9rem;
-}}
-
-.progress-track {{
-  width: 100%;
-  height: 10px;
-  background: rgba(226,232,240,0.9);
-  border-radius: 999px;
-  overflow: hidden;
-  margin: 10px 0 8px;
-}}
-
-.progress-fill {{
-  height: 100%;
-  background: var(--brand);
-  border-radius: 999px;
-}}
-
-.section-heading {{
-  font-size: 1.08rem;
-  font-weight: 800;
-  letter-spacing: -0.3px;
-  margin-bottom: 4px;
-}}
-
-.instruction-list {{
-  margin: 14px 0 0;
-  padding-left: 20px;
-  line-height: 1.6;
-  color: var(--ink);
-}}
-
-.instruction-list li {{
-  margin-bottom: 8px;
-}}
-
-.small-muted {{
-  color: var(--muted) !important;
-  font-size: 0.92rem;
-  letter-spacing: -0.1px;
-}}
-
-.report-shell {{
-  background: var(--shell-bg);
-  border: 1px solid var(--border);
-  border-radius: 32px;
-  padding: 32px;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-}}
-
-.report-shell.compact {{
-  padding: 24px 28px;
-}}
-
-.report-header {{
-  display: flex;
-  justify-content: space-between;
-  align-items: flex-end;
-  gap: 12px;
-  flex-wrap: wrap;
-  margin-bottom: 24px;
-}}
-
-.summary-layout {{
-  display: grid;
-  grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-  gap: 28px;
-  align-items: stretch;
-  margin-top: 28px;
-}}
-
-.report-card {{
-  background: var(--inner-card);
-  border: 1px solid var(--border);
-  border-radius: 20px;
-  padding: 24px;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-}}
-
-.gauge-card {{
-  background: var(--inner-card);
-  border: 1px solid var(--border);
-  border-radius: 24px;
-  padding: 32px 24px 36px;
-  text-align: center;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-  display: flex;
-  flex-direction: column;
-  gap: 12px;
-}}
-
-.gauge-circle {{
-  width: 220px;
-  height: 220px;
-  border-radius: 50%;
-  margin: 0 auto 10px;
-  position: relative;
-  display: flex;
-  align-items: center;
-  justify-content: center;
-  box-shadow: inset 0 1px 2px rgba(15, 23, 42, 0.06);
-}}
-
-.gauge-circle::after {{
-  content: "";
-  position: absolute;
-  inset: 24px;
-  border-radius: 50%;
-  background: var(--card);
-  box-shadow: inset 0 1px 2px rgba(15, 23, 42, 0.06);
-}}
-
-.gauge-inner {{
-  position: relative;
-  z-index: 2;
-  display: flex;
-  flex-direction: column;
-  align-items: center;
-  gap: 4px;
-}}
-
-.gauge-number {{
-  font-size: 3.2rem;
-  font-weight: 900;
-  line-height: 1;
-  color: var(--ink);
-}}
-
-.gauge-denom {{
-  font-size: 1rem;
-  font-weight: 700;
-  color: var(--subtle);
-}}
-
-.gauge-severity {{
-  display: inline-flex;
-  padding: 6px 20px;
-  border-radius: 999px;
-  font-weight: 800;
-  border: 1.5px solid currentColor;
-  font-size: 1rem;
-}}
-
-.metric-label {{
-  font-size: 0.82rem;
-  font-weight: 700;
-  letter-spacing: 1.2px;
-  color: var(--subtle);
-  text-transform: uppercase;
-}}
-
-.narrative-card {{
-  background: var(--inner-card);
-  border: 1px solid var(--border);
-  border-radius: 24px;
-  padding: 28px 30px;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-  display: flex;
-  flex-direction: column;
-  gap: 16px;
-}}
-
-.narrative-title {{
-  font-weight: 800;
-  font-size: 1rem;
-}}
-
-.functional-highlight {{
-  border-top: 1px solid var(--border);
-  padding-top: 16px;
-}}
-
-.functional-title {{
-  font-size: 0.92rem;
-  color: var(--subtle);
-  font-weight: 700;
-  margin-bottom: 6px;
-}}
-
-.functional-value {{
-  font-size: 1.05rem;
-}}
-
-.report-shell p {{
-  line-height: 1.65;
-  margin: 0 0 12px;
-}}
-
-.functional-divider {{
-  height: 1px;
-  width: 100%;
-  max-width: 960px;
-  background: var(--border);
-  margin: 10px auto 18px;
-}}
-
-.severity-legend {{
-  display: flex;
-  flex-wrap: wrap;
-  gap: 12px;
-  margin-top: 18px;
-}}
-
-.legend-chip {{
-  display: flex;
-  flex-direction: column;
-  padding: 10px 14px;
-  border-radius: 14px;
-  border: 1px solid var(--border);
-  background: var(--inner-card);
-  min-width: 140px;
-  box-shadow: inset 0 1px 2px rgba(15, 23, 42, 0.06);
-}}
-
-.legend-chip strong {{
-  font-size: 0.95rem;
-}}
-
-.legend-chip small {{
-  color: var(--subtle);
-  font-size: 0.8rem;
-}}
-
-.domain-panel {{
-  border: 1px solid var(--border);
-  border-radius: 24px;
-  padding: 24px 28px;
-  background: var(--inner-card);
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-}}
-
-.domain-profile {{
-  display: flex;
-  flex-direction: column;
-  gap: 22px;
-}}
-
-.domain-note {{
-  margin-top: 14px;
-  padding-top: 12px;
-  border-top: 1px solid rgba(148,163,184,0.3);
-  font-size: 0.82rem;
-  color: var(--subtle);
-  line-height: 1.45;
-}}
-
-.domain-row {{
-  display: grid;
-  grid-template-columns: 1.4fr 2.5fr 0.5fr;
-  gap: 18px;
-  align-items: center;
-}}
-
-.domain-title {{
-  font-weight: 700;
-  font-size: 1rem;
-}}
-
-.domain-desc {{
-  font-size: 0.85rem;
-  color: var(--subtle);
-  margin-top: 4px;
-}}
-
-.domain-bar {{
-  position: relative;
-  height: 16px;
-  background: rgba(226,232,240,0.8);
-  border-radius: 999px;
-  overflow: hidden;
-  border: 1px solid rgba(203,213,225,0.9);
-}}
-
-.domain-fill {{
-  position: absolute;
-  top: 0;
-  left: 0;
-  bottom: 0;
-  border-radius: 999px;
-  background: var(--brand);
-  box-shadow: inset 0 -2px 0 rgba(255,255,255,0.35);
-}}
-
-.domain-score {{
-  justify-self: end;
-  font-weight: 700;
-}}
-
-.warn {{
-  background: #FFF7ED;
-  border: 1px solid #FDBA74;
-  color: #7C2D12;
-  border-radius: 18px;
-  padding: 16px 20px;
-  max-width: 960px;
-  margin: 18px auto 0;
-  font-weight: 600;
-}}
-
-.safety {{
-  background: #FFF1F2;
-  border: 2px solid #FDA4AF;
-  color: var(--ink);
-  border-radius: 22px;
-  padding: 24px 28px;
-  max-width: 960px;
-  margin: 24px auto 0;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-}}
-
-.safety .section-heading {{
-  color: var(--accent);
-}}
-
-.footer-note {{
-  color: var(--subtle);
-  font-size: 12px;
-  max-width: 960px;
-  margin: 24px auto 0;
-  line-height: 1.5;
-  text-align: center;
-}}
-
-div[data-testid="stPlotlyChart"] {{
-  max-width: 960px;
-  margin: 12px auto 18px;
-  background: #FFFFFF;
-  border: 1px solid var(--border);
-  border-radius: 26px;
-  padding: 18px 18px 6px;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
-}}
-
-div[data-testid="stPlotlyChart"] > div > div {{
-  width: 100% !important;
-}}
-
-[data-testid="stToolbar"], #MainMenu, header, footer {{
-  display: none !important;
-}}
-
-/* ───── 라디오 칩 ───── */
-.q-card div[data-testid="stRadio"] {{
-  margin-top: 12px;
-}}
-
-div[data-testid="stRadio"] > div[role="radiogroup"] {{
-  display: flex;
-  gap: 10px;
-  flex-wrap: wrap;
-}}
-
-div[data-testid="stRadio"] input[type="radio"] {{
-  position: absolute;
-  opacity: 0;
-  pointer-events: none;
-}}
-
-div[data-testid="stRadio"] label {{
-  border: 1px solid #CBD5E1;
-  border-radius: 999px;
-  padding: 10px 18px;
-  background: #fff;
-  font-weight: 700;
-  cursor: pointer;
-  display: inline-flex;
-  align-items: center;
-  gap: 8px;
-  transition: all 0.15s ease;
-}}
-
-div[data-testid="stRadio"] label:hover {{
-  border-color: var(--brand);
-  box-shadow: 0 6px 14px rgba(37, 99, 235, 0.18);
-}}
-
-div[data-testid="stRadio"] label.chip-checked {{
-  background: rgba(37,99,235,0.10);
-  border-color: var(--brand);
-}}
-
-/* 버튼 */
-.stButton {{
-  margin: 0 0 14px;
-}}
-
-.stButton > button {{
-  width: 100%;
-}}
-
-.stButton > button[data-testid="baseButton-primary"],
-.stButton > button[kind="primary"] {{
-  background: var(--brand) !important;
-  color: #fff !important;
-  border: 1.5px solid var(--brand) !important;
-  border-radius: 12px !important;
-  font-weight: 800 !important;
-  letter-spacing: -0.2px;
-  min-height: 48px;
-  box-shadow: 0 12px 24px rgba(37,99,235,0.28) !important;
-}}
-
-.stButton > button:not([data-testid="baseButton-primary"]) {{
-  background: var(--inner-card) !important;
-  color: var(--brand) !important;
-  border: 1.5px solid var(--brand) !important;
-  border-radius: 12px !important;
-  font-weight: 800 !important;
-  min-height: 48px;
-  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08) !important;
-}}
-
-button:focus-visible {{
-  outline: 3px solid rgba(37, 99, 235, 0.35);
-  outline-offset: 2px;
-}}
-
-@media (max-width: 640px) {{
-  [data-testid="block-container"] {{
-    padding: 0 1rem 2rem;
-  }}
-  .hero-section {{
-    padding: 28px 24px;
-  }}
-  .hero-title {{
-    font-size: 1.7rem;
-  }}
-  .section {{
-    margin: 18px auto 12px;
-  }}
-  .report-shell {{
-    padding: 24px;
-  }}
-  .gauge-circle {{
-    width: 180px;
-    height: 180px;
-  }}
-  .domain-row {{
-    grid-template-columns: 1fr;
-  }}
-  .domain-score {{
-    justify-self: start;
-  }}
-}}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>\n{APP_CSS}</style>", unsafe_allow_html=True)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 상태 관리
@@ -761,86 +161,7 @@ if "answers" not in st.session_state:
     st.session_state.answers: Dict[int, str] = {}
 if "functional" not in st.session_state:
     st.session_state.functional: str | None = None
-if "summary" not in st.session_state:
-    st.session_state.summary = None  # (total, sev, functional, scores, ts, unanswered)
-
-# ──────────────────────────────────────────────────────────────────────────────
-# 문항/선택지
-QUESTIONS = [
-    {"no":1,"ko":"일상적인 활동(예: 취미나 일상 일과 등)에 흥미나 즐거움을 거의 느끼지 못한다.","domain":"흥미/즐거움 상실"},
-    {"no":2,"ko":"기분이 가라앉거나, 우울하거나, 희망이 없다고 느낀다.","domain":"우울한 기분"},
-    {"no":3,"ko":"잠들기 어렵거나 자주 깨는 등 수면에 문제가 있었거나, 반대로 너무 많이 잠을 잔다.","domain":"수면 문제"},
-    {"no":4,"ko":"평소보다 피곤함을 더 자주 느꼈거나, 기운이 거의 없다.","domain":"피로/에너지 부족"},
-    {"no":5,"ko":"식욕이 줄었거나 반대로 평소보다 더 많이 먹는다.","domain":"식욕 변화"},
-    {"no":6,"ko":"자신을 부정적으로 느끼거나, 스스로 실패자라고 생각한다.","domain":"죄책감/무가치감"},
-    {"no":7,"ko":"일상생활 및 같은 일에 집중하는 것이 어렵다.","domain":"집중력 저하"},
-    {"no":8,"ko":"다른 사람들이 눈치챌 정도로 매우 느리게 말하고 움직이거나, 반대로 평소보다 초조하고 안절부절 못한다.","domain":"느려짐/초조함"},
-    {"no":9,"ko":"죽는 게 낫겠다는 생각하거나, 어떤 식으로든 자신을 해치고 싶은 생각이 든다.","domain":"자살/자해 생각"},
-]
-LABELS = ["전혀 아님 (0)", "며칠 동안 (1)", "절반 이상 (2)", "거의 매일 (3)"]
-LABEL2SCORE = {LABELS[0]:0, LABELS[1]:1, LABELS[2]:2, LABELS[3]:3}
-
-# ──────────────────────────────────────────────────────────────────────────────
-# 유틸: 중증도 라벨
-def phq_severity(total: int) -> str:
-    return ("정상" if total<=4 else
-            "경미" if total<=9 else
-            "중등도" if total<=14 else
-            "중증" if total<=19 else
-            "심각")
-
-# ──────────────────────────────────────────────────────────────────────────────
-# PHQ-9 도메인 인덱스(1-based)
-COG_AFF = [1, 2, 6, 7, 9]   # 인지·정서(5문항)
-SOMATIC = [3, 4, 5, 8]      # 신체/생리(4문항)
-
-# ──────────────────────────────────────────────────────────────────────────────
-SEVERITY_SEGMENTS = [
-    {"label": "정상", "display": "0–4",  "start": 0,  "end": 5,  "color": "#CDEED6"},
-    {"label": "경미", "display": "5–9",  "start": 5,  "end": 10, "color": "#F8F1C7"},
-    {"label": "중등도", "display": "10–14","start": 10, "end": 15, "color": "#FFE0B2"},
-    {"label": "중증", "display": "15–19","start": 15, "end": 20, "color": "#FBC0A8"},
-    {"label": "심각", "display": "20–27","start": 20, "end": 27, "color": "#F6A6A6"},
-]
-
-SEVERITY_PILL = {
-    "정상": ("#DBEAFE", "#1E3A8A"),
-    "경미": ("#FEF3C7", "#92400E"),
-    "중등도": ("#FFE4E6", "#9F1239"),
-    "중증": ("#FED7AA", "#9A3412"),
-    "심각": ("#FECACA", "#7F1D1D"),
-}
-
-SEVERITY_ARC_COLOR = {
-    "정상": "#16a34a",
-    "경미": "#f59e0b",
-    "중등도": "#f97316",
-    "중증": "#f43f5e",
-    "심각": "#b91c1c",
-}
-
-SEVERITY_GUIDANCE = {
-    "정상": "현재 보고된 주관적 우울 증상은 정상 범위에 해당하며, 기본적인 자기 관리와 모니터링을 이어가시면 됩니다.",
-    "경미": "경미 수준의 우울감이 보고되었습니다. 생활리듬 조정과 상담 자원 안내 등 예방적 개입을 고려할 수 있습니다.",
-    "중등도": "임상적으로 의미 있는 중등도 수준으로, 정신건강 전문인의 평가와 치료적 개입을 권장합니다.",
-    "중증": "중증 수준의 우울 증상이 보고되어, 신속한 전문 평가와 적극적인 치료 계획 수립이 필요합니다.",
-    "심각": "심각 수준의 우울 증상이 보고되었습니다. 안전 평가를 포함한 즉각적인 전문 개입이 권고됩니다.",
-}
-
-DOMAIN_META = [
-    {
-        "name": "신체/생리 증상",
-        "desc": "(수면, 피곤함, 식욕, 정신운동 문제)",
-        "items": SOMATIC,
-        "max": 12,
-    },
-    {
-        "name": "인지/정서 증상",
-        "desc": "(흥미저하, 우울감, 죄책감, 집중력, 자살사고)",
-        "items": COG_AFF,
-        "max": 15,
-    },
-]
+# 결과는 세션이 아닌 URL의 서명된 토큰(?r=)에서 복원한다.
 
 
 def build_total_severity_bar(total: int) -> go.Figure:
@@ -938,57 +259,6 @@ def render_severity_legend():
     )
 
 
-def build_domain_profile_html(scores: List[int]) -> str:
-    if len(scores) < 9:
-        scores = (scores + [0] * 9)[:9]
-
-    rows: List[str] = []
-    for meta in DOMAIN_META:
-        score = sum(scores[i - 1] for i in meta["items"])
-        ratio = (score / meta["max"]) if meta["max"] else 0
-        rows.append(
-            dedent(
-                f"""
-                <div class="domain-row">
-                  <div>
-                    <div class="domain-title">{meta['name']}</div>
-                    <div class="domain-desc">{meta['desc']}</div>
-                  </div>
-                  <div class="domain-bar">
-                    <div class="domain-fill" style="width:{ratio*100:.1f}%"></div>
-                  </div>
-                  <div class="domain-score">{score} / {meta['max']}</div>
-                </div>
-                """
-            ).strip()
-        )
-    rows_html = "\n".join(rows)
-    note_html = (
-        '<div class="domain-note small-muted">※ 각 영역의 점수는 높을수록 해당 영역의 우울 관련 증상이 더 많이 보고되었음을 의미합니다.</div>'
-    )
-    return (
-        '<div class="domain-panel">\n'
-        '  <div class="domain-profile">\n'
-        f'{rows_html}\n'
-        '  </div>\n'
-        f'{note_html}\n'
-        '</div>'
-    )
-
-
-def compose_narrative(total: int, severity: str, functional: str | None, item9: int) -> str:
-    base = f"총점 {total}점(27점 만점)으로, [{severity}] 수준의 우울 증상이 보고되었습니다. {SEVERITY_GUIDANCE[severity]}"
-    functional_text = (
-        f" 응답자 보고에 따르면, 이러한 증상으로 인한 일·집안일·대인관계의 어려움은 ‘{functional}’ 수준입니다."
-        if functional else ""
-    )
-    safety_text = (
-        " 특히, 자해/자살 관련 사고(9번 문항)가 보고되어 이에 대한 즉각적인 관심과 평가가 매우 중요합니다."
-        if item9 > 0 else ""
-    )
-    return base + functional_text + safety_text
-
-
 # ──────────────────────────────────────────────────────────────────────────────
 # UI 헬퍼
 def scroll_to(anchor_id: str) -> None:
@@ -1007,7 +277,7 @@ def scroll_to(anchor_id: str) -> None:
     )
 
 
-def render_question_item(question: Dict[str, str | int]) -> None:
+def render_question_item(question: Dict[str, str | int], inst: CompiledInstrument = PHQ9) -> None:
     with st.container():
         st.markdown('<div class="q-card">', unsafe_allow_html=True)
         st.markdown(
@@ -1024,7 +294,7 @@ def render_question_item(question: Dict[str, str | int]) -> None:
         label = f"문항 {question['no']}: {question['ko']}"
         st.session_state.answers[question["no"]] = st.radio(
             label=label,
-            options=LABELS,
+            options=inst.labels,
             index=None,
             horizontal=True,
             key=f"q{question['no']}",
@@ -1033,7 +303,7 @@ def render_question_item(question: Dict[str, str | int]) -> None:
         st.markdown("</div>", unsafe_allow_html=True)
 
 
-def render_functional_block() -> None:
+def render_functional_block(inst: CompiledInstrument = PHQ9) -> None:
     st.markdown('<div class="functional-divider"></div>', unsafe_allow_html=True)
     with st.container():
         st.markdown('<div class="q-card">', unsafe_allow_html=True)
@@ -1057,7 +327,7 @@ def render_functional_block() -> None:
         )
         st.session_state.functional = st.radio(
             label,
-            options=["전혀 어렵지 않음", "어렵지 않음", "어려움", "매우 어려움"],
+            options=inst.functional_options,
             index=None,
             horizontal=True,
             key="functional-impact",
@@ -1179,11 +449,11 @@ def render_landing() -> None:
               </div>
               <div class="meta-chips">
                 <span class="meta-chip">소요 시간 2-3분</span>
-                <span class="meta-chip">응답 저장 없음</span>
+                <span class="meta-chip">{store_chip}</span>
                 <span class="meta-chip">성인/청소년 참고용</span>
               </div>
             </div>
-            """
+            """.format(store_chip=STORE_CHIP)
         ),
         unsafe_allow_html=True,
     )
@@ -1289,14 +559,14 @@ def render_landing() -> None:
               </div>
               <div class="faq-item">
                 <strong>응답이 저장되나요?</strong>
-                <p class="small-muted">앱은 응답을 저장하지 않으며, 결과는 현재 화면에서만 확인됩니다.</p>
+                <p class="small-muted">{store_faq}</p>
               </div>
               <div class="faq-item">
                 <strong>누가 사용할 수 있나요?</strong>
                 <p class="small-muted">성인/청소년 모두 참고할 수 있지만, 우려가 있다면 전문가와 상의하세요.</p>
               </div>
             </div>
-            """
+            """.format(store_faq=STORE_FAQ)
         ),
         unsafe_allow_html=True,
     )
@@ -1307,11 +577,23 @@ def render_landing() -> None:
 
 
 def render_survey() -> None:
-    answered_questions = sum(
-        1 for i in range(1, 10) if st.session_state.get(f"q{i}") is not None
+    inst = _current_instrument()
+    # 적응형 단계: "gate"(문항 1·2만) → 양성이면 "full"(나머지 문항 + 기능 손상)
+    stage = st.session_state.get("adaptive_stage", "gate") if inst is PHQ9 and _adaptive_enabled() else None
+    if stage == "gate":
+        questions = inst.questions[:PHQ2.n_items]
+    elif stage == "full":
+        questions = inst.questions[PHQ2.n_items:]
+    else:
+        questions = inst.questions
+    carried = PHQ2.n_items if stage == "full" else 0   # 선별 단계에서 이미 답한 문항 수
+
+    answered_questions = carried + sum(
+        1 for q in questions if st.session_state.get(f"q{q['no']}") is not None
     )
-    functional_answered = 1 if st.session_state.get("functional-impact") else 0
-    total_items = 10
+    has_functional = inst.functional_options is not None and stage != "gate"
+    functional_answered = 1 if has_functional and st.session_state.get("functional-impact") else 0
+    total_items = carried + len(questions) + (1 if has_functional else 0)
     answered_total = answered_questions + functional_answered
     progress = answered_total / total_items if total_items else 0
 
@@ -1350,11 +632,11 @@ def render_survey() -> None:
 
     st.markdown(
         dedent(
-            """
+            f"""
             <div class="section">
               <div class="section-card">
-                <div class="section-heading">PHQ-9 자기보고 검사</div>
-                <p class="small-muted">지난 2주 동안 경험한 증상 빈도를 0-3점 척도로 선택해 주세요.</p>
+                <div class="section-heading">{inst.name}</div>
+                <p class="small-muted">{inst.period} 동안 경험한 증상 빈도를 0-3점 척도로 선택해 주세요.</p>
               </div>
             </div>
             """
@@ -1379,15 +661,19 @@ def render_survey() -> None:
         unsafe_allow_html=True,
     )
 
+    if stage == "gate":
+        complete_target = "먼저 두 개의 선별 문항을"
+    else:
+        complete_target = "모든 문항과 기능 손상 질문을" if has_functional else "모든 문항을"
     st.markdown(
         dedent(
-            """
+            f"""
             <div class="section">
               <div class="section-card">
                 <div class="section-title">지시문</div>
                 <ul class="instruction-list">
-                  <li>각 문항에 대해 지난 2주 동안의 빈도를 전혀 아님(0) · 며칠 동안(1) · 절반 이상(2) · 거의 매일(3) 가운데 가장 가까운 값으로 선택합니다.</li>
-                  <li>모든 문항과 기능 손상 질문을 완료한 뒤 ‘결과 보기’를 누르면 즉시 결과를 확인할 수 있습니다.</li>
+                  <li>각 문항에 대해 {inst.period} 동안의 빈도를 전혀 아님(0) · 며칠 동안(1) · 절반 이상(2) · 거의 매일(3) 가운데 가장 가까운 값으로 선택합니다.</li>
+                  <li>{complete_target} 완료한 뒤 ‘결과 보기’를 누르면 즉시 결과를 확인할 수 있습니다.</li>
                 </ul>
               </div>
             </div>
@@ -1398,11 +684,11 @@ def render_survey() -> None:
 
     st.markdown(
         dedent(
-            """
+            f"""
             <div class="section">
               <div class="section-card">
-                <div class="section-title">질문지 (지난 2주)</div>
-                <div class="small-muted">표준 PHQ-9 · 모든 문항은 동일한 0-3점 척도를 사용합니다.</div>
+                <div class="section-title">질문지 ({inst.period})</div>
+                <div class="small-muted">표준 {inst.title} · 모든 문항은 동일한 0-3점 척도를 사용합니다.</div>
               </div>
             </div>
             """
@@ -1410,136 +696,82 @@ def render_survey() -> None:
         unsafe_allow_html=True,
     )
 
+    if stage == "full":
+        st.markdown(
+            '<div class="section"><div class="small-muted">선별 문항(1–2) 응답이 반영되었습니다. 나머지 문항에 응답해 주세요.</div></div>',
+            unsafe_allow_html=True,
+        )
+
     submitted = False
-    with st.form("phq_form"):
-        for q in QUESTIONS:
-            render_question_item(q)
-        render_functional_block()
-        submitted = st.form_submit_button("결과 보기", type="primary")
+    with st.form(f"phq_form_{stage}" if stage else "phq_form"):
+        for q in questions:
+            render_question_item(q, inst)
+        if has_functional:
+            render_functional_block(inst)
+        submitted = st.form_submit_button("다음" if stage == "gate" else "결과 보기", type="primary")
 
     st.markdown("</div>", unsafe_allow_html=True)
 
+    if submitted and stage == "gate":
+        gate = [st.session_state.answers.get(q["no"]) for q in questions]
+        if any(lab is None for lab in gate):
+            st.warning("선별 문항 두 개에 모두 응답해 주세요.")
+            return
+        gate_scores = [inst.label2score[lab] for lab in gate]
+        if sum(gate_scores) >= PHQ2_POSITIVE_CUT:
+            st.session_state.adaptive_stage = "full"
+        else:
+            # 음성 선별: 나머지 문항 없이 PHQ-2 결과로 바로 이동
+            _complete(gate_scores, [False] * PHQ2.n_items, None, PHQ2)
+        st.rerun()
+
     if submitted:
-        scores, unanswered = [], 0
-        for i in range(1, 10):
+        scores, missing = [], []
+        for i in range(1, inst.n_items + 1):
             lab = st.session_state.answers.get(i)
-            if lab is None:
-                unanswered += 1
-                scores.append(0)
-            else:
-                scores.append(LABEL2SCORE[lab])
-        total = sum(scores)
-        sev = phq_severity(total)
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M")
-        st.session_state.summary = (total, sev, st.session_state.functional, scores, ts, unanswered)
-        st.session_state.page = "result"
+            missing.append(lab is None)
+            scores.append(0 if lab is None else inst.label2score[lab])
+        functional = st.session_state.functional if has_functional else None
+        limit = inst.missing_policy.max_missing
+        if limit is not None and sum(missing) > limit:
+            st.warning(
+                f"미응답 문항이 {sum(missing)}개입니다. 결과를 계산하려면 미응답을 {limit}개 이하로 줄여 주세요."
+            )
+            return
+        _complete(scores, missing, functional, inst)
         st.rerun()
 
 
 def render_result() -> None:
-    if not st.session_state.summary:
+    token = st.query_params.get(RESULT_PARAM)
+    if not token:
         st.warning("먼저 설문을 완료해 주세요.")
         st.stop()
+    try:
+        summary = decode_result(token)
+    except InvalidResultToken:
+        st.warning("결과 링크가 올바르지 않거나 만료되었습니다. 검사를 다시 진행해 주세요.")
+        st.stop()
 
-    total, sev, functional, scores, ts, unanswered = st.session_state.summary
-    item9_score = scores[8] if len(scores) >= 9 else 0
-
-    narrative = compose_narrative(total, sev, functional, item9_score)
-    arc_color = SEVERITY_ARC_COLOR.get(sev, BRAND)
-    gauge_percent = (max(0, min(total, 27)) / 27) * 100
-    functional_value = functional if functional else "미응답"
-    st.markdown(
-        dedent(
-            f"""
-            <div class="section">
-              <div class="report-shell">
-                <div class="report-header">
-                  <div>
-                    <div class="section-heading">I. 종합 소견</div>
-                    <div class="small-muted">검사 일시: {ts}</div>
-                  </div>
-                </div>
-                <div class="summary-layout">
-                  <div class="gauge-card">
-                    <div class="metric-label">총점</div>
-                    <div class="gauge-circle" style="background: conic-gradient({arc_color} {gauge_percent:.2f}%, rgba(226,232,240,0.9) {gauge_percent:.2f}%, rgba(226,232,240,0.9) 100%);">
-                      <div class="gauge-inner">
-                        <div class="gauge-number">{total}</div>
-                        <div class="gauge-denom">/ 27</div>
-                      </div>
-                    </div>
-                    <div class="gauge-severity" style="color:{arc_color};">{sev}</div>
-                  </div>
-                  <div class="narrative-card">
-                    <div class="narrative-title">주요 소견</div>
-                    <p>{narrative}</p>
-                    <div class="functional-highlight">
-                      <div class="functional-title">일상 기능 손상 (10번 문항)</div>
-                      <div class="functional-value"><strong>{functional_value}</strong></div>
-                    </div>
-                  </div>
-                </div>
-              </div>
-            </div>
-            """
-        ),
-        unsafe_allow_html=True,
-    )
-
-    if unanswered > 0:
-        st.markdown(
-            f'<div class="warn">⚠️ 미응답 {unanswered}개 문항은 0점으로 계산되었습니다.</div>',
-            unsafe_allow_html=True,
-        )
+    inst = instrument_of(summary)
+    st.markdown(build_summary_section_html(summary), unsafe_allow_html=True)
+    if st.session_state.pop("store_unhealthy", False):
+        st.warning("기관 저장이 지연되고 있어 이 결과가 기록되지 않았을 수 있습니다. 결과 링크(URL)를 보관해 주세요.")
 
-    if item9_score > 0:
-        st.markdown(
-            dedent(
-                """
-                <div class="safety">
-                  <div class="section-heading">안전 안내 (문항 9 관련)</div>
-                  <div class="small-muted">자살·자해 생각이 있을 때 즉시 도움 받기</div>
-                  <div>한국: <b>1393 자살예방상담(24시간)</b>, <b>정신건강상담 1577-0199</b> · 긴급 시 <b>112/119</b>.</div>
-                </div>
-                """
-            ),
-            unsafe_allow_html=True,
-        )
+    if summary.unanswered > 0:
+        st.markdown(build_unanswered_html(summary.unanswered, summary.prorated), unsafe_allow_html=True)
+    irt = eap_for(summary.scores, [bool(summary.missing_mask >> i & 1) for i in range(inst.n_items)], inst)
+    if irt is not None:
+        st.markdown(build_theta_html(*irt), unsafe_allow_html=True)
 
-    domain_html = build_domain_profile_html(scores)
-    domain_section_html = dedent(
-        """
-        <div class="section">
-          <div class="report-shell">
-            <div class="section-heading" style="margin-bottom:12px;">II. 증상 영역별 프로파일</div>
-            {domain_panel}
-          </div>
-        </div>
-        """
-    ).strip().format(domain_panel=domain_html)
-    st.markdown(domain_section_html, unsafe_allow_html=True)
+    if needs_safety_block(summary):
+        st.markdown(fragments(inst).safety, unsafe_allow_html=True)
 
-    st.markdown(
-        dedent(
-            f"""
-            <div class="section">
-              <div class="report-shell">
-                <div class="section-heading">III. 다음 단계</div>
-                <div class="report-card">
-                  <div class="narrative-title">권장 안내</div>
-                  <p>{SEVERITY_GUIDANCE[sev]}</p>
-                  <ul class="instruction-list">
-                    <li>일상 리듬(수면, 식사, 활동)과 증상 변화를 기록해 보세요.</li>
-                    <li>신뢰할 수 있는 사람과 현재 상태를 공유하는 것도 도움이 됩니다.</li>
-                    <li>필요 시 정신건강 전문가와 상담을 예약해 보세요.</li>
-                  </ul>
-                </div>
-              </div>
-            </div>
-            """
-        ),
-        unsafe_allow_html=True,
-    )
+    if inst.domain_meta:
+        st.markdown(build_domain_section_html(summary.scores, inst), unsafe_allow_html=True)
+    render_norms(summary, inst)
+    render_history(summary, inst)
+    st.markdown(build_guidance_section_html(summary.sev, inst), unsafe_allow_html=True)
 
     cta_cols = st.columns([1, 1], gap="medium")
     with cta_cols[0]:
@@ -1551,27 +783,102 @@ def render_result() -> None:
             _reset_state("landing")
             st.rerun()
 
+    st.markdown(fragments(inst).footer, unsafe_allow_html=True)
+
+
+def build_history_chart(history: List[Administration], inst: CompiledInstrument) -> go.Figure:
+    """실시별 총점(심각도 구간 배경)과 영역 점수 추이"""
+    x = [datetime(1970, 1, 1) + timedelta(seconds=a.ts) for a in history]
+    fig = go.Figure()
+    for seg in inst.segments:
+        fig.add_hrect(y0=seg["start"], y1=seg["end"], fillcolor=seg["color"], opacity=0.18, line_width=0, layer="below")
+        fig.add_annotation(
+            x=1.0, xref="paper", y=(seg["start"] + seg["end"]) / 2, text=seg["label"],
+            showarrow=False, xanchor="left", font=dict(size=11, color=SUBTLE),
+        )
+    fig.add_trace(
+        go.Scatter(
+            x=x, y=[a.total for a in history], mode="lines+markers", name="총점",
+            line=dict(color=BRAND, width=3), hovertemplate="%{x|%Y-%m-%d} · %{y}점<extra></extra>",
+        )
+    )
+    for meta in inst.domain_meta:
+        fig.add_trace(
+            go.Scatter(
+                x=x, y=[a.domains[meta["key"]] for a in history], mode="lines+markers", name=meta["name"],
+                line=dict(width=1.5, dash="dot"),
+                hovertemplate=f"{meta['name']} · %{{y}} / {meta['max']}<extra></extra>",
+            )
+        )
+    fig.update_layout(
+        yaxis=dict(range=[0, inst.max_total], showgrid=False),
+        xaxis=dict(showgrid=False),
+        legend=dict(orientation="h", y=-0.2),
+        margin=dict(l=10, r=60, t=10, b=40),
+        height=320,
+        paper_bgcolor="#ffffff",
+        plot_bgcolor="#ffffff",
+        font=dict(color=INK, family="Inter, 'Noto Sans KR', Arial, sans-serif"),
+    )
+    return fig
+
+
+def render_history(summary, inst: CompiledInstrument) -> None:
+    """토큰에 서명된 응답자 가명이 있고 저장 모드일 때 같은 응답자의 이전 실시와 함께 추이를 보여 준다.
+
+    가명은 decode_result가 검증한 토큰에서만 읽는다. 현재 URL의 ?rid=는 보지 않는다.
+    """
+    writer = _result_writer()
+    if writer is None or summary.respondent is None:
+        return
+    if "history_conn" not in st.session_state:
+        st.session_state.history_conn = connect(writer.path)
+    history = fetch_history(st.session_state.history_conn, summary.respondent, inst)
+    # 방금 제출한 결과는 아직 저장 스레드 큐에 있을 수 있다 (토큰 시각은 분 단위).
+    when = datetime.strptime(summary.ts, TS_FORMAT)
+    minute = int((when - datetime(1970, 1, 1)).total_seconds()) // 60
+    if not any(a.ts // 60 == minute and a.total == summary.total for a in history):
+        domains = {key: sum(summary.scores[i] for i in idx) for key, idx in inst.domain_index}
+        history.append(Administration(minute * 60, summary.total, domains))
+        history.sort(key=lambda a: a.ts)
+    if len(history) < 2:
+        return
     st.markdown(
-        dedent(
-            """
-            <div class="footer-note">
-              PHQ-9는 공공 도메인(Pfizer 별도 허가 불필요).<br>
-              Kroenke, Spitzer, & Williams (2001) JGIM · Spitzer, Kroenke, & Williams (1999) JAMA.
-            </div>
-            """
-        ),
+        f'<div class="section"><div class="section-title">실시 이력</div>'
+        f'<div class="small-muted">같은 응답자 번호로 저장된 {len(history)}회의 {inst.title} 결과</div></div>',
         unsafe_allow_html=True,
     )
+    st.plotly_chart(build_history_chart(history, inst), use_container_width=True, config={"displayModeBar": False})
+
+
+def render_norms(summary, inst: CompiledInstrument) -> None:
+    """norms/<검사>.json이 있으면 총점·영역 점수의 규준 백분위/T점수 (배열 조회)"""
+    norms = load_norms(inst)
+    if norms is None:
+        return
+    st.markdown('<div class="section"><div class="section-title">규준 비교</div></div>', unsafe_allow_html=True)
+    group = norms.default
+    if len(norms.groups) > 1:
+        ids = list(norms.groups)
+        group = st.selectbox(
+            "비교 집단", ids, index=ids.index(norms.default), format_func=lambda g: norms.groups[g].label
+        )
+    scores = {"total": summary.total}
+    scores.update({key: sum(summary.scores[i] for i in idx) for key, idx in inst.domain_index})
+    rows = [tuple(r) for r in lookup(scores, inst, group)]
+    st.markdown(build_norm_profile_html(rows, norms.groups[group].label, inst), unsafe_allow_html=True)
+    if norms.source:
+        st.caption(norms.source)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 페이지 라우팅
-if st.session_state.page == "landing":
+# 페이지 라우팅 (결과 토큰이 있으면 세션 상태와 무관하게 결과 페이지)
+if RESULT_PARAM in st.query_params:
+    render_result()
+elif st.session_state.page == "landing":
     render_landing()
 elif st.session_state.page == "survey":
     render_survey()
-elif st.session_state.page == "result":
-    render_result()
 else:
     st.session_state.page = "landing"
     st.rerun()
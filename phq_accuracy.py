@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""선별 정확도 분석: 모든 절단점(총점 ≥ c 양성)의 민감도·특이도·PPV·NPV·Youden J·AUC
+
+    python phq_accuracy.py validation.csv --score total --reference dx
+    python phq_accuracy.py validation.parquet --bootstrap 2000 --workers 8 --drop-missing
+
+입력 행(총점, 기준 진단 0/1)은 한 번 읽으며 진단별 총점 히스토그램 두 개(각 0..최대 총점)에 더하기만
+한다. 이후 모든 계산은 이 두 배열에서 한다. 역누적합 한 번으로 절단점마다 TP/FN/FP/TN을 구하고,
+AUC는 Mann–Whitney 통계량(동점 ½)을 히스토그램으로 계산한다. 전체 비용은 O(n + 점수 범위)다.
+총점이나 진단이 비어 있는 행은 오류다(--drop-missing이면 빼고 건수를 알린다). 진단은 정확히 0/1이어야 한다.
+
+부트스트랩은 행 재표집과 같은 분포인 (진단 × 총점) 칸의 다항 재표집으로 한다. 반복 한 번이 O(점수 범위)라
+수천만 행에서도 반복 비용이 같다. 반복은 프로세스 풀 작업자에게 독립 시드로 나눈다.
+"""
+import argparse
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Tuple
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument
+
+METRICS = ("sensitivity", "specificity", "ppv", "npv", "youden")
+READ_BLOCK_BYTES = 64 << 20
+
+
+class ScoreCounts(NamedTuple):
+    positive: np.ndarray   # 기준 진단 양성의 총점별 건수 (int64)
+    negative: np.ndarray
+
+
+def present(values: np.ndarray) -> np.ndarray:
+    """값이 있는 행 (None·NaN이 아닌 행) bool 배열"""
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        return np.array([v is not None and v == v for v in arr], dtype=bool)
+    if arr.dtype.kind == "f":
+        return ~np.isnan(arr)
+    return np.ones(len(arr), dtype=bool)
+
+
+def _integers(values: np.ndarray, name: str) -> np.ndarray:
+    """정수 배열로 변환. 빈 값·정수가 아닌 값은 ValueError (NaN이 int로 바뀌거나 bool 참이 되지 않게)"""
+    arr = np.asarray(values)
+    missing = int(np.count_nonzero(~present(arr)))
+    if missing:
+        raise ValueError(f"{name}: {missing:,} missing values")
+    if arr.dtype.kind not in "biu":
+        arr = arr.astype(np.float64)
+        if (arr != np.round(arr)).any():
+            raise ValueError(f"{name}: non-integer values")
+    return arr.astype(np.int64)
+
+
+def count_scores(total: np.ndarray, reference: np.ndarray, max_total: int = PHQ9.max_total) -> ScoreCounts:
+    """총점·진단 배열 → 진단별 총점 히스토그램
+
+    빈 값, 범위 밖 총점, 0/1이 아닌 진단은 ValueError (빈 행은 호출하는 쪽에서 present()로 걸러 낸다).
+    """
+    total, ref = _integers(total, "total"), _integers(reference, "reference")
+    if len(total) != len(ref):
+        raise ValueError("total and reference lengths differ")
+    if len(total) and (total.min() < 0 or total.max() > max_total):
+        raise ValueError(f"total must be 0–{max_total}")
+    if not np.isin(ref, (0, 1)).all():
+        raise ValueError(f"reference must be 0/1, got {np.unique(ref[~np.isin(ref, (0, 1))])[:3].tolist()}")
+    ref = ref.astype(bool)
+    size = max_total + 1
+    return ScoreCounts(np.bincount(total[ref], minlength=size), np.bincount(total[~ref], minlength=size))
+
+
+def merge_counts(parts: Iterable[ScoreCounts]) -> ScoreCounts:
+    pos = neg = None
+    for p in parts:
+        pos = p.positive if pos is None else pos + p.positive
+        neg = p.negative if neg is None else neg + p.negative
+    return ScoreCounts(pos, neg)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+def cutoff_table(counts: ScoreCounts) -> Dict[str, np.ndarray]:
+    """절단점 0..최대 총점별 열. 양성 판정은 총점 ≥ cutoff
+
+    히스토그램이 (반복, 점수) 2차원이면 반복마다 한 행씩 같은 계산을 한다(부트스트랩).
+    """
+    pos, neg = counts.positive, counts.negative
+    tp = np.cumsum(pos[..., ::-1], axis=-1)[..., ::-1]   # 총점 ≥ c 인 진단 양성
+    fp = np.cumsum(neg[..., ::-1], axis=-1)[..., ::-1]
+    fn = pos.sum(axis=-1, keepdims=True) - tp
+    tn = neg.sum(axis=-1, keepdims=True) - fp
+    sens, spec = _ratio(tp, tp + fn), _ratio(tn, tn + fp)
+    return {
+        "cutoff": np.arange(pos.shape[-1]),
+        "tp": tp, "fp": fp, "tn": tn, "fn": fn,
+        "sensitivity": sens,
+        "specificity": spec,
+        "ppv": _ratio(tp, tp + fp),
+        "npv": _ratio(tn, tn + fn),
+        "youden": sens + spec - 1,
+    }
+
+
+def auc(counts: ScoreCounts) -> float | np.ndarray:
+    """P(양성 총점 > 음성 총점) + ½ P(같음). 2차원 히스토그램이면 반복별 배열"""
+    pos, neg = counts.positive.astype(np.float64), counts.negative.astype(np.float64)
+    neg_below = np.cumsum(neg, axis=-1) - neg
+    value = _ratio((pos * (neg_below + 0.5 * neg)).sum(axis=-1), pos.sum(axis=-1) * neg.sum(axis=-1))
+    return float(value) if value.ndim == 0 else value
+
+
+def _replicates(counts: ScoreCounts, n: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """부트스트랩 n회 → (n, 지표 수 × 절단점 + 1) 배열 (마지막 열 AUC)"""
+    rng = np.random.default_rng(seed)
+    joint = np.concatenate([counts.positive, counts.negative]).astype(np.float64)
+    size = len(counts.positive)
+    cells = rng.multinomial(int(joint.sum()), joint / joint.sum(), size=n)
+    sample = ScoreCounts(cells[:, :size], cells[:, size:])
+    table = cutoff_table(sample)
+    return np.concatenate([table[m] for m in METRICS] + [auc(sample)[:, None]], axis=1)
+
+
+def bootstrap(
+    counts: ScoreCounts,
+    replicates: int = 2000,
+    level: float = 0.95,
+    workers: int | None = None,
+    seed: int | None = None,
+) -> Dict[str, np.ndarray]:
+    """백분위 신뢰구간 {지표: (2, 절단점) 하한/상한, "auc": (2,)}. workers > 1이면 프로세스 풀"""
+    workers = max(1, min(workers or 1, replicates))
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    sizes = [replicates // workers + (k < replicates % workers) for k in range(workers)]
+    if workers == 1:
+        draws = _replicates(counts, sizes[0], seeds[0])
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            draws = np.concatenate(list(pool.map(_replicates, [counts] * workers, sizes, seeds)))
+    alpha = (1 - level) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 정의되지 않는 지표(예: 절단점 0의 NPV)는 NaN
+        lo, hi = np.nanquantile(draws, [alpha, 1 - alpha], axis=0)
+    size = len(counts.positive)
+    out = {m: np.stack([lo[k * size:(k + 1) * size], hi[k * size:(k + 1) * size]]) for k, m in enumerate(METRICS)}
+    out["auc"] = np.array([lo[-1], hi[-1]])
+    return out
+
+
+def _read_columns(path: str, score: str, reference: str) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """CSV/Parquet를 블록 단위로 읽어 (총점, 진단) 배열을 낸다 (전체를 메모리에 올리지 않음)."""
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    if Path(path).suffix == ".parquet":
+        batches = pq.ParquetFile(path).iter_batches(columns=[score, reference])
+    else:
+        batches = pacsv.open_csv(
+            path,
+            read_options=pacsv.ReadOptions(block_size=READ_BLOCK_BYTES),
+            convert_options=pacsv.ConvertOptions(include_columns=[score, reference]),
+        )
+    for batch in batches:
+        yield (
+            batch.column(score).to_numpy(zero_copy_only=False),
+            batch.column(reference).to_numpy(zero_copy_only=False),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="모든 절단점의 선별 정확도")
+    parser.add_argument("data", help="총점·기준 진단 열이 있는 CSV 또는 Parquet")
+    parser.add_argument("--score", default="total", help="총점 열 이름")
+    parser.add_argument("--reference", default="reference", help="기준 진단 열 이름 (0/1)")
+    parser.add_argument("--instrument", default=PHQ9.id)
+    parser.add_argument("--bootstrap", type=int, default=0, help="부트스트랩 반복 수 (0이면 신뢰구간 생략)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--drop-missing", action="store_true", help="총점·진단이 빈 행을 빼고 분석 (기본: 오류)")
+    args = parser.parse_args()
+
+    inst: CompiledInstrument = load_instrument(args.instrument)
+    parts, dropped = [], 0
+    try:
+        for t, r in _read_columns(args.data, args.score, args.reference):
+            if args.drop_missing:
+                keep = present(t) & present(r)
+                dropped += len(keep) - int(keep.sum())
+                t, r = t[keep], r[keep]
+            parts.append(count_scores(t, r, inst.max_total))
+    except ValueError as exc:
+        parser.error(f"{args.data}: {exc}")
+    counts = merge_counts(parts)
+    if counts.positive is None or not counts.positive.sum() + counts.negative.sum():
+        parser.error(f"no rows in {args.data}")
+    if dropped:
+        print(f"dropped {dropped:,} rows with a missing {args.score} or {args.reference}")
+    table = cutoff_table(counts)
+    ci = bootstrap(counts, args.bootstrap, workers=args.workers, seed=args.seed) if args.bootstrap else None
+    n_pos, n_neg = int(counts.positive.sum()), int(counts.negative.sum())
+    print(f"{inst.id}: {n_pos + n_neg:,} rows, {n_pos:,} reference-positive")
+    auc_text = f"AUC {auc(counts):.3f}"
+    if ci is not None:
+        auc_text += f" [{ci['auc'][0]:.3f}, {ci['auc'][1]:.3f}]"
+    print(auc_text)
+    best = int(np.nanargmax(table["youden"]))
+    print(f"{'cut':>4} {'sens':>6} {'spec':>6} {'ppv':>6} {'npv':>6} {'J':>6}")
+    for c in table["cutoff"]:
+        mark = "*" if c in inst.band_cuts else " "
+        mark += "<" if c == best else " "
+        row = " ".join(f"{table[m][c]:6.3f}" for m in METRICS)
+        if ci is not None:
+            lo, hi = ci["youden"][:, c]
+            row += f"  J [{lo:.3f}, {hi:.3f}]"
+        print(f"{c:>4} {row} {mark}")
+    print("* 현재 구간 경계, < Youden J 최대")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""안전 문항(PHQ-9 9번) 양성 결과 알림 파이프라인 (opt-in, 웹훅)
+
+    PHQ_ALERT_WEBHOOK=http://127.0.0.1:8599/alerts streamlit run phq_9.py
+    python phq_alerts.py stub --port 8599 --fail-rate 0.3     # 로컬 수신 스텁
+
+제출 경로의 enqueue()는 이벤트를 디스크 outbox(SQLite)에 바로 커밋하고 돌아간다(네트워크 대기 없음).
+배달 스레드는 outbox만 읽어
+  1) 배달 시각이 된 이벤트를 최대 BATCH_SIZE건씩 JSON 배열로 POST하고
+  2) 실패하면 지수 백오프(상한 MAX_BACKOFF초, 지터 포함)로 다시 시도한다.
+배달이 웹훅 응답을 기다리는 동안에도 새 알림은 이미 디스크에 있으므로 프로세스가 죽어도
+잃지 않고, outbox에 남은 이벤트는 재시작 후에도 이어서 배달한다. 재시도 때문에 같은 이벤트가
+두 번 갈 수 있으므로 수신 측은 event_id로 중복을 걸러야 한다.
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence
+
+from phq_instruments import CompiledInstrument
+
+BATCH_SIZE = 50
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 300.0
+REQUEST_TIMEOUT = 5.0
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    event_id   TEXT    PRIMARY KEY,
+    payload    TEXT    NOT NULL,
+    created    REAL    NOT NULL,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    next_try   REAL    NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_next_try ON outbox (next_try);
+"""
+
+
+def safety_event(
+    scores: Sequence[int], total: int, when_iso: str, inst: CompiledInstrument, token: str | None = None
+) -> Dict[str, object] | None:
+    """안전 문항 점수 > 0이면 알림 이벤트 dict, 아니면 None"""
+    if inst.safety_item is None or scores[inst.safety_item - 1] <= 0:
+        return None
+    return {
+        "event_id": uuid.uuid4().hex,
+        "type": "safety_item_positive",
+        "instrument": inst.id,
+        "item": inst.safety_item,
+        "item_score": scores[inst.safety_item - 1],
+        "total": total,
+        "severity": inst.severity(total),
+        "ts": when_iso,
+        "result_token": token,
+    }
+
+
+def backoff_delay(attempts: int) -> float:
+    """attempts번 실패한 뒤 다음 시도까지 대기(초): 1, 2, 4, … 상한 MAX_BACKOFF, ±20% 지터"""
+    delay = min(MAX_BACKOFF, BASE_BACKOFF * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def open_outbox(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(OUTBOX_SCHEMA)
+    return conn
+
+
+class AlertPipeline(threading.Thread):
+    def __init__(self, webhook_url: str, outbox_path: str, batch_size: int = BATCH_SIZE):
+        super().__init__(name="phq-alert-pipeline", daemon=True)
+        self.webhook_url = webhook_url
+        self.outbox_path = outbox_path
+        self.batch_size = batch_size
+        self._submit_conn = open_outbox(outbox_path)   # 제출 경로 전용 (배달 스레드는 자기 연결)
+        self._submit_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._lock = threading.Lock()
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.dropped = 0
+        self.pending = 0
+        self.last_error: str | None = None
+
+    # ── 제출 경로 ──────────────────────────────────────────────────────────────
+    def enqueue(self, event: Dict[str, object]) -> bool:
+        """outbox에 커밋하고 배달 스레드를 깨운다. 기록하지 못하면 False (dropped, last_error 집계)"""
+        now = time.time()
+        try:
+            with self._submit_lock, self._submit_conn:
+                self._submit_conn.execute(
+                    "INSERT OR IGNORE INTO outbox (event_id, payload, created, next_try) VALUES (?, ?, ?, ?)",
+                    (event["event_id"], json.dumps(event, ensure_ascii=False), now, now),
+                )
+        except sqlite3.Error as exc:
+            with self._lock:
+                self.dropped += 1
+                self.last_error = f"outbox: {exc}"
+            return False
+        self._wake.set()
+        return True
+
+    # ── 배달 스레드 ────────────────────────────────────────────────────────────
+    def run(self) -> None:
+        conn = open_outbox(self.outbox_path)
+        try:
+            while True:
+                try:
+                    self._wake.wait(self._wait(conn))
+                    self._wake.clear()  # 이 뒤에 커밋된 이벤트는 다음 wait를 바로 깨운다
+                    stopping = self._stopping
+                    self._deliver_due(conn, final=stopping)
+                except sqlite3.Error as exc:  # outbox가 잠깐 잠겨도 스레드는 계속 돈다
+                    with self._lock:
+                        self.last_error = f"outbox: {exc}"
+                    stopping = self._stopping
+                    time.sleep(BASE_BACKOFF)
+                if stopping:
+                    return
+        finally:
+            conn.close()
+
+    def _wait(self, conn: sqlite3.Connection) -> float | None:
+        row = conn.execute("SELECT min(next_try), count(*) FROM outbox").fetchone()
+        with self._lock:
+            self.pending = row[1]
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def _deliver_due(self, conn: sqlite3.Connection, final: bool = False) -> None:
+        while True:
+            rows = conn.execute(
+                "SELECT event_id, payload, attempts FROM outbox WHERE next_try <= ? ORDER BY next_try LIMIT ?",
+                (time.time(), self.batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            error = self._post([json.loads(p) for _, p, _ in rows])
+            with conn:
+                if error is None:
+                    conn.executemany("DELETE FROM outbox WHERE event_id = ?", [(r[0],) for r in rows])
+                else:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE outbox SET attempts = ?, next_try = ?, last_error = ? WHERE event_id = ?",
+                        [(a + 1, now + backoff_delay(a + 1), error, eid) for eid, _, a in rows],
+                    )
+            with self._lock:
+                if error is None:
+                    self.delivered += len(rows)
+                else:
+                    self.failed_attempts += 1
+                    self.last_error = error
+            if error is not None or final:
+                return  # 실패한 배치는 백오프 후에, 종료 중에는 outbox에 남겨 다음 실행에서
+
+    def _post(self, events: List[Dict[str, object]]) -> str | None:
+        body = json.dumps(events, ensure_ascii=False).encode("utf-8")
+        req = urllib.request.Request(
+            self.webhook_url, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
+                resp.read()
+            return None
+        except urllib.error.HTTPError as exc:
+            return f"HTTP {exc.code}"
+        except (urllib.error.URLError, OSError) as exc:
+            return str(getattr(exc, "reason", exc))
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """한 번 더 배달을 시도한 뒤 종료. 남은 이벤트는 outbox에 있어 다음 실행에서 배달한다."""
+        if self.is_alive():
+            self._stopping = True
+            self._wake.set()
+            self.join(timeout)
+        with self._submit_lock:
+            self._submit_conn.close()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "delivered": self.delivered,
+                "failed_attempts": self.failed_attempts,
+                "dropped": self.dropped,
+                "last_error": self.last_error,
+            }
+
+
+def pipeline_from_env() -> AlertPipeline | None:
+    """PHQ_ALERT_WEBHOOK이 있으면 배달 스레드를 시작해 돌려준다.
+
+    outbox 경로는 PHQ_ALERT_OUTBOX, 없으면 작업 디렉터리의 phq_alert_outbox.db
+    """
+    url = os.environ.get("PHQ_ALERT_WEBHOOK", "").strip()
+    if not url:
+        return None
+    pipeline = AlertPipeline(url, os.environ.get("PHQ_ALERT_OUTBOX", "phq_alert_outbox.db"))
+    pipeline.start()
+    atexit.register(pipeline.close)
+    return pipeline
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 로컬 수신 스텁 (실패율/지연을 흉내 내 재시도 경로 확인용)
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 (http.server 규약)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        time.sleep(server.delay)
+        if random.random() < server.fail_rate:
+            status = HTTPStatus.SERVICE_UNAVAILABLE
+        else:
+            status = HTTPStatus.OK
+            events = json.loads(body)
+            with server.lock:
+                new = [e for e in events if e["event_id"] not in server.seen]
+                server.seen.update(e["event_id"] for e in new)
+            print(f"received {len(events)} events ({len(new)} new, {len(server.seen)} total)", flush=True)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def make_stub_server(host: str = "127.0.0.1", port: int = 8599, fail_rate: float = 0.0, delay: float = 0.0):
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.daemon_threads = True
+    server.fail_rate, server.delay = fail_rate, delay
+    server.seen, server.lock = set(), threading.Lock()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="안전 문항 알림 도구")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_stub = sub.add_parser("stub", help="로컬 웹훅 수신 스텁")
+    p_stub.add_argument("--host", default="127.0.0.1")
+    p_stub.add_argument("--port", type=int, default=8599)
+    p_stub.add_argument("--fail-rate", type=float, default=0.0, help="503으로 응답할 비율 (0–1)")
+    p_stub.add_argument("--delay", type=float, default=0.0, help="응답 지연(초)")
+    args = parser.parse_args()
+
+    server = make_stub_server(args.host, args.port, args.fail_rate, args.delay)
+    print(f"alert stub listening on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
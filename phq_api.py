@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""PHQ-9 JSON 채점 API (asyncio, 표준 라이브러리만 사용)
+
+    python phq_api.py serve --port 8503 [--window-ms 2 --max-batch 256]
+    python phq_api.py bench --requests 50000 --concurrency 64 [--window-ms 2]
+
+POST /score
+  - 단건: {"id": "a1", "answers": [0, 1, 2, 3, 0, 1, 2, 3, null]}
+          → application/json 단건 결과
+          "instrument": "gad7" 처럼 다른 검사 명세(instruments/*.json)를 지정할 수 있다(기본 phq9).
+  - 배치: 위 객체의 JSON 배열, 또는 Content-Type: application/x-ndjson 본문
+          → application/x-ndjson (chunked) 로 입력 순서대로 한 줄씩 스트리밍
+
+채점 규칙은 phq_core.score_answers(앱 제출 경로와 동일)를 그대로 쓴다.
+total은 missing_policy를 따르고 prorated가 true면 비례 환산 점수다. domains는 규칙과 무관하게
+응답한 문항 점수의 합(미응답 0점)이므로, 환산된 결과에서는 영역 점수 합이 total과 다르다.
+irt 모수가 있는 검사는 EAP 잠재 특성 점수 theta/theta_se(phq_irt 사전 계산표)도 함께 돌려준다.
+quality에는 응답 품질 플래그 이름 목록(phq_quality 기본 규칙: longstring)이 들어간다.
+배치 안의 잘못된 항목은 전체를 실패시키지 않고 {"id": ..., "error": ...} 줄로 돌려준다.
+--window-ms를 주면 단건 요청은 MicroBatcher(phq_batcher)로 모아 벡터 채점한다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from functools import partial
+from http import HTTPStatus
+from typing import Dict, Iterable, List, Tuple
+
+from phq_batcher import MicroBatcher
+from phq_core import score_answers
+from phq_instruments import load_instrument
+from phq_irt import eap_for, eap_table
+from phq_quality import flag_names, row_flags
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024 * 1024
+STREAM_CHUNK_ITEMS = 512   # 청크 하나에 담을 결과 줄 수
+READ_BLOCK_BYTES = 64 * 1024
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 채점
+def _unpack_item(obj: object):
+    """요청 항목 → (id, answers, 컴파일된 검사). 형식 오류는 ValueError"""
+    if not isinstance(obj, dict):
+        raise ValueError("each response must be a JSON object")
+    try:
+        inst = load_instrument(obj.get("instrument", "phq9"))
+    except (KeyError, TypeError):
+        raise ValueError(f"unknown instrument: {obj.get('instrument')}")
+    answers = obj.get("answers")
+    if not isinstance(answers, list):
+        raise ValueError(f"'answers' must be a list of {inst.n_items} items")
+    return obj.get("id"), answers, inst
+
+
+def score_one(obj: object) -> Dict[str, object]:
+    """요청 항목 하나 → 결과 dict (형식 오류는 error 필드)"""
+    rid = obj.get("id") if isinstance(obj, dict) else None
+    try:
+        rid, answers, inst = _unpack_item(obj)
+        result = score_answers(answers, inst)
+    except ValueError as exc:
+        return {"id": rid, "error": str(exc)}
+    result["quality"] = flag_names(row_flags(answers, inst))
+    irt = eap_for([a or 0 for a in answers], [a is None for a in answers], inst)
+    if irt is not None:  # score_matrix/results_as_dicts와 같은 키·반올림
+        result["theta"], result["theta_se"] = round(irt[0], 3), round(irt[1], 3)
+    result["id"] = rid
+    return result
+
+
+def score_batch(items: Iterable[object]) -> List[Dict[str, object]]:
+    return [score_one(obj) for obj in items]
+
+
+async def score_one_batched(obj: object, batcher: MicroBatcher) -> Dict[str, object]:
+    """score_one과 같은 결과를 마이크로 배처를 거쳐 계산"""
+    rid = obj.get("id") if isinstance(obj, dict) else None
+    try:
+        rid, answers, inst = _unpack_item(obj)
+        result = dict(await batcher.score(answers, inst))
+    except ValueError as exc:
+        return {"id": rid, "error": str(exc)}
+    result["id"] = rid
+    return result
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HTTP/1.1 최소 구현 (keep-alive, Content-Length 본문, chunked 응답)
+def _head(status: HTTPStatus, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _chunk(data: bytes) -> bytes:
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]] | None:
+    try:
+        raw = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+    lines = raw.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "malformed request line")
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if line:
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+    return method, target, headers
+
+
+def _content_length(headers: Dict[str, str]) -> int:
+    if "transfer-encoding" in headers:
+        raise HttpError(HTTPStatus.LENGTH_REQUIRED, "chunked request bodies are not supported")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "bad Content-Length")
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    return length
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: HTTPStatus, payload: object) -> None:
+    body = _dumps(payload).encode("utf-8")
+    writer.write(_head(status, {
+        "Content-Type": "application/json; charset=utf-8",
+        "Content-Length": str(len(body)),
+    }) + body)
+    await writer.drain()
+
+
+async def _stream_results(writer: asyncio.StreamWriter, results: Iterable[Dict[str, object]]) -> None:
+    """결과를 NDJSON으로 STREAM_CHUNK_ITEMS 줄씩 끊어 chunked 전송"""
+    writer.write(_head(HTTPStatus.OK, {
+        "Content-Type": "application/x-ndjson; charset=utf-8",
+        "Transfer-Encoding": "chunked",
+    }))
+    buf: List[str] = []
+    for res in results:
+        buf.append(_dumps(res))
+        if len(buf) >= STREAM_CHUNK_ITEMS:
+            writer.write(_chunk(("\n".join(buf) + "\n").encode("utf-8")))
+            buf.clear()
+            await writer.drain()
+    if buf:
+        writer.write(_chunk(("\n".join(buf) + "\n").encode("utf-8")))
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _parse_ndjson_lines(lines: Iterable[bytes]) -> Iterable[Dict[str, object]]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield score_one(json.loads(line))
+        except ValueError:
+            yield {"id": None, "error": "invalid JSON line"}
+
+
+async def _handle_ndjson(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, length: int) -> None:
+    """NDJSON 본문은 블록 단위로 읽으면서 바로 채점·전송한다."""
+    writer.write(_head(HTTPStatus.OK, {
+        "Content-Type": "application/x-ndjson; charset=utf-8",
+        "Transfer-Encoding": "chunked",
+    }))
+    pending = b""
+    remaining = length
+    while remaining > 0:
+        block = await reader.readexactly(min(READ_BLOCK_BYTES, remaining))
+        remaining -= len(block)
+        lines = (pending + block).split(b"\n")
+        pending = lines.pop()
+        out = [_dumps(r) for r in _parse_ndjson_lines(lines)]
+        if out:
+            writer.write(_chunk(("\n".join(out) + "\n").encode("utf-8")))
+            await writer.drain()
+    out = [_dumps(r) for r in _parse_ndjson_lines([pending])]
+    if out:
+        writer.write(_chunk(("\n".join(out) + "\n").encode("utf-8")))
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _handle_score(reader, writer, headers: Dict[str, str], batcher: MicroBatcher | None) -> None:
+    length = _content_length(headers)
+    if headers.get("content-type", "").startswith("application/x-ndjson"):
+        await _handle_ndjson(reader, writer, length)
+        return
+    body = await reader.readexactly(length)
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "invalid JSON body")
+    if isinstance(payload, list):
+        await _stream_results(writer, map(score_one, payload))
+        return
+    result = await score_one_batched(payload, batcher) if batcher else score_one(payload)
+    status = HTTPStatus.UNPROCESSABLE_ENTITY if "error" in result else HTTPStatus.OK
+    await _send_json(writer, status, result)
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    batcher: MicroBatcher | None = None,
+) -> None:
+    try:
+        while True:
+            try:
+                req = await _read_head(reader)
+                if req is None:
+                    break
+                method, target, headers = req
+                path = target.split("?", 1)[0]
+                if path == "/score" and method == "POST":
+                    await _handle_score(reader, writer, headers, batcher)
+                elif path == "/healthz" and method == "GET":
+                    await _send_json(writer, HTTPStatus.OK, {"status": "ok"})
+                elif path == "/score":
+                    raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+                else:
+                    raise HttpError(HTTPStatus.NOT_FOUND)
+            except HttpError as exc:
+                await _send_json(writer, exc.status, {"error": str(exc)})
+                break
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    host: str = "127.0.0.1",
+    port: int = 8503,
+    batcher: MicroBatcher | None = None,
+) -> asyncio.AbstractServer:
+    handler = partial(handle_connection, batcher=batcher)
+    return await asyncio.start_server(handler, host, port, limit=MAX_HEADER_BYTES)
+
+
+def _make_batcher(window_ms: float, max_batch: int) -> MicroBatcher | None:
+    return MicroBatcher(window_ms, max_batch) if window_ms > 0 else None
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8503, window_ms: float = 0.0, max_batch: int = 256) -> None:
+    eap_table()  # 첫 요청이 EAP 점수표를 만들거나 읽지 않도록 미리 준비
+    server = await start_server(host, port, _make_batcher(window_ms, max_batch))
+    async with server:
+        await server.serve_forever()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 내장 부하 테스트: 서버를 별도 프로세스(코어 1개 고정)로 띄우고 keep-alive 연결로 측정
+def _pin_to_cpu(cpu: int) -> None:
+    if hasattr(os, "sched_setaffinity") and cpu < (os.cpu_count() or 1):
+        os.sched_setaffinity(0, {cpu})
+
+
+def _bench_server_main(port: int, ready, window_ms: float, max_batch: int) -> None:
+    _pin_to_cpu(0)
+
+    async def run() -> None:
+        server = await start_server("127.0.0.1", port, _make_batcher(window_ms, max_batch))
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+async def _read_response(reader: asyncio.StreamReader) -> bytes:
+    head = await reader.readuntil(b"\r\n\r\n")
+    headers = head.decode("latin-1").lower()
+    if "transfer-encoding: chunked" not in headers:
+        length = int(headers.split("content-length:", 1)[1].split("\r\n", 1)[0])
+        return await reader.readexactly(length)
+    parts = []
+    while True:
+        size = int((await reader.readuntil(b"\r\n"))[:-2], 16)
+        data = await reader.readexactly(size + 2)
+        if size == 0:
+            return b"".join(parts)
+        parts.append(data[:-2])
+
+
+async def _bench_client(port: int, requests: int, concurrency: int, batch: int) -> Tuple[float, List[float]]:
+    import random
+
+    rng = random.Random(0)
+    items = [{"id": str(i), "answers": [rng.randint(0, 3) for _ in range(9)]} for i in range(max(batch, 1))]
+    payload = _dumps(items if batch > 1 else items[0]).encode("utf-8")
+    request = (
+        f"POST /score HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    ).encode("latin-1") + payload
+    latencies: List[float] = []
+    remaining = [requests]
+
+    async def worker() -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            t0 = time.perf_counter()
+            writer.write(request)
+            await _read_response(reader)
+            latencies.append(time.perf_counter() - t0)
+        writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - t0, latencies
+
+
+def run_bench(
+    requests: int,
+    concurrency: int,
+    batch: int,
+    port: int,
+    window_ms: float = 0.0,
+    max_batch: int = 256,
+) -> Dict[str, float]:
+    import multiprocessing as mp
+
+    ready = mp.Event()
+    proc = mp.Process(target=_bench_server_main, args=(port, ready, window_ms, max_batch), daemon=True)
+    proc.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("bench server did not start")
+        _pin_to_cpu(1)
+        asyncio.run(_bench_client(port, min(requests, 1000), concurrency, batch))  # 워밍업
+        elapsed, lat = asyncio.run(_bench_client(port, requests, concurrency, batch))
+    finally:
+        proc.terminate()
+        proc.join()
+    lat.sort()
+    return {
+        "requests": len(lat),
+        "batch": batch,
+        "elapsed_s": elapsed,
+        "req_per_s": len(lat) / elapsed,
+        "responses_per_s": len(lat) * batch / elapsed,
+        "p50_ms": lat[len(lat) // 2] * 1000,
+        "p99_ms": lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PHQ-9 JSON 채점 API")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_serve = sub.add_parser("serve", help="API 서버 실행")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8503)
+    p_serve.add_argument("--window-ms", type=float, default=0.0, help="단건 요청 마이크로 배치 창 (0이면 끔)")
+    p_serve.add_argument("--max-batch", type=int, default=256, help="마이크로 배치 최대 크기")
+    p_bench = sub.add_parser("bench", help="코어 1개 서버 대상 부하 테스트")
+    p_bench.add_argument("--requests", type=int, default=50000)
+    p_bench.add_argument("--concurrency", type=int, default=64)
+    p_bench.add_argument("--batch", type=int, default=1, help="요청당 응답 수 (1이면 단건 본문)")
+    p_bench.add_argument("--port", type=int, default=18503)
+    p_bench.add_argument("--window-ms", type=float, default=0.0)
+    p_bench.add_argument("--max-batch", type=int, default=256)
+    args = parser.parse_args()
+
+    if args.cmd == "serve":
+        print(f"scoring API on http://{args.host}:{args.port}/score")
+        try:
+            asyncio.run(serve(args.host, args.port, args.window_ms, args.max_batch))
+        except KeyboardInterrupt:
+            pass
+    else:
+        stats = run_bench(
+            args.requests, args.concurrency, args.batch, args.port, args.window_ms, args.max_batch
+        )
+        print(
+            f"{stats['requests']} requests × batch {stats['batch']} in {stats['elapsed_s']:.2f}s · "
+            f"{stats['req_per_s']:,.0f} req/s · {stats['responses_per_s']:,.0f} responses/s · "
+            f"p50 {stats['p50_ms']:.2f} ms · p99 {stats['p99_ms']:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
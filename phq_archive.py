@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""고정폭 이진 결과 아카이브 (append-only, 세그먼트 파일을 memmap으로 읽기)
+
+    python phq_archive.py import results.db archive/ --site 3
+    python phq_archive.py stats archive/
+
+레코드 한 건은 16바이트(ARCHIVE_DTYPE)이고 세그먼트 파일은 16바이트 헤더 뒤에 레코드가
+이어 붙는다. 읽을 때는 세그먼트마다 np.memmap으로 구조화 배열 뷰를 만들 뿐 복사하지 않으며,
+집계는 세그먼트 단위로 누적한다. 쓰기는 프로세스 하나(ArchiveWriter)만 한다고 가정한다.
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import MISSING_METHODS, CompiledInstrument, MissingPolicy, load_instrument, parse_missing_policy
+
+MAGIC = b"PHQA"
+VERSION = 1
+HEADER_BYTES = 16
+SEGMENT_RECORDS = 1 << 22  # 세그먼트당 약 4백만 건 = 64 MiB
+
+ARCHIVE_DTYPE = np.dtype(
+    [
+        ("ts", "<u4"),          # epoch 초 (phq_store와 같은 naive 로컬 시각)
+        ("answers", "<u4"),     # 문항당 2비트, 1번 문항이 최하위 (phq_core.pack_scores)
+        ("missing", "<u2"),     # 미응답 문항 비트마스크
+        ("site", "<u2"),
+        ("instrument", "u1"),   # CompiledInstrument.code
+        ("functional", "u1"),   # 0 = 응답 없음, 1–4 = 기능 손상 선택지 순서
+        ("total", "u1"),
+        ("policy", "u1"),       # 비트 0 = total이 비례 환산 점수, 비트 1–7 = missing_policy 코드 (POLICY_LABELS)
+    ]
+)
+if ARCHIVE_DTYPE.itemsize != 16:
+    raise ValueError("ARCHIVE_DTYPE must stay 16 bytes (segment layout)")
+_BYTE_VALUES = np.arange(256, dtype=np.int64)
+# 코드 → missing_policy 문자열. 0은 기록 없음(규칙 코드를 넣기 전 세그먼트), 홀수 zero / 짝수 prorate,
+# (코드 − 1) // 2 − 1이 허용 미응답 수(−1이면 제한 없음).
+POLICY_LABELS = (None,) + tuple(
+    str(MissingPolicy(MISSING_METHODS[(c - 1) % 2], None if (c - 1) // 2 == 0 else (c - 1) // 2 - 1))
+    for c in range(1, 128)
+)
+
+
+def _header() -> bytes:
+    return MAGIC + VERSION.to_bytes(2, "little") + ARCHIVE_DTYPE.itemsize.to_bytes(2, "little") + bytes(8)
+
+
+def _segment_path(root: Path, index: int) -> Path:
+    return root / f"seg-{index:06d}.phqa"
+
+
+def rows_from_records(records: Iterable, site: int = 0) -> np.ndarray:
+    """phq_store.AssessmentRecord 목록 → 아카이브 레코드 배열"""
+    rows = [
+        (
+            r.ts,
+            r.scores,
+            r.missing_mask,
+            site,
+            load_instrument(r.instrument).code,
+            _functional_code(r.functional, load_instrument(r.instrument)),
+            r.total,
+            POLICY_LABELS.index(str(parse_missing_policy(r.missing_policy))) << 1
+            | (r.unanswered > 0 and r.missing_policy.startswith("prorate")),
+        )
+        for r in records
+    ]
+    return np.array(rows, dtype=ARCHIVE_DTYPE)
+
+
+def _functional_code(functional: str | None, inst: CompiledInstrument) -> int:
+    if functional is None or not inst.functional_options:
+        return 0
+    return inst.functional_options.index(functional) + 1
+
+
+class ArchiveWriter:
+    """마지막 세그먼트 뒤에 레코드를 덧붙이고, 가득 차면 새 세그먼트를 연다."""
+
+    def __init__(self, root: str | Path, segment_records: int = SEGMENT_RECORDS):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_records = segment_records
+        existing = sorted(self.root.glob("seg-*.phqa"))
+        self._index = int(existing[-1].stem[4:]) if existing else 0
+        self._file = None
+        self._count = 0
+        self._open(self._index)
+
+    def _open(self, index: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        path = _segment_path(self.root, index)
+        self._file = path.open("ab")
+        if self._file.tell() == 0:
+            self._file.write(_header())
+        # 끝이 잘린 레코드가 있으면 그 뒤에 붙이지 않도록 레코드 경계로 자른다.
+        self._count = (self._file.tell() - HEADER_BYTES) // ARCHIVE_DTYPE.itemsize
+        self._file.truncate(HEADER_BYTES + self._count * ARCHIVE_DTYPE.itemsize)
+        self._file.seek(0, 2)
+        self._index = index
+
+    def append(self, rows: np.ndarray) -> None:
+        rows = np.ascontiguousarray(rows, dtype=ARCHIVE_DTYPE)
+        start = 0
+        while start < len(rows):
+            if self._count >= self.segment_records:
+                self._open(self._index + 1)
+            take = min(len(rows) - start, self.segment_records - self._count)
+            self._file.write(rows[start:start + take].tobytes())
+            self._count += take
+            start += take
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _SegmentStats(NamedTuple):
+    n: int
+    total_hist: np.ndarray      # 총점별 건수
+    answer_hist: np.ndarray     # (answers 바이트 수, 256) 바이트 값별 건수
+    missing_hist: np.ndarray    # missing 마스크 값별 건수
+
+
+class Archive:
+    """세그먼트 memmap 모음. 집계 메서드는 inst 코드의 레코드만 센다.
+
+    집계는 세그먼트별 히스토그램(_SegmentStats)을 합쳐 구한다. 봉인된 세그먼트는 바뀌지 않으므로
+    (경로, 레코드 수)가 같으면 이전 히스토그램을 재사용하고, 커지는 마지막 세그먼트만 다시 훑는다.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._stats: Dict[Tuple[Path, int], _SegmentStats] = {}
+
+    def segment_files(self) -> Iterator[Tuple[Path, int]]:
+        """(세그먼트 경로, 레코드 수). 헤더가 맞지 않으면 ValueError"""
+        for path in sorted(self.root.glob("seg-*.phqa")):
+            with path.open("rb") as f:
+                head = f.read(HEADER_BYTES)
+            if head[:4] != MAGIC or int.from_bytes(head[6:8], "little") != ARCHIVE_DTYPE.itemsize:
+                raise ValueError(f"{path}: not a result archive segment")
+            n = (path.stat().st_size - HEADER_BYTES) // ARCHIVE_DTYPE.itemsize
+            if n:
+                yield path, n
+
+    @staticmethod
+    def map_segment(path: Path, n: int) -> np.ndarray:
+        return np.memmap(path, dtype=ARCHIVE_DTYPE, mode="r", offset=HEADER_BYTES, shape=(n,))
+
+    def segments(self) -> Iterator[np.ndarray]:
+        """세그먼트별 읽기 전용 구조화 배열 뷰 (복사 없음)"""
+        for path, n in self.segment_files():
+            yield self.map_segment(path, n)
+
+    def __len__(self) -> int:
+        return sum(n for _, n in self.segment_files())
+
+    def _segment_stats(self, path: Path, n: int, inst: CompiledInstrument) -> _SegmentStats:
+        cached = self._stats.get((path, inst.code))
+        if cached is not None and cached.n == n:
+            return cached
+        seg = self.map_segment(path, n)
+        codes = seg["instrument"]
+        if not (codes == inst.code).all():
+            seg = seg[codes == inst.code]
+        raw = seg.view(np.uint8).reshape(-1, ARCHIVE_DTYPE.itemsize)
+        offset = ARCHIVE_DTYPE.fields["answers"][1]
+        n_bytes = (2 * inst.n_items + 7) // 8
+        stats = _SegmentStats(
+            n=n,
+            total_hist=np.bincount(seg["total"], minlength=inst.max_total + 1)[: inst.max_total + 1],
+            answer_hist=np.stack([np.bincount(raw[:, offset + k], minlength=256) for k in range(n_bytes)]),
+            missing_hist=np.bincount(seg["missing"], minlength=1 << inst.n_items),
+        )
+        self._stats[(path, inst.code)] = stats
+        return stats
+
+    def _combined(self, inst: CompiledInstrument) -> _SegmentStats:
+        parts = [self._segment_stats(path, n, inst) for path, n in self.segment_files()]
+        n_bytes = (2 * inst.n_items + 7) // 8
+        return _SegmentStats(
+            n=sum(p.n for p in parts),
+            total_hist=sum((p.total_hist for p in parts), np.zeros(inst.max_total + 1, dtype=np.int64)),
+            answer_hist=sum((p.answer_hist for p in parts), np.zeros((n_bytes, 256), dtype=np.int64)),
+            missing_hist=sum((p.missing_hist for p in parts), np.zeros(1 << inst.n_items, dtype=np.int64)),
+        )
+
+    def total_histogram(self, inst: CompiledInstrument = PHQ9) -> np.ndarray:
+        return self._combined(inst).total_hist
+
+    def severity_counts(self, inst: CompiledInstrument = PHQ9) -> Dict[str, int]:
+        by_band = np.bincount(inst.band_by_total, weights=self.total_histogram(inst), minlength=len(inst.band_labels))
+        return {label: int(n) for label, n in zip(inst.band_labels, by_band)}
+
+    def item_means(self, inst: CompiledInstrument = PHQ9) -> List[float]:
+        """문항별 평균 점수 (응답한 레코드 기준).
+
+        한 바이트에 문항 4개가 들어 있으므로 문항 합계는 바이트 값 히스토그램과 조회표의 내적이다.
+        """
+        combined = self._combined(inst)
+        answered_n = combined.total_hist.sum()
+        masks = np.arange(len(combined.missing_hist))
+        means = []
+        for i in range(inst.n_items):
+            total = combined.answer_hist[i // 4] @ ((_BYTE_VALUES >> (2 * (i % 4))) & 3)
+            answered = answered_n - combined.missing_hist[(masks >> i) & 1 == 1].sum()
+            means.append(float(total / answered) if answered else float("nan"))
+        return means
+
+    def item_positive_count(self, item_no: int, inst: CompiledInstrument = PHQ9) -> int:
+        """해당 문항 점수 > 0인 레코드 수 (PHQ-9 9번 문항이면 안전 안내 대상 수)"""
+        i = item_no - 1
+        hist = self._combined(inst).answer_hist[i // 4]
+        return int(hist[(_BYTE_VALUES >> (2 * (i % 4))) & 3 > 0].sum())
+
+
+def import_store(db_path: str, root: str, site: int = 0, after_id: int = 0, chunk: int = 100_000) -> int:
+    """phq_store SQLite에서 id > after_id 레코드를 아카이브로 옮기고 마지막 id를 돌려준다."""
+    from phq_store import AssessmentRecord, connect
+
+    conn = connect(db_path)  # 이전 형식 DB면 마이그레이션 후 읽는다
+    last = after_id
+    cols = ", ".join(AssessmentRecord._fields)
+    with ArchiveWriter(root) as writer:
+        while True:
+            rows = conn.execute(
+                f"SELECT id, {cols} FROM assessments WHERE id > ? ORDER BY id LIMIT ?", (last, chunk)
+            ).fetchall()
+            if not rows:
+                break
+            writer.append(rows_from_records((AssessmentRecord(*r[1:]) for r in rows), site))
+            last = rows[-1][0]
+    conn.close()
+    return last
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PHQ 결과 아카이브")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_imp = sub.add_parser("import", help="SQLite 저장소 → 아카이브")
+    p_imp.add_argument("db")
+    p_imp.add_argument("root")
+    p_imp.add_argument("--site", type=int, default=0)
+    p_imp.add_argument("--after-id", type=int, default=0)
+    p_stats = sub.add_parser("stats", help="전체 아카이브 요약")
+    p_stats.add_argument("root")
+    p_stats.add_argument("--instrument", default=PHQ9.id)
+    args = parser.parse_args()
+
+    if args.cmd == "import":
+        print(f"last id {import_store(args.db, args.root, args.site, args.after_id)}")
+        return
+    archive, inst = Archive(args.root), load_instrument(args.instrument)
+    t0 = time.perf_counter()
+    counts = archive.severity_counts(inst)
+    means = archive.item_means(inst)
+    flagged = archive.item_positive_count(inst.safety_item, inst) if inst.safety_item else None
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"records  {sum(counts.values()):,}  ({elapsed:.1f} ms)")
+    for label, n in counts.items():
+        print(f"  {label:<6} {n:,}")
+    print("item means  " + "  ".join(f"{m:.2f}" for m in means))
+    if flagged is not None:
+        print(f"item {inst.safety_item} > 0  {flagged:,}")
+
+
+if __name__ == "__main__":
+    main()
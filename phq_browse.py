@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""저장된 결과 목록 조회 (임상 검토용, 키셋 페이지)
+
+최신순 (ts, id) 색인을 따라 마지막으로 본 (ts, id) 다음부터 한 페이지만 읽는다.
+OFFSET을 쓰지 않으므로 몇 번째 페이지든, 저장소가 수천만 건이든 비용은 페이지 크기에 비례한다.
+필터 조합마다 맞는 색인이 phq_store 마이그레이션(v2)에 있다:
+  검사만 → ix_assessments_browse,  + 심각도 → ix_assessments_severity,  + 안전 문항 → ix_assessments_flagged
+"""
+import calendar
+from datetime import date, timedelta
+from typing import List, NamedTuple, Tuple
+
+from phq_store import AssessmentRecord, connect
+
+Cursor = Tuple[int, int]  # 마지막으로 본 (ts, id)
+
+
+class BrowseFilter(NamedTuple):
+    instrument: str
+    severity: str | None = None
+    flagged_only: bool = False
+    start: date | None = None   # 양끝 포함
+    end: date | None = None
+
+
+class StoredRow(NamedTuple):
+    id: int
+    ts: int
+    total: int
+    severity: str
+    functional: str | None
+    flagged: bool
+
+
+def _epoch(d: date) -> int:
+    return calendar.timegm(d.timetuple())
+
+
+class ResultBrowser:
+    def __init__(self, db_path: str):
+        self.conn = connect(db_path)
+
+    def page(self, flt: BrowseFilter, after: Cursor | None = None, limit: int = 25) -> Tuple[List[StoredRow], Cursor | None]:
+        """최신순 한 페이지와 다음 페이지 커서(마지막 페이지면 None)"""
+        where, params = ["instrument = ?"], [flt.instrument]
+        if flt.severity is not None:
+            where.append("severity = ?")
+            params.append(flt.severity)
+        if flt.flagged_only:
+            where.append("flagged = 1")
+        if flt.start is not None:
+            where.append("ts >= ?")
+            params.append(_epoch(flt.start))
+        if flt.end is not None:
+            where.append("ts < ?")
+            params.append(_epoch(flt.end + timedelta(days=1)))
+        if after is not None:
+            where.append("(ts, id) < (?, ?)")
+            params += list(after)
+        rows = self.conn.execute(
+            f"SELECT id, ts, total, severity, functional, flagged FROM assessments "
+            f"WHERE {' AND '.join(where)} ORDER BY ts DESC, id DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        items = [StoredRow(*r[:5], bool(r[5])) for r in rows]
+        cursor = (items[-1].ts, items[-1].id) if len(items) == limit else None
+        return items, cursor
+
+    def record(self, assessment_id: int) -> AssessmentRecord | None:
+        cols = ", ".join(AssessmentRecord._fields)
+        row = self.conn.execute(f"SELECT {cols} FROM assessments WHERE id = ?", (assessment_id,)).fetchone()
+        return None if row is None else AssessmentRecord(*row)
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""코호트 단위 신뢰할 만한 변화(RCI)·임상적으로 의미 있는 변화 계산 (NumPy 그룹 연산)
+
+    python phq_change.py results.db summary.csv
+
+(응답자, 시각, 총점) 배열을 응답자·시각 순으로 한 번 정렬한 뒤, 인접 행이 같은 응답자인
+쌍을 연속 실시로 보고 차이를 구한다. 응답자별 요약은 그룹 시작/끝 인덱스와 reduceat으로
+만들므로 응답자 수만큼 파이썬 반복을 돌지 않는다.
+
+  RCI = (나중 − 이전) / S_diff,  S_diff = √2 · SD · √(1 − 신뢰도)      (Jacobson & Truax, 1991)
+  reliable_improvement   RCI ≤ −1.96          reliable_deterioration  RCI ≥ 1.96
+  response               기준선 대비 50% 이상 감소
+  remission              마지막 총점이 첫 구간(PHQ-9 정상, < 5)
+  recovered              신뢰할 만한 호전 + 기준선 ≥ 절단점 → 마지막 < 절단점 (PHQ-9 절단점 10)
+"""
+import argparse
+import csv
+import math
+import sqlite3
+from typing import Dict, NamedTuple, Sequence
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument
+
+RCI_Z = 1.96
+RESPONSE_DROP = 0.5
+
+
+class ChangeParams(NamedTuple):
+    reliability: float = 0.89      # PHQ-9 내적 일관성 (Kroenke et al., 2001)
+    sd: float | None = None        # 기준선 총점 SD. None이면 코호트 기준선에서 추정
+    caseness: int = 10             # 임상 절단점
+
+
+def s_diff(sd: float, reliability: float) -> float:
+    return math.sqrt(2.0) * sd * math.sqrt(1.0 - reliability)
+
+
+def _sort_by_respondent(respondent: np.ndarray, ts: np.ndarray, total: np.ndarray) -> tuple:
+    """(응답자, 시각) 순 정렬. 두 값이 64비트 키 하나에 들어가면 단일 키 정렬(lexsort보다 수 배 빠름)"""
+    respondent, ts = np.asarray(respondent, dtype=np.int64), np.asarray(ts, dtype=np.int64)
+    if len(ts) and respondent.min() >= 0 and respondent.max() < 1 << 31 and ts.min() >= 0 and ts.max() < 1 << 32:
+        order = np.argsort((respondent << 32) | ts)  # 같은 키(동시각 중복)의 순서는 무관
+    else:
+        order = np.lexsort((ts, respondent))
+    return respondent[order], ts[order], np.asarray(total)[order].astype(np.int16)
+
+
+def successive_changes(respondent: np.ndarray, ts: np.ndarray, total: np.ndarray) -> Dict[str, np.ndarray]:
+    """연속 실시 쌍 (응답자·시각 순). 반환 배열의 각 원소가 한 쌍이다."""
+    r, t, y = _sort_by_respondent(respondent, ts, total)
+    same = r[1:] == r[:-1]
+    return {
+        "respondent": r[1:][same],
+        "ts_from": t[:-1][same],
+        "ts_to": t[1:][same],
+        "change": (y[1:] - y[:-1])[same],
+    }
+
+
+def cohort_summary(
+    respondent: np.ndarray,
+    ts: np.ndarray,
+    total: np.ndarray,
+    inst: CompiledInstrument = PHQ9,
+    params: ChangeParams = ChangeParams(),
+) -> Dict[str, np.ndarray]:
+    """응답자별 요약 (실시 2회 이상인 응답자만). respondent는 정수 코드 배열"""
+    r, t, y = _sort_by_respondent(respondent, ts, total)
+    starts = np.flatnonzero(np.r_[True, r[1:] != r[:-1]])
+    counts = np.diff(np.r_[starts, len(r)])
+    ends = starts + counts - 1
+    keep = counts >= 2
+    starts, ends, counts = starts[keep], ends[keep], counts[keep]
+
+    baseline, latest = y[starts], y[ends]
+    change = latest - baseline
+    sd = params.sd if params.sd is not None else float(np.std(baseline, ddof=1)) if len(baseline) > 1 else 0.0
+    sdiff = s_diff(sd, params.reliability)
+    rci = change / sdiff if sdiff > 0 else np.zeros(len(change))
+
+    # 연속 실시 사이 가장 큰 감소 (그룹 안 최솟값)
+    steps = np.diff(y)
+    steps[r[1:] != r[:-1]] = 0   # 응답자 경계를 넘는 차이는 무시
+    max_drop = np.minimum.reduceat(np.r_[steps, 0], starts) if len(starts) else np.empty(0, dtype=np.int16)
+
+    remission_cut = inst.band_cuts[0]
+    reliable_improvement = rci <= -RCI_Z
+    return {
+        "respondent": r[starts],
+        "n": counts.astype(np.uint16),
+        "first_ts": t[starts],
+        "last_ts": t[ends],
+        "baseline": baseline.astype(np.uint8),
+        "latest": latest.astype(np.uint8),
+        "change": change.astype(np.int8),
+        "max_step_drop": (-np.minimum(max_drop, 0)).astype(np.uint8),
+        "rci": rci.astype(np.float32),
+        "reliable_improvement": reliable_improvement,
+        "reliable_deterioration": rci >= RCI_Z,
+        "response": (baseline > 0) & (-change >= RESPONSE_DROP * baseline),
+        "remission": latest < remission_cut,
+        "recovered": reliable_improvement & (baseline >= params.caseness) & (latest < params.caseness),
+    }
+
+
+def load_cohort(conn: sqlite3.Connection, inst: CompiledInstrument = PHQ9) -> tuple:
+    """저장소에서 응답자가 있는 결과 → (정수 코드, 시각, 총점, 코드→가명 배열)"""
+    rows = conn.execute(
+        "SELECT respondent, ts, total FROM assessments WHERE respondent IS NOT NULL AND instrument = ?",
+        (inst.id,),
+    ).fetchall()
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty(0, dtype=object)
+    names, ts, total = zip(*rows)
+    labels, codes = np.unique(np.array(names, dtype=object), return_inverse=True)
+    return codes, np.array(ts, dtype=np.int64), np.array(total, dtype=np.int16), labels
+
+
+def write_csv(path: str, summary: Dict[str, np.ndarray], labels: Sequence[str]) -> None:
+    cols = list(summary)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(cols)
+        data = [summary[c].tolist() for c in cols]
+        data[0] = [labels[i] for i in data[0]]
+        w.writerows(zip(*data))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="응답자별 변화(RCI) 요약")
+    parser.add_argument("db", help="phq_store SQLite 파일")
+    parser.add_argument("out", help="요약 CSV 경로")
+    parser.add_argument("--instrument", default=PHQ9.id)
+    parser.add_argument("--reliability", type=float, default=ChangeParams().reliability)
+    parser.add_argument("--sd", type=float, default=None)
+    parser.add_argument("--caseness", type=int, default=ChangeParams().caseness)
+    args = parser.parse_args()
+
+    from phq_store import connect
+
+    inst = load_instrument(args.instrument)
+    codes, ts, total, labels = load_cohort(connect(args.db), inst)
+    summary = cohort_summary(codes, ts, total, inst, ChangeParams(args.reliability, args.sd, args.caseness))
+    write_csv(args.out, summary, labels)
+    n = len(summary["respondent"])
+    print(f"{n:,} respondents with ≥2 administrations")
+    for key in ("reliable_improvement", "reliable_deterioration", "response", "remission", "recovered"):
+        print(f"  {key:<23} {int(summary[key].sum()):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""PHQ-9 채점 규칙과 결과 링크 인코딩 (streamlit 비의존)
+
+검사 문항·구간 등 표는 instruments/*.json 명세를 컴파일한 것(phq_instruments)이며,
+아래 PHQ-9 전역 이름들은 기존 코드와의 호환을 위해 PHQ9 컴파일 결과를 가리킨다.
+"""
+import base64
+import calendar
+import hashlib
+import hmac
+import os
+import secrets
+import struct
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Sequence
+
+from phq_instruments import CompiledInstrument, MissingPolicy, instrument_by_code, load_instrument
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 문항/선택지 (instruments/phq9.json 명세에서 컴파일)
+PHQ9 = load_instrument("phq9")
+
+QUESTIONS = PHQ9.questions
+LABELS = PHQ9.labels
+LABEL2SCORE = PHQ9.label2score
+FUNCTIONAL_OPTIONS = PHQ9.functional_options
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 유틸: 중증도 라벨
+def phq_severity(total: int) -> str:
+    return PHQ9.severity(total)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PHQ-9 도메인 인덱스(1-based)
+COG_AFF = [1, 2, 6, 7, 9]   # 인지·정서(5문항)
+SOMATIC = [3, 4, 5, 8]      # 신체/생리(4문항)
+
+# ──────────────────────────────────────────────────────────────────────────────
+SEVERITY_SEGMENTS = PHQ9.segments
+SEVERITY_PILL = PHQ9.pill
+SEVERITY_ARC_COLOR = PHQ9.arc_color
+SEVERITY_GUIDANCE = PHQ9.guidance
+DOMAIN_META = PHQ9.domain_meta
+if [m["items"] for m in DOMAIN_META] != [SOMATIC, COG_AFF]:
+    raise ValueError("instruments/phq9.json domains no longer match SOMATIC/COG_AFF")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 채점 (API/배치용 빠른 경로: 총점별 중증도 표를 미리 계산)
+SEVERITY_BY_TOTAL = PHQ9.severity_by_total
+
+
+def validate_answers(answers: Sequence[int | None], inst: CompiledInstrument = PHQ9) -> None:
+    """문항 응답(0–최대 점수 정수 또는 None) 형식 검사. 오류는 ValueError"""
+    if len(answers) != inst.n_items:
+        raise ValueError(f"answers must contain {inst.n_items} items")
+    top = len(inst.labels) - 1
+    for i, a in enumerate(answers):
+        if a is not None and not (type(a) is int and 0 <= a <= top):
+            raise ValueError(f"item {i + 1}: expected 0–{top} or null")
+
+
+def policy_total(raw_total: int, unanswered: int, inst: CompiledInstrument = PHQ9, policy: MissingPolicy | None = None) -> int | None:
+    """미응답 처리 규칙을 적용한 총점 (raw_total은 미응답 0점 합). 무효면 None
+
+    prorate: 응답 문항 평균 × 문항 수, 반올림(0.5 올림). phq_vector.score_matrix와 같은 정수 연산.
+    """
+    policy = policy or inst.missing_policy
+    if policy.max_missing is not None and unanswered > policy.max_missing:
+        return None
+    if policy.method == "zero" or unanswered == 0:
+        return raw_total
+    answered = inst.n_items - unanswered
+    if answered == 0:
+        return None
+    return min(inst.max_total, (2 * raw_total * inst.n_items + answered) // (2 * answered))
+
+
+def score_answers(
+    answers: Sequence[int | None], inst: CompiledInstrument = PHQ9, policy: MissingPolicy | None = None
+) -> Dict[str, object]:
+    """문항 응답(미응답 None) → 총점·중증도·영역 점수·안전 문항 플래그(PHQ-9은 item9_flag).
+
+    총점은 미응답 처리 규칙(기본은 검사 명세의 missing_policy)을 따르고, 규칙 문자열을
+    missing_policy로 함께 돌려준다. 무효(미응답 초과)면 total/severity가 None. 형식 오류는 ValueError.
+    영역 점수는 항상 미응답 0점 합이다. prorated가 True면 total만 비례 환산된 값이라
+    영역 점수를 더해도 total이 되지 않는다.
+    """
+    validate_answers(answers, inst)
+    policy = policy or inst.missing_policy
+    scores = [0 if a is None else a for a in answers]
+    unanswered = sum(1 for a in answers if a is None)
+    total = policy_total(sum(scores), unanswered, inst, policy)
+    result: Dict[str, object] = {
+        "total": total,
+        "severity": None if total is None else inst.severity_by_total[total],
+        "domains": {key: sum(scores[i] for i in idx) for key, idx in inst.domain_index},
+    }
+    if inst.safety_item is not None:
+        result[f"item{inst.safety_item}_flag"] = scores[inst.safety_item - 1] > 0
+    result["unanswered"] = unanswered
+    result["missing_policy"] = str(policy)
+    result["prorated"] = total is not None and policy.method == "prorate" and unanswered > 0
+    return result
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 결과 요약 (total, sev, functional, scores, ts, unanswered)
+TS_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class ResultSummary(NamedTuple):
+    total: int
+    sev: str
+    functional: str | None
+    scores: List[int]
+    ts: str
+    unanswered: int
+    instrument: str = "phq9"
+    missing_mask: int = 0   # 미응답 문항 비트 (문항 1이 최하위 비트)
+    prorated: bool = False  # 총점을 응답 문항 평균으로 비례 환산했는지 (영역 점수는 환산하지 않음)
+    respondent: str | None = None  # 서명된 응답자 가명 (respondent_pseudonym, 이력 조회 키)
+
+
+def pack_scores(scores: Sequence[int]) -> int:
+    """문항 점수(0–3)를 문항당 2비트로 묶는다. 문항 1이 최하위 비트."""
+    packed = 0
+    for i, s in enumerate(scores):
+        packed |= (int(s) & 0b11) << (2 * i)
+    return packed
+
+
+def unpack_scores(packed: int, n_items: int = 9) -> List[int]:
+    return [(packed >> (2 * i)) & 0b11 for i in range(n_items)]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 결과 링크 토큰
+# 레이아웃(빅엔디언): 버전(1B) · 검사 코드(1B) · 검사 시각 epoch 분(4B) · 본문(4B) · HMAC-SHA256 앞 8B
+#   본문 비트 0–17 문항 점수(문항당 2비트), 18–26 미응답 마스크, 27–29 기능 손상(0=미응답, 1–4),
+#   30 비례 환산 총점 여부(0이면 미응답 0점 합)
+#   응답자 가명이 있으면 본문 뒤에 16B가 붙고 서명은 그것까지 덮는다(길이로 구분).
+_TOKEN_VERSION = 2
+_TOKEN_STRUCT = struct.Struct(">BBII")
+_SIG_BYTES = 8
+_RESPONDENT_BYTES = 16
+_MAX_TOKEN_ITEMS = 9
+
+# 여러 서버 프로세스가 같은 링크를 검증하려면 PHQ_RESULT_SECRET을 공유해야 한다.
+# 미설정 시 프로세스마다 임의 키를 쓰므로 링크는 해당 프로세스에서만 유효하다.
+_SECRET = os.environ.get("PHQ_RESULT_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+
+
+class InvalidResultToken(ValueError):
+    """서명 불일치 또는 형식 오류"""
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(_SECRET, payload, hashlib.sha256).digest()[:_SIG_BYTES]
+
+
+def respondent_pseudonym(raw_id: str) -> str:
+    """기관이 부여한 응답자 번호 → 저장용 가명(키 해시 32자). 원래 번호는 저장하지 않는다.
+
+    재시작 후에도 같은 가명이 나오려면 PHQ_RESULT_SECRET을 고정해야 한다.
+    """
+    return hmac.new(_SECRET, b"respondent\0" + raw_id.strip().encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def _invite_sig(pseudonym: bytes) -> bytes:
+    return hmac.new(_SECRET, b"invite\0" + pseudonym, hashlib.sha256).digest()[:_SIG_BYTES]
+
+
+def respondent_invite(raw_id: str) -> str:
+    """응답자 번호 → 기관이 배포하는 ?rid= 값 (가명 + 서명, URL-safe 32자)
+
+    번호를 안다고 남의 이력에 제출하거나 이력을 볼 수 없도록, 앱은 서명이 맞는 초대 값만 받는다.
+    """
+    pseudonym = bytes.fromhex(respondent_pseudonym(raw_id))
+    return base64.urlsafe_b64encode(pseudonym + _invite_sig(pseudonym)).decode("ascii")
+
+
+def invite_pseudonym(invite: str) -> str | None:
+    """?rid= 값 검증 → 응답자 가명. 형식·서명이 틀리면 None"""
+    invite = invite.strip()
+    try:
+        raw = base64.urlsafe_b64decode(invite + "=" * (-len(invite) % 4))
+    except (ValueError, TypeError):
+        return None
+    pseudonym, sig = raw[:_RESPONDENT_BYTES], raw[_RESPONDENT_BYTES:]
+    if len(raw) != _RESPONDENT_BYTES + _SIG_BYTES or not hmac.compare_digest(sig, _invite_sig(pseudonym)):
+        return None
+    return pseudonym.hex()
+
+
+def encode_result(
+    scores: Sequence[int],
+    missing: Sequence[bool],
+    functional: str | None,
+    when: datetime,
+    inst: CompiledInstrument = PHQ9,
+    policy: MissingPolicy | None = None,
+    respondent: str | None = None,
+) -> str:
+    """응답 벡터를 서명된 URL-safe 토큰으로 인코딩. 미응답 처리는 policy(기본은 검사의 missing_policy)
+
+    규칙상 무효(미응답 초과)인 응답은 ValueError. 저장된 결과는 기록된 규칙을 넘겨 같은 총점을 재현한다.
+    respondent(respondent_pseudonym 32자)를 주면 토큰에 서명째 담겨 결과 화면의 이력 조회 키가 된다.
+    """
+    policy = policy or inst.missing_policy
+    if inst.n_items > _MAX_TOKEN_ITEMS or len(inst.labels) > 4:
+        raise ValueError(f"{inst.id}: too many items/options for a result token")
+    mask = 0
+    for i, m in enumerate(missing):
+        if m:
+            mask |= 1 << i
+    func_code = inst.functional_options.index(functional) + 1 if functional else 0
+    scores = [0 if m else s for s, m in zip(scores, missing)]  # 미응답은 0점
+    unanswered = bin(mask).count("1")
+    if policy_total(sum(scores), unanswered, inst, policy) is None:
+        raise ValueError(f"{inst.id}: {unanswered} unanswered items exceed policy {policy}")
+    prorated = policy.method == "prorate" and unanswered > 0
+    body = pack_scores(scores) | (mask << 18) | (func_code << 27) | (int(prorated) << 30)
+    minutes = calendar.timegm(when.timetuple()) // 60
+    payload = _TOKEN_STRUCT.pack(_TOKEN_VERSION, inst.code, minutes, body)
+    if respondent is not None:
+        tail = bytes.fromhex(respondent)
+        if len(tail) != _RESPONDENT_BYTES:
+            raise ValueError("respondent must be a respondent_pseudonym value")
+        payload += tail
+    return base64.urlsafe_b64encode(payload + _sign(payload)).rstrip(b"=").decode("ascii")
+
+
+def decode_result(token: str) -> ResultSummary:
+    """토큰을 검증·복원한다. 실패 시 InvalidResultToken"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError) as exc:
+        raise InvalidResultToken("malformed token") from exc
+    if len(raw) not in (_TOKEN_STRUCT.size + _SIG_BYTES, _TOKEN_STRUCT.size + _RESPONDENT_BYTES + _SIG_BYTES):
+        raise InvalidResultToken("unexpected token length")
+    payload, sig = raw[:-_SIG_BYTES], raw[-_SIG_BYTES:]
+    if not hmac.compare_digest(sig, _sign(payload)):
+        raise InvalidResultToken("bad signature")
+    version, code, minutes, body = _TOKEN_STRUCT.unpack(payload[:_TOKEN_STRUCT.size])
+    tail = payload[_TOKEN_STRUCT.size:]
+    if version != _TOKEN_VERSION:
+        raise InvalidResultToken(f"unsupported token version {version}")
+    try:
+        inst = instrument_by_code(code)
+    except KeyError as exc:
+        raise InvalidResultToken(f"unknown instrument code {code}") from exc
+
+    func_code = (body >> 27) & 0b111
+    options = inst.functional_options or []
+    if func_code > len(options):
+        raise InvalidResultToken("bad functional code")
+    mask = (body >> 18) & ((1 << inst.n_items) - 1)
+    scores = unpack_scores(body, inst.n_items)
+    unanswered = bin(mask).count("1")
+    prorated = bool(body >> 30 & 1)
+    total = policy_total(sum(scores), unanswered, inst, MissingPolicy("prorate")) if prorated else sum(scores)
+    if total is None:
+        raise InvalidResultToken("prorated token without answers")
+    ts = datetime.fromtimestamp(minutes * 60, timezone.utc).strftime(TS_FORMAT)
+    return ResultSummary(
+        total=total,
+        sev=inst.severity(total),
+        functional=options[func_code - 1] if func_code else None,
+        scores=scores,
+        ts=ts,
+        unanswered=unanswered,
+        instrument=inst.id,
+        missing_mask=mask,
+        prorated=prorated,
+        respondent=tail.hex() if tail else None,
+    )
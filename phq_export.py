@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""채점 결과 열 지향 내보내기 (Parquet / Arrow IPC)
+
+    python phq_export.py archive/ results.parquet
+    python phq_export.py results.db results.arrow --instrument gad7
+
+원본은 결과 아카이브 디렉터리(phq_archive) 또는 저장소 SQLite(phq_store)이다.
+ROW_GROUP_ROWS건씩 RecordBatch를 만들어 바로 쓰므로 메모리 사용량은 전체 건수와 무관하다.
+열: ts(timestamp[s]), site, item1..itemN(uint8, 미응답 null), total(uint8),
+severity/functional(dictionary), 영역 점수(uint8), unanswered(uint8),
+prorated(bool, total이 비례 환산 점수), missing_policy(dictionary, 규칙 코드 이전 아카이브는 null)
+영역 점수는 규칙과 무관하게 미응답 0점 합이다. prorated 행은 영역 점수 합이 total과 다르다.
+Arrow IPC 파일은 open_arrow()로 memory-map해 복사 없이 Table로 읽는다.
+"""
+import argparse
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from phq_archive import POLICY_LABELS, Archive, rows_from_records
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument
+
+ROW_GROUP_ROWS = 1 << 20
+# +instrument: 검사 인덱스 대신 기본 키 범위로 훑게 한다 (인덱스를 쓰면 청크마다 남은 행 전체를 정렬)
+_STORE_CHUNK_SQL = "SELECT id, {cols} FROM assessments WHERE id > ? AND +instrument = ? ORDER BY id LIMIT ?"
+_POLICY_DICTIONARY = pa.array([label or "" for label in POLICY_LABELS], type=pa.string())
+
+
+def arrow_schema(inst: CompiledInstrument = PHQ9) -> pa.Schema:
+    fields = [pa.field("ts", pa.timestamp("s")), pa.field("site", pa.uint16())]
+    fields += [pa.field(f"item{q['no']}", pa.uint8()) for q in inst.questions]
+    fields += [
+        pa.field("total", pa.uint8(), nullable=False),
+        pa.field("severity", pa.dictionary(pa.int8(), pa.string()), nullable=False),
+        pa.field("functional", pa.dictionary(pa.int8(), pa.string())),
+    ]
+    fields += [pa.field(key, pa.uint8(), nullable=False) for key, _ in inst.domain_index]
+    fields.append(pa.field("unanswered", pa.uint8(), nullable=False))
+    fields.append(pa.field("prorated", pa.bool_(), nullable=False))
+    fields.append(pa.field("missing_policy", pa.dictionary(pa.int8(), pa.string())))
+    return pa.schema(fields, metadata={"instrument": inst.id, "spec_hash": inst.spec_hash})
+
+
+def record_batch(rows: np.ndarray, inst: CompiledInstrument = PHQ9) -> pa.RecordBatch:
+    """아카이브 레코드 배열(같은 검사) → RecordBatch. 구간/기능 손상은 코드 배열 + 사전"""
+    answers, missing = rows["answers"], rows["missing"]
+    items = np.empty((inst.n_items, len(rows)), dtype=np.uint8)
+    for i in range(inst.n_items):
+        items[i] = (answers >> (2 * i)) & 3
+    codes = np.asarray(inst.band_by_total, dtype=np.int8)[rows["total"]]
+    functional = rows["functional"].astype(np.int8) - 1
+    functional_labels = pa.array(inst.functional_options or [], type=pa.string())
+
+    columns = [
+        pa.array(rows["ts"].astype(np.int64), type=pa.timestamp("s")),
+        pa.array(rows["site"]),
+    ]
+    columns += [pa.array(items[i], mask=(missing & (1 << i)) != 0) for i in range(inst.n_items)]
+    columns += [
+        pa.array(rows["total"]),
+        pa.DictionaryArray.from_arrays(codes, pa.array(inst.band_labels, type=pa.string())),
+        pa.DictionaryArray.from_arrays(pa.array(functional, mask=functional < 0), functional_labels),
+    ]
+    columns += [pa.array(items[list(idx)].sum(axis=0, dtype=np.uint8)) for _, idx in inst.domain_index]
+    unanswered = sum(((missing >> i) & 1).astype(np.uint8) for i in range(inst.n_items))
+    columns.append(pa.array(np.asarray(unanswered, dtype=np.uint8)))
+    policy = (rows["policy"] >> 1).astype(np.int8)
+    columns += [
+        pa.array((rows["policy"] & 1) != 0),
+        pa.DictionaryArray.from_arrays(pa.array(policy, mask=policy == 0), _POLICY_DICTIONARY),
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=arrow_schema(inst))
+
+
+def _archive_chunks(root: str, inst: CompiledInstrument, chunk: int) -> Iterator[np.ndarray]:
+    for seg in Archive(root).segments():
+        for start in range(0, len(seg), chunk):
+            part = seg[start:start + chunk]
+            yield part[part["instrument"] == inst.code]
+
+
+def _store_chunks(db_path: str, inst: CompiledInstrument, chunk: int) -> Iterator[np.ndarray]:
+    from phq_store import AssessmentRecord, connect
+
+    conn = connect(db_path)  # 이전 형식 DB면 마이그레이션 후 읽는다
+    cols = ", ".join(AssessmentRecord._fields)
+    last = 0
+    try:
+        while True:
+            rows = conn.execute(_STORE_CHUNK_SQL.format(cols=cols), (last, inst.id, chunk)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield rows_from_records(AssessmentRecord(*r[1:]) for r in rows)
+    finally:
+        conn.close()
+
+
+def iter_batches(source: str, inst: CompiledInstrument = PHQ9, chunk: int = ROW_GROUP_ROWS) -> Iterator[pa.RecordBatch]:
+    """source가 디렉터리면 아카이브, 파일이면 SQLite 저장소로 읽는다."""
+    chunks = _archive_chunks if Path(source).is_dir() else _store_chunks
+    for rows in chunks(source, inst, chunk):
+        if len(rows):
+            yield record_batch(rows, inst)
+
+
+def to_table(source: str, inst: CompiledInstrument = PHQ9) -> pa.Table:
+    """프로세스 안 소비자용 Table (배치 버퍼를 그대로 묶어 추가 복사 없음)"""
+    return pa.Table.from_batches(list(iter_batches(source, inst)), schema=arrow_schema(inst))
+
+
+def export(source: str, dest: str, inst: CompiledInstrument = PHQ9) -> int:
+    """dest 확장자가 .parquet이면 Parquet(배치당 row group 하나), 그 밖에는 Arrow IPC 파일"""
+    schema = arrow_schema(inst)
+    n = 0
+    if dest.endswith(".parquet"):
+        with pq.ParquetWriter(dest, schema, compression="zstd") as writer:
+            for batch in iter_batches(source, inst):
+                writer.write_batch(batch, row_group_size=ROW_GROUP_ROWS)
+                n += batch.num_rows
+    else:
+        with pa.OSFile(dest, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in iter_batches(source, inst):
+                writer.write_batch(batch)
+                n += batch.num_rows
+    return n
+
+
+def open_arrow(path: str) -> pa.Table:
+    """Arrow IPC 파일을 memory-map해 복사 없이 Table로 읽는다."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="채점 결과 Parquet/Arrow 내보내기")
+    parser.add_argument("source", help="아카이브 디렉터리 또는 저장소 SQLite 파일")
+    parser.add_argument("dest", help=".parquet 또는 .arrow")
+    parser.add_argument("--instrument", default=PHQ9.id)
+    args = parser.parse_args()
+    n = export(args.source, args.dest, load_instrument(args.instrument))
+    print(f"wrote {n:,} rows to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""응답자별 반복 실시 이력 (추이 그래프용)
+
+    PHQ_RESULT_SECRET=... python phq_history.py invite A-17 A-18    # 응답자별 ?rid= 초대 값 발급
+
+앱은 ?rid=에 서명된 초대 값(phq_core.respondent_invite)만 받고, 확인한 가명을 결과 토큰에 담는다.
+결과 화면의 이력은 토큰의 가명으로만 조회하므로 번호를 알거나 URL을 고쳐도 남의 이력은 열리지 않는다.
+이력 조회는 ix_assessments_respondent (respondent, instrument, ts, total, scores)의
+범위 읽기 한 번이다. 필요한 열이 모두 색인에 있어 표를 읽지 않으며, 비용은 저장소 전체가
+아니라 해당 응답자의 실시 횟수에 비례한다.
+"""
+import argparse
+import os
+import sqlite3
+from typing import Dict, List, NamedTuple
+
+from phq_core import respondent_invite, unpack_scores
+from phq_instruments import CompiledInstrument
+
+MAX_ADMINISTRATIONS = 200
+
+
+class Administration(NamedTuple):
+    ts: int
+    total: int
+    domains: Dict[str, int]
+
+
+def fetch_history(
+    conn: sqlite3.Connection, respondent: str, inst: CompiledInstrument, limit: int = MAX_ADMINISTRATIONS
+) -> List[Administration]:
+    """오래된 순 실시 이력 (최근 limit회)"""
+    rows = conn.execute(
+        "SELECT ts, total, scores FROM assessments "
+        "WHERE respondent = ? AND instrument = ? ORDER BY ts DESC LIMIT ?",
+        (respondent, inst.id, limit),
+    ).fetchall()
+    out = []
+    for ts, total, packed in reversed(rows):
+        scores = unpack_scores(packed, inst.n_items)
+        out.append(Administration(ts, total, {key: sum(scores[i] for i in idx) for key, idx in inst.domain_index}))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="응답자 이력")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_inv = sub.add_parser("invite", help="응답자 번호 → ?rid= 초대 값")
+    p_inv.add_argument("ids", nargs="+")
+    args = parser.parse_args()
+
+    if not os.environ.get("PHQ_RESULT_SECRET"):
+        parser.error("PHQ_RESULT_SECRET must be set to the app's secret (otherwise invites are valid nowhere)")
+    for raw_id in args.ids:
+        print(f"{raw_id}\t{respondent_invite(raw_id)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""결과지 HTTP 엔드포인트 (Streamlit 없이 결과 토큰 → 결과지 HTML)
+
+    python phq_http.py --port 8502
+    GET /report/<token>  또는  GET /report?r=<token>
+
+같은 토큰이면 본문이 항상 같으므로 렌더링 결과를 프로세스 안에 메모해 두고,
+본문 해시로 만든 강한 ETag와 장기 Cache-Control을 함께 보낸다.
+"""
+import argparse
+import hashlib
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from phq_core import InvalidResultToken, decode_result
+from phq_instruments import load_instrument
+from phq_report import build_report_document
+
+# 결과 링크는 불변이지만 건강 정보이므로 공유 캐시(private 제외)에는 두지 않는다.
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+RENDER_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(spec_hash: str, token: str) -> Tuple[str, bytes]:
+    body = build_report_document(decode_result(token)).encode("utf-8")
+    etag = f'"{spec_hash}-{hashlib.sha256(body).hexdigest()[:24]}"'
+    return etag, body
+
+
+def render_report(token: str) -> Tuple[str, bytes]:
+    """토큰 → (ETag, UTF-8 본문). 잘못된 토큰은 InvalidResultToken
+
+    캐시 키와 ETag에 검사 명세 해시를 넣어, 명세가 바뀌면 이전 렌더링을 재사용하지 않는다.
+    """
+    summary = decode_result(token)
+    return _render(load_instrument(summary.instrument).spec_hash, token)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (t.strip() for t in header.split(","))
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "phq-report"
+
+    def _token(self) -> str | None:
+        parts = urlsplit(self.path)
+        if parts.path.startswith("/report/"):
+            return parts.path[len("/report/"):] or None
+        if parts.path == "/report":
+            return (parse_qs(parts.query).get("r") or [None])[0]
+        return None
+
+    def _send(self, status: HTTPStatus, body: bytes = b"", headers: dict | None = None, head: bool = False) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and not head:
+            self.wfile.write(body)
+
+    def _serve(self, head: bool) -> None:
+        if urlsplit(self.path).path == "/healthz":
+            self._send(HTTPStatus.OK, b"ok", {"Content-Type": "text/plain"}, head)
+            return
+        token = self._token()
+        if token is None:
+            self._send(HTTPStatus.NOT_FOUND, b"not found", {"Content-Type": "text/plain"}, head)
+            return
+        try:
+            etag, body = render_report(token)
+        except InvalidResultToken:
+            self._send(HTTPStatus.BAD_REQUEST, b"invalid result token", {"Content-Type": "text/plain"}, head)
+            return
+
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send(HTTPStatus.NOT_MODIFIED, headers=headers, head=True)
+            return
+        headers["Content-Type"] = "text/html; charset=utf-8"
+        self._send(HTTPStatus.OK, body, headers, head)
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server 규약)
+        self._serve(head=False)
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self._serve(head=True)
+
+    def log_message(self, format: str, *args) -> None:  # 요청당 로그 출력 생략
+        pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8502) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ReportHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PHQ-9 결과지 HTTP 엔드포인트")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+    server = make_server(args.host, args.port)
+    print(f"serving reports on http://{args.host}:{args.port}/report/<token>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""결과 아카이브의 날짜 × 심각도 구간 파티션 색인
+
+    python phq_index.py build archive/
+    python phq_index.py count archive/ --from 2026-10-12 --to 2026-10-18 --band 중증 --band 심각 --site 3
+
+phq_archive 레코드를 (검사, 날짜, 심각도 구간) 파티션으로 나눠
+  - 파티션별 건수 (전체 / 기관별)를 미리 세어 두고
+  - 파티션이 등장하는 블록(BLOCK_RECORDS건 단위) 목록을 희소 색인으로 둔다.
+건수 질의는 기간 안의 날짜 × 구간 조회만 하므로 아카이브 크기와 무관하고,
+레코드 조회는 해당 파티션의 블록만 읽는다. 색인은 archive/index.json에 저장하며
+세그먼트별로 색인한 레코드 수를 기억해 새로 붙은 레코드만 반영한다.
+"""
+import argparse
+import json
+import time
+from collections import defaultdict
+from functools import lru_cache
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from phq_archive import ARCHIVE_DTYPE, Archive
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, available_instruments, load_instrument
+
+BLOCK_RECORDS = 4096
+INDEX_FILE = "index.json"
+_EPOCH = date(1970, 1, 1)
+
+# (검사 코드, 날짜 번호, 구간) / (검사 코드, 날짜 번호, 기관, 구간)
+PartKey = Tuple[int, int, int]
+SitePartKey = Tuple[int, int, int, int]
+
+
+def day_number(d: date) -> int:
+    return (d - _EPOCH).days
+
+
+@lru_cache(maxsize=None)
+def _band_tables() -> np.ndarray:
+    """검사 코드 × 총점 → 구간 인덱스 (아카이브 total 열에 바로 인덱싱)"""
+    insts = [load_instrument(i) for i in available_instruments()]
+    table = np.zeros((max(i.code for i in insts) + 1, 256), dtype=np.uint8)
+    for inst in insts:
+        table[inst.code, : inst.max_total + 1] = inst.band_by_total
+    return table
+
+
+class PartitionIndex:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.counts: Dict[PartKey, int] = defaultdict(int)
+        self.site_counts: Dict[SitePartKey, int] = defaultdict(int)
+        self.blocks: Dict[PartKey, List[Tuple[int, int]]] = defaultdict(list)  # → [(세그먼트 번호, 블록 번호)]
+        self.watermark: Dict[str, int] = {}  # 세그먼트 파일명 → 색인한 레코드 수
+
+    # ── 저장/불러오기 ──────────────────────────────────────────────────────────
+    @classmethod
+    def load(cls, root: str | Path) -> "PartitionIndex":
+        index = cls(root)
+        path = index.root / INDEX_FILE
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            index.watermark = data["watermark"]
+            for k, v in data["counts"].items():
+                index.counts[tuple(map(int, k.split(":")))] = v
+            for k, v in data["site_counts"].items():
+                index.site_counts[tuple(map(int, k.split(":")))] = v
+            for k, v in data["blocks"].items():
+                index.blocks[tuple(map(int, k.split(":")))] = [tuple(b) for b in v]
+        return index
+
+    def save(self) -> None:
+        data = {
+            "block_records": BLOCK_RECORDS,
+            "watermark": self.watermark,
+            "counts": {":".join(map(str, k)): v for k, v in self.counts.items()},
+            "site_counts": {":".join(map(str, k)): v for k, v in self.site_counts.items()},
+            "blocks": {":".join(map(str, k)): v for k, v in self.blocks.items()},
+        }
+        tmp = self.root / (INDEX_FILE + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        tmp.replace(self.root / INDEX_FILE)
+
+    # ── 증분 갱신 ──────────────────────────────────────────────────────────────
+    def update(self, archive: Archive | None = None) -> int:
+        """아직 색인하지 않은 레코드를 반영하고, 새로 색인한 건수를 돌려준다."""
+        archive = archive or Archive(self.root)
+        bands = _band_tables()
+        added = 0
+        for path, n in archive.segment_files():
+            done = self.watermark.get(path.name, 0)
+            if n <= done:
+                continue
+            seg_no = int(path.stem[4:])
+            rows = archive.map_segment(path, n)[done:]
+            self._add(seg_no, done, rows, bands)
+            self.watermark[path.name] = n
+            added += n - done
+        return added
+
+    def _add(self, seg_no: int, start: int, rows: np.ndarray, bands: np.ndarray) -> None:
+        code = rows["instrument"].astype(np.int64)
+        day = rows["ts"].astype(np.int64) // 86400
+        band = bands[code, rows["total"]].astype(np.int64)
+        site = rows["site"].astype(np.int64)
+        block = (start + np.arange(len(rows), dtype=np.int64)) // BLOCK_RECORDS
+
+        # 파티션 키를 32비트 정수 하나로 묶는다 (코드 8비트 | 날짜 20비트 | 구간 4비트).
+        # 기관(16비트)이나 블록 번호(31비트)를 덧붙여도 int64 안에 들어가 np.unique 한 번으로 센다.
+        part = (code << 24) | (day << 4) | band
+        for key, n in zip(*np.unique(part, return_counts=True)):
+            self.counts[_unpack_part(int(key))] += int(n)
+        for key, n in zip(*np.unique((part << 16) | site, return_counts=True)):
+            code_, day_, band_ = _unpack_part(int(key) >> 16)
+            self.site_counts[(code_, day_, int(key) & 0xFFFF, band_)] += int(n)
+        for key in np.unique((part << 31) | block):
+            blocks = self.blocks[_unpack_part(int(key) >> 31)]
+            entry = (seg_no, int(key) & 0x7FFFFFFF)
+            if not blocks or blocks[-1] != entry:  # 이전 update에서 이미 넣은 마지막 블록
+                blocks.append(entry)
+
+    # ── 질의 ───────────────────────────────────────────────────────────────────
+    @staticmethod
+    def _band_ids(inst: CompiledInstrument, bands: Iterable[str] | None) -> List[int]:
+        return list(range(len(inst.band_labels))) if bands is None else [inst.band_labels.index(b) for b in bands]
+
+    def _keys(self, inst: CompiledInstrument, start: date, end: date, bands: Iterable[str] | None) -> Iterator[PartKey]:
+        band_ids = self._band_ids(inst, bands)
+        for day in range(day_number(start), day_number(end) + 1):
+            for b in band_ids:
+                yield (inst.code, day, b)
+
+    def count(
+        self,
+        start: date,
+        end: date,
+        bands: Iterable[str] | None = None,
+        site: int | None = None,
+        inst: CompiledInstrument = PHQ9,
+    ) -> int:
+        """start–end(양끝 포함) 기간, 지정 구간(기본 전체)의 건수. 기간 일수 × 구간 수만큼만 조회한다."""
+        if site is None:
+            return sum(self.counts.get(k, 0) for k in self._keys(inst, start, end, bands))
+        return sum(self.site_counts.get((c, d, site, b), 0) for c, d, b in self._keys(inst, start, end, bands))
+
+    def counts_by_band(self, start: date, end: date, site: int | None = None, inst: CompiledInstrument = PHQ9) -> Dict[str, int]:
+        return {label: self.count(start, end, [label], site, inst) for label in inst.band_labels}
+
+    def rows(
+        self,
+        start: date,
+        end: date,
+        bands: Iterable[str] | None = None,
+        site: int | None = None,
+        inst: CompiledInstrument = PHQ9,
+        archive: Archive | None = None,
+    ) -> np.ndarray:
+        """조건에 맞는 레코드 (해당 파티션이 있는 블록만 읽는다)"""
+        archive = archive or Archive(self.root)
+        keys = list(self._keys(inst, start, end, bands))
+        wanted = sorted({blk for k in keys for blk in self.blocks.get(k, ())})
+        if not wanted:
+            return np.empty(0, dtype=ARCHIVE_DTYPE)
+        maps = {int(path.stem[4:]): (path, n) for path, n in archive.segment_files()}
+        band_table = _band_tables()
+        lo, hi = day_number(start) * 86400, (day_number(end) + 1) * 86400
+        band_ids = np.array(self._band_ids(inst, bands))
+        out = []
+        for seg_no, blk in wanted:
+            path, n = maps[seg_no]
+            chunk = archive.map_segment(path, n)[blk * BLOCK_RECORDS:(blk + 1) * BLOCK_RECORDS]
+            mask = (chunk["instrument"] == inst.code) & (chunk["ts"] >= lo) & (chunk["ts"] < hi)
+            mask &= np.isin(band_table[inst.code, chunk["total"]], band_ids)
+            if site is not None:
+                mask &= chunk["site"] == site
+            out.append(chunk[mask])
+        return np.concatenate(out)
+
+
+def _unpack_part(key: int) -> PartKey:
+    return (key >> 24, (key >> 4) & 0xFFFFF, key & 0xF)
+
+
+def _parse_day(text: str) -> date:
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="결과 아카이브 파티션 색인")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="색인 생성/증분 갱신")
+    p_build.add_argument("root")
+    p_count = sub.add_parser("count", help="기간·구간·기관별 건수")
+    p_count.add_argument("root")
+    p_count.add_argument("--from", dest="start", type=_parse_day, default=None)
+    p_count.add_argument("--to", dest="end", type=_parse_day, default=None)
+    p_count.add_argument("--band", action="append", default=None)
+    p_count.add_argument("--site", type=int, default=None)
+    p_count.add_argument("--instrument", default=PHQ9.id)
+    args = parser.parse_args()
+
+    index = PartitionIndex.load(args.root)
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        added = index.update()
+        index.save()
+        print(f"indexed {added:,} new records in {(time.perf_counter() - t0):.2f} s")
+        return
+    end = args.end or date.today()
+    start = args.start or end - timedelta(days=6)
+    t0 = time.perf_counter()
+    n = index.count(start, end, args.band, args.site, load_instrument(args.instrument))
+    print(f"{n:,}  ({(time.perf_counter() - t0) * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""선언적 검사 명세(instruments/*.json) → 채점용 조회표로 한 번만 컴파일
+
+명세 필드
+  id, code          문자열 식별자와 결과 토큰에 들어가는 1바이트 코드(고정값)
+  title, name       짧은/긴 표시 이름,  construct  해석 문구에 쓰이는 구인("우울", "불안")
+  options           선택지 라벨. 인덱스가 곧 점수(0부터)
+  items             [{"no", "ko", "domain"}]
+  bands             총점 구간 [{"label", "min", "max", "color", "pill", "arc", "guidance"}]
+  domains           영역 점수 [{"key", "name", "desc", "items"(1-based)}]
+  safety_item       안전 안내를 띄우는 문항 번호(없으면 null)
+  functional        기능 손상 선택지(없으면 null),  citation  결과지 하단 출처 문구
+  irt               보정된 등급반응모형 모수 {"a": [문항별], "b": [[경계값…]]} (선택, phq_irt).
+                    있을 때만 θ를 계산·표시한다. 보정되지 않은 예시 모수(instruments/examples/)는
+                    명세에 넣지 않고 with_irt_params로 명시적으로 붙인다(CLI --irt-params).
+  missing_policy    미응답 처리 "zero"(0점, 기본) | "prorate"(응답 문항 평균으로 비례 환산),
+                    ":N"을 붙이면 미응답 N개 초과 시 무효(총점 없음). 예: "prorate:2"
+
+컴파일된 CompiledInstrument는 요청마다 명세를 해석하지 않도록 총점별 구간표,
+문항 인덱스 튜플 등을 미리 만들어 둔다. spec_hash는 명세 내용의 해시로, 캐시 키에 함께 쓴다.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+SPEC_DIR = Path(__file__).resolve().parent / "instruments"
+
+MISSING_METHODS = ("zero", "prorate")
+
+
+class MissingPolicy(NamedTuple):
+    method: str = "zero"
+    max_missing: int | None = None   # 이보다 미응답이 많으면 무효
+
+    def __str__(self) -> str:
+        return self.method if self.max_missing is None else f"{self.method}:{self.max_missing}"
+
+
+def parse_missing_policy(text: str) -> MissingPolicy:
+    """"zero", "prorate:2" 같은 문자열 → MissingPolicy. 형식 오류는 ValueError"""
+    method, _, limit = text.strip().partition(":")
+    if method not in MISSING_METHODS or (limit and not limit.isdigit()):
+        raise ValueError(f"bad missing policy {text!r} (expected zero|prorate[:N])")
+    return MissingPolicy(method, int(limit) if limit else None)
+
+
+@dataclass(frozen=True, eq=False)  # 식별자 기준 해시: 컴파일 결과를 캐시 키로 쓴다
+class CompiledInstrument:
+    id: str
+    code: int
+    spec_hash: str
+    title: str
+    name: str
+    construct: str
+    period: str
+    questions: List[Dict[str, object]]
+    labels: List[str]
+    label2score: Dict[str, int]
+    n_items: int
+    max_total: int
+    band_labels: Tuple[str, ...]
+    band_cuts: Tuple[int, ...]              # 두 번째 구간부터의 시작 점수
+    band_by_total: Tuple[int, ...]          # 총점 → 구간 인덱스
+    severity_by_total: Tuple[str, ...]      # 총점 → 구간 라벨
+    segments: List[Dict[str, object]]       # SEVERITY_SEGMENTS 형식
+    pill: Dict[str, Tuple[str, str]]
+    arc_color: Dict[str, str]
+    guidance: Dict[str, str]
+    domain_meta: List[Dict[str, object]]    # DOMAIN_META 형식 (max 포함)
+    domain_index: Tuple[Tuple[str, Tuple[int, ...]], ...]  # (key, 0-based 문항 인덱스)
+    safety_item: int | None
+    functional_options: List[str] | None
+    citation: str
+    irt: Tuple[Tuple[float, ...], Tuple[Tuple[float, ...], ...]] | None   # (a, b) 등급반응모형 모수
+    missing_policy: MissingPolicy
+
+    def severity(self, total: int) -> str:
+        return self.severity_by_total[max(0, min(total, self.max_total))]
+
+
+def spec_hash(spec: Dict[str, object]) -> str:
+    canonical = json.dumps(spec, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def compile_instrument(spec: Dict[str, object]) -> CompiledInstrument:
+    """명세 dict 검증 후 조회표 생성. 형식 오류는 ValueError"""
+    labels = list(spec["options"])
+    items = [dict(q) for q in spec["items"]]
+    n_items = len(items)
+    if [q["no"] for q in items] != list(range(1, n_items + 1)):
+        raise ValueError(f"{spec['id']}: items must be numbered 1..{n_items}")
+    max_total = (len(labels) - 1) * n_items
+
+    bands = spec["bands"]
+    if bands[0]["min"] != 0 or bands[-1]["max"] != max_total or any(
+        a["max"] + 1 != b["min"] for a, b in zip(bands, bands[1:])
+    ):
+        raise ValueError(f"{spec['id']}: bands must tile 0..{max_total} without gaps")
+    band_by_total = tuple(
+        next(k for k, b in enumerate(bands) if b["min"] <= t <= b["max"]) for t in range(max_total + 1)
+    )
+
+    segments = [
+        {
+            "label": b["label"],
+            "display": f"{b['min']}–{b['max']}",
+            "start": b["min"],
+            "end": bands[k + 1]["min"] if k + 1 < len(bands) else max_total,
+            "color": b["color"],
+        }
+        for k, b in enumerate(bands)
+    ]
+    domain_meta = [
+        {
+            "key": d["key"],
+            "name": d["name"],
+            "desc": d["desc"],
+            "items": list(d["items"]),
+            "max": (len(labels) - 1) * len(d["items"]),
+        }
+        for d in spec.get("domains", [])
+    ]
+    for d in domain_meta:
+        if not all(1 <= i <= n_items for i in d["items"]):
+            raise ValueError(f"{spec['id']}: domain {d['key']} refers to unknown items")
+    safety_item = spec.get("safety_item")
+    if safety_item is not None and not 1 <= safety_item <= n_items:
+        raise ValueError(f"{spec['id']}: safety_item out of range")
+    band_labels = tuple(b["label"] for b in bands)
+    irt = _parse_irt(spec["irt"], spec["id"], n_items, len(labels)) if spec.get("irt") is not None else None
+
+    return CompiledInstrument(
+        id=spec["id"],
+        code=int(spec["code"]),
+        spec_hash=spec_hash(spec),
+        title=spec["title"],
+        name=spec["name"],
+        construct=spec["construct"],
+        period=spec["period"],
+        questions=items,
+        labels=labels,
+        label2score={lab: i for i, lab in enumerate(labels)},
+        n_items=n_items,
+        max_total=max_total,
+        band_labels=band_labels,
+        band_cuts=tuple(b["min"] for b in bands[1:]),
+        band_by_total=band_by_total,
+        severity_by_total=tuple(band_labels[k] for k in band_by_total),
+        segments=segments,
+        pill={b["label"]: tuple(b["pill"]) for b in bands},
+        arc_color={b["label"]: b["arc"] for b in bands},
+        guidance={b["label"]: b["guidance"] for b in bands},
+        domain_meta=domain_meta,
+        domain_index=tuple((d["key"], tuple(i - 1 for i in d["items"])) for d in domain_meta),
+        safety_item=safety_item,
+        functional_options=list(spec["functional"]) if spec.get("functional") else None,
+        citation=spec["citation"],
+        irt=irt,
+        missing_policy=parse_missing_policy(spec.get("missing_policy", "zero")),
+    )
+
+
+def _parse_irt(block: Dict, instrument_id: str, n_items: int, n_options: int) -> Tuple:
+    irt = (tuple(map(float, block["a"])), tuple(tuple(map(float, b)) for b in block["b"]))
+    if len(irt[0]) != n_items or len(irt[1]) != n_items or any(
+        len(b) != n_options - 1 or list(b) != sorted(set(b)) for b in irt[1]
+    ):
+        raise ValueError(f"{instrument_id}: irt needs one a and {n_options - 1} increasing b per item")
+    return irt
+
+
+def with_irt_params(inst: CompiledInstrument, path: str | Path) -> CompiledInstrument:
+    """GRM 모수 파일({"a", "b"}, 예: instruments/examples/phq9.irt.json)을 붙인 검사 사본 (분석 CLI용)"""
+    with open(path, encoding="utf-8") as f:
+        block = json.load(f)
+    return replace(inst, irt=_parse_irt(block, inst.id, inst.n_items, len(inst.labels)))
+
+
+@lru_cache(maxsize=None)
+def load_instrument(instrument_id: str) -> CompiledInstrument:
+    if instrument_id not in available_instruments():
+        raise KeyError(f"unknown instrument: {instrument_id}")
+    with (SPEC_DIR / f"{instrument_id}.json").open(encoding="utf-8") as f:
+        return compile_instrument(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def available_instruments() -> Tuple[str, ...]:
+    return tuple(sorted(p.stem for p in SPEC_DIR.glob("*.json")))
+
+
+@lru_cache(maxsize=None)
+def instrument_by_code(code: int) -> CompiledInstrument:
+    for instrument_id in available_instruments():
+        inst = load_instrument(instrument_id)
+        if inst.code == code:
+            return inst
+    raise KeyError(f"unknown instrument code: {code}")
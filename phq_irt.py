@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""등급반응모형(GRM) EAP 잠재 특성 점수 (모든 응답 패턴 사전 계산표)
+
+    python phq_irt.py build            # 점수표를 만들어 캐시에 저장
+    python phq_irt.py lookup 1 2 0 1 0 0 2 1 0 --irt-params instruments/examples/phq9.irt.json
+
+검사 명세의 "irt" 블록(보정된 문항별 변별도 a, 경계 b)으로
+  P(X ≥ k | θ) = 1 / (1 + exp(−a(θ − b_k))),  P(X = k) = P(X ≥ k) − P(X ≥ k+1)
+을 정의하고, 표준정규 사전분포 위 QUAD_POINTS개 구적점에서 사후 평균(EAP)과 사후 SD(SE)를 구한다.
+응답 패턴은 선택지 수^문항 수(PHQ-9은 4^9 = 262,144)개뿐이므로 전부 미리 계산해 두고,
+패턴 번호(= phq_core.pack_scores 값, 문항 1이 최하위 자리)로 O(1) 조회한다.
+
+표는 모수 해시를 키로 프로세스 안(lru_cache)과 디스크(PHQ_IRT_CACHE_DIR, 기본 임시 디렉터리)에
+보관한다. 모수가 바뀌면 해시가 달라져 다음 조회 때 한 번만 다시 만든다.
+명세에 irt가 없으면(기본 배포) θ는 계산하지 않는다. 예시 모수는 CLI의 --irt-params로만 쓴다.
+미응답이 있는 행은 표 대신 응답한 문항만으로 우도를 계산한다(같은 구적점, 같은 사전분포).
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument, with_irt_params
+
+QUAD_POINTS = 61
+QUAD_RANGE = 4.0
+MAX_PATTERNS = 1 << 22   # 이보다 패턴이 많은 검사는 표 없이 행마다 계산
+
+
+class EapTable(NamedTuple):
+    params_hash: str
+    theta: np.ndarray   # (선택지 수^문항 수,) float32, 패턴 번호 순
+    se: np.ndarray
+
+
+@lru_cache(maxsize=None)
+def _nodes() -> Tuple[np.ndarray, np.ndarray]:
+    nodes = np.linspace(-QUAD_RANGE, QUAD_RANGE, QUAD_POINTS)
+    return nodes, np.exp(-0.5 * nodes ** 2)
+
+
+@lru_cache(maxsize=None)
+def params_hash(inst: CompiledInstrument) -> str:
+    """모수·구적 설정이 같으면 같은 값 (점수표 캐시 키)"""
+    if inst.irt is None:
+        raise ValueError(f"{inst.id}: no irt parameters")
+    blob = json.dumps([inst.irt, len(inst.labels), QUAD_POINTS, QUAD_RANGE])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _log_prob(inst: CompiledInstrument) -> np.ndarray:
+    """(문항 수, 선택지 수, 구적점) log P(X = k | θ)"""
+    nodes, _ = _nodes()
+    a = np.asarray(inst.irt[0])[:, None, None]
+    b = np.asarray(inst.irt[1])[:, :, None]
+    at_least = 1.0 / (1.0 + np.exp(-a * (nodes - b)))                   # (문항, 선택지−1, Q)
+    ones = np.ones((inst.n_items, 1, len(nodes)))
+    zeros = np.zeros_like(ones)
+    cum = np.concatenate([ones, at_least, zeros], axis=1)
+    return np.log(np.maximum(cum[:, :-1] - cum[:, 1:], 1e-300))
+
+
+@lru_cache(maxsize=None)
+def _log_prob_with_missing(inst: CompiledInstrument) -> np.ndarray:
+    """_log_prob 뒤에 미응답 열(log 1 = 0)을 붙인 표: 미응답 문항은 우도에 기여하지 않는다."""
+    log_p = _log_prob(inst)
+    return np.concatenate([log_p, np.zeros((inst.n_items, 1, log_p.shape[-1]))], axis=1)
+
+
+def _posterior(loglik: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, Q) 로그 우도 → (EAP, 사후 SD)"""
+    nodes, prior = _nodes()
+    w = np.exp(loglik - loglik.max(axis=1, keepdims=True)) * prior
+    w /= w.sum(axis=1, keepdims=True)
+    theta = w @ nodes
+    se = np.sqrt(np.maximum(w @ nodes ** 2 - theta ** 2, 0.0))
+    return theta, se
+
+
+def _build(inst: CompiledInstrument) -> Tuple[np.ndarray, np.ndarray]:
+    log_p = _log_prob(inst)
+    k, n = len(inst.labels), inst.n_items
+    # 문항 n−1..1의 모든 조합 (마지막에 더한 문항 1이 가장 빨리 바뀌는 자리)
+    rest = log_p[1]
+    for j in range(2, n):
+        rest = (log_p[j][:, None, :] + rest[None, :, :]).reshape(-1, rest.shape[-1])
+    theta = np.empty(k ** n, dtype=np.float32)
+    se = np.empty(k ** n, dtype=np.float32)
+    for c in range(k):   # 문항 1 선택지별로 나눠 계산해 중간 배열을 1/k로
+        t, s = _posterior(rest + log_p[0][c])
+        theta[c::k], se[c::k] = t, s
+    return theta, se
+
+
+def _cache_path(inst: CompiledInstrument, key: str) -> Path:
+    root = os.environ.get("PHQ_IRT_CACHE_DIR") or tempfile.gettempdir()
+    return Path(root) / f"phq_irt_{inst.id}_{key}.npz"
+
+
+@lru_cache(maxsize=None)
+def _table_for(key: str, inst: CompiledInstrument) -> EapTable:
+    path = _cache_path(inst, key)
+    try:
+        with np.load(path) as data:
+            return EapTable(key, data["theta"], data["se"])
+    except (OSError, KeyError, ValueError):
+        pass
+    theta, se = _build(inst)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, theta=theta, se=se)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # 캐시 디렉터리에 쓸 수 없으면 프로세스 안 표만 쓴다
+    return EapTable(key, theta, se)
+
+
+def eap_table(inst: CompiledInstrument = PHQ9) -> EapTable | None:
+    """검사의 EAP 점수표. irt 모수가 없거나 패턴이 너무 많으면 None"""
+    if inst.irt is None or len(inst.labels) ** inst.n_items > MAX_PATTERNS:
+        return None
+    return _table_for(params_hash(inst), inst)
+
+
+def eap_scores(answers: np.ndarray, inst: CompiledInstrument = PHQ9) -> Dict[str, np.ndarray]:
+    """(N, 문항 수) 응답 행렬(미응답 음수) → {"theta", "theta_se"} float32 배열"""
+    answers = np.asarray(answers)
+    k = len(inst.labels)
+    answered = answers >= 0
+    complete = answered.all(axis=1)
+    theta = np.empty(len(answers), dtype=np.float32)
+    se = np.empty(len(answers), dtype=np.float32)
+
+    table = eap_table(inst)
+    if table is not None:
+        weights = k ** np.arange(inst.n_items, dtype=np.int64)
+        idx = answers[complete].astype(np.int64) @ weights
+        theta[complete], se[complete] = table.theta[idx], table.se[idx]
+        rows = np.flatnonzero(~complete)
+    else:
+        rows = np.arange(len(answers))
+
+    if len(rows):
+        log_p = _log_prob_with_missing(inst)
+        cats = np.where(answered[rows], answers[rows], k).astype(np.intp)
+        loglik = log_p[np.arange(inst.n_items), cats].sum(axis=1)
+        t, s = _posterior(loglik)
+        theta[rows], se[rows] = t, s
+    return {"theta": theta, "theta_se": se}
+
+
+def eap_for(scores: Sequence[int], missing: Sequence[bool], inst: CompiledInstrument = PHQ9) -> Tuple[float, float] | None:
+    """결과 하나의 (θ, SE). irt 모수가 없는 검사는 None"""
+    if inst.irt is None:
+        return None
+    table = eap_table(inst) if not any(missing) else None
+    if table is not None:  # 완전 응답은 표 한 칸
+        k = len(inst.labels)
+        idx = sum(int(s) * k ** i for i, s in enumerate(scores))
+        return float(table.theta[idx]), float(table.se[idx])
+    row = np.array([[-1 if m else s for s, m in zip(scores, missing)]], dtype=np.int8)
+    out = eap_scores(row, inst)
+    return float(out["theta"][0]), float(out["theta_se"][0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GRM EAP 점수표")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="점수표를 만들어 캐시에 저장")
+    p_lookup = sub.add_parser("lookup", help="응답 패턴의 θ와 SE (미응답은 -1)")
+    p_lookup.add_argument("answers", nargs="+", type=int)
+    for p in (p_build, p_lookup):
+        p.add_argument("--instrument", default=PHQ9.id)
+        p.add_argument("--irt-params", help="명세 대신 쓸 GRM 모수 JSON (예: instruments/examples/phq9.irt.json)")
+    args = parser.parse_args()
+
+    inst = load_instrument(args.instrument)
+    if args.irt_params:
+        inst = with_irt_params(inst, args.irt_params)
+    if inst.irt is None:
+        parser.error(f"{inst.id}: no calibrated irt parameters in the instrument spec; pass --irt-params")
+    if args.cmd == "build":
+        table = eap_table(inst)
+        print(f"{inst.id}: {len(table.theta):,} patterns → {_cache_path(inst, table.params_hash)}")
+    else:
+        theta, se = eap_for([max(a, 0) for a in args.answers], [a < 0 for a in args.answers], inst)
+        print(f"theta={theta:.3f} se={se:.3f}")
+
+
+if __name__ == "__main__":
+    main()
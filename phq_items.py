@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""코호트 문항 분석: Cronbach α, 교정 문항-총점 상관, 문항 응답 분포, 영역 간 상관
+
+    python phq_items.py results.db --state items.json    # 저장 이후 추가된 결과만 반영
+    python phq_items.py archive/ --workers 4              # 세그먼트를 병렬로 모아 합친다
+
+모든 지표는 합칠 수 있는 충분 통계량(ItemStats)에서 계산한다.
+  n       완전 응답 행 수          sums   문항 점수 합 (문항,)
+  cross   문항 교차곱 합 XᵀX (문항, 문항)   options 선택지별 응답 수 (문항, 선택지 + 미응답)
+모두 정수 합이라 샤드를 어떤 순서로 합쳐도 결과가 정확히 같다. 공분산 Σ = (XᵀX − s sᵀ/n)/(n − 1)에서
+  α = k/(k − 1) · (1 − tr Σ / 1ᵀΣ1),  교정 문항-총점 r_i = corr(x_i, T − x_i),  영역 상관 = WΣWᵀ 정규화
+를 구하므로 원자료는 한 번만 훑는다. α·상관은 완전 응답 행만, 응답 분포는 응답한 문항 모두를 쓴다.
+
+증분 갱신: 상태 파일(--state)에 통계량과 함께 저장소의 마지막 assessments.id 또는 아카이브
+세그먼트별 반영 레코드 수를 기록해, 다음 실행 때 그 뒤의 행만 읽어 더한다(phq_rollup과 같은 방식).
+"""
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument
+from phq_quality import answers_from_rows
+
+CHUNK_ROWS = 1 << 20
+
+
+class ItemStats(NamedTuple):
+    n: int
+    sums: np.ndarray      # (문항,) int64
+    cross: np.ndarray     # (문항, 문항) int64
+    options: np.ndarray   # (문항, 선택지 수 + 1) int64, 마지막 열 = 미응답
+
+
+class ItemAnalysis(NamedTuple):
+    n: int                              # 완전 응답 행 수
+    alpha: float
+    alpha_if_deleted: np.ndarray        # (문항,)
+    item_total_r: np.ndarray            # (문항,) 교정 문항-총점 상관
+    item_mean: np.ndarray
+    item_sd: np.ndarray
+    distribution: np.ndarray            # (문항, 선택지) 응답한 사람 중 비율
+    missing_rate: np.ndarray            # (문항,)
+    domain_keys: Tuple[str, ...]
+    domain_alpha: np.ndarray            # (영역,)
+    domain_corr: np.ndarray             # (영역, 영역)
+
+
+def empty_stats(inst: CompiledInstrument = PHQ9) -> ItemStats:
+    k = inst.n_items
+    return ItemStats(
+        0, np.zeros(k, dtype=np.int64), np.zeros((k, k), dtype=np.int64),
+        np.zeros((k, len(inst.labels) + 1), dtype=np.int64),
+    )
+
+
+def accumulate(answers: np.ndarray, inst: CompiledInstrument = PHQ9) -> ItemStats:
+    """(N, 문항 수) 응답 행렬(미응답 음수) → 통계량. 교차곱은 CHUNK_ROWS행씩 float64 행렬곱(정확한 정수 범위)"""
+    answers = np.asarray(answers)
+    n_opt = len(inst.labels) + 1
+    codes = np.where(answers >= 0, answers, n_opt - 1).astype(np.int64)
+    options = np.bincount(
+        (codes + n_opt * np.arange(inst.n_items)).ravel(), minlength=inst.n_items * n_opt
+    ).reshape(inst.n_items, n_opt)
+    complete = answers[(answers >= 0).all(axis=1)]
+    sums = complete.sum(axis=0, dtype=np.int64)
+    cross = np.zeros((inst.n_items, inst.n_items), dtype=np.int64)
+    for start in range(0, len(complete), CHUNK_ROWS):
+        x = complete[start:start + CHUNK_ROWS].astype(np.float64)
+        cross += np.rint(x.T @ x).astype(np.int64)
+    return ItemStats(len(complete), sums, cross, options)
+
+
+def merge(parts: Iterable[ItemStats]) -> ItemStats:
+    out = None
+    for p in parts:
+        out = p if out is None else ItemStats(
+            out.n + p.n, out.sums + p.sums, out.cross + p.cross, out.options + p.options
+        )
+    return out
+
+
+def _alpha(cov: np.ndarray) -> float:
+    k = len(cov)
+    total_var = cov.sum()
+    if k < 2 or total_var <= 0:
+        return float("nan")
+    return float(k / (k - 1) * (1 - np.trace(cov) / total_var))
+
+
+def analyze(stats: ItemStats, inst: CompiledInstrument = PHQ9) -> ItemAnalysis:
+    """통계량 → 문항 분석 지표. 완전 응답이 2건 미만이면 α·상관은 NaN"""
+    n = stats.n
+    answered = stats.options[:, :-1]
+    n_answered = answered.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        distribution = answered / n_answered[:, None]
+        missing_rate = stats.options[:, -1] / stats.options.sum(axis=1)
+        if n > 1:
+            cov = (stats.cross - np.outer(stats.sums, stats.sums) / n) / (n - 1)
+        else:
+            cov = np.full(stats.cross.shape, np.nan)
+        var = np.diag(cov)
+        row = cov.sum(axis=1)                      # cov(x_i, T)
+        total_var = cov.sum()
+        rest_var = total_var - 2 * row + var       # var(T − x_i)
+        item_total_r = (row - var) / np.sqrt(var * rest_var)
+        k = inst.n_items
+        alpha_if_deleted = (k - 1) / (k - 2) * (1 - (np.trace(cov) - var) / rest_var) if k > 2 else np.full(k, np.nan)
+
+        keys = tuple(key for key, _ in inst.domain_index)
+        w = np.zeros((len(keys), k))
+        for d, (_, idx) in enumerate(inst.domain_index):
+            w[d, list(idx)] = 1
+        dcov = w @ cov @ w.T
+        dsd = np.sqrt(np.diag(dcov))
+        domain_corr = dcov / np.outer(dsd, dsd)
+        domain_alpha = np.array([_alpha(cov[np.ix_(idx, idx)]) for _, idx in inst.domain_index])
+    return ItemAnalysis(
+        n=n,
+        alpha=_alpha(cov) if n > 1 else float("nan"),
+        alpha_if_deleted=alpha_if_deleted,
+        item_total_r=item_total_r,
+        item_mean=stats.sums / n if n else np.full(inst.n_items, np.nan),
+        item_sd=np.sqrt(var),
+        distribution=distribution,
+        missing_rate=missing_rate,
+        domain_keys=keys,
+        domain_alpha=domain_alpha,
+        domain_corr=domain_corr,
+    )
+
+
+def _answers_from_packed(packed: np.ndarray, mask: np.ndarray, inst: CompiledInstrument) -> np.ndarray:
+    rows = np.empty(len(packed), dtype=[("answers", "<u4"), ("missing", "<u2")])
+    rows["answers"], rows["missing"] = packed, mask
+    return answers_from_rows(rows, inst)
+
+
+def _segment_part(path: str, start: int, stop: int, instrument_id: str) -> ItemStats:
+    """아카이브 세그먼트의 [start, stop) 레코드 통계량 (프로세스 풀 작업 단위)"""
+    from phq_archive import Archive
+
+    inst = load_instrument(instrument_id)
+    seg = Archive.map_segment(Path(path), stop)[start:]
+    seg = seg[seg["instrument"] == inst.code]
+    return accumulate(answers_from_rows(seg, inst), inst)
+
+
+class ItemAccumulator:
+    """검사 하나의 누적 통계량과 반영 위치(저장소 last_id, 아카이브 세그먼트별 레코드 수)"""
+
+    def __init__(self, inst: CompiledInstrument = PHQ9, path: str | Path | None = None):
+        self.inst = inst
+        self.path = Path(path) if path else None
+        self.stats = empty_stats(inst)
+        self.last_id = 0
+        self.segments: Dict[str, int] = {}
+
+    def add(self, answers: np.ndarray) -> None:
+        self.stats = merge([self.stats, accumulate(answers, self.inst)])
+
+    def catch_up_store(self, conn, chunk: int = 100_000) -> int:
+        """id > last_id 인 이 검사의 결과만 반영하고 건수를 돌려준다."""
+        added = 0
+        while True:
+            # +instrument: 검사 인덱스 대신 기본 키 범위로 훑게 한다 (인덱스를 쓰면 청크마다 전체를 정렬)
+            rows = conn.execute(
+                "SELECT id, scores, missing_mask FROM assessments WHERE id > ? AND +instrument = ? ORDER BY id LIMIT ?",
+                (self.last_id, self.inst.id, chunk),
+            ).fetchall()
+            if not rows:
+                return added
+            data = np.array(rows, dtype=np.int64)
+            self.add(_answers_from_packed(data[:, 1], data[:, 2], self.inst))
+            self.last_id = int(data[-1, 0])
+            added += len(rows)
+
+    def catch_up_archive(self, root: str | Path, workers: int = 1) -> int:
+        """세그먼트마다 지난번 이후 덧붙은 레코드만 모아(workers > 1이면 프로세스 병렬) 합친다."""
+        from phq_archive import Archive
+
+        jobs = []
+        for path, n in Archive(root).segment_files():
+            done = self.segments.get(path.name, 0)
+            if n > done:
+                jobs.append((str(path), done, n))
+        if not jobs:
+            return 0
+        paths, starts, stops = zip(*jobs)
+        ids = [self.inst.id] * len(jobs)
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+                parts = list(pool.map(_segment_part, paths, starts, stops, ids))
+        else:
+            parts = list(map(_segment_part, paths, starts, stops, ids))
+        before = int(self.stats.options[0].sum())
+        self.stats = merge([self.stats, *parts])
+        for path, _, n in jobs:
+            self.segments[Path(path).name] = n
+        return int(self.stats.options[0].sum()) - before
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "instrument": self.inst.id,
+            "last_id": self.last_id,
+            "segments": self.segments,
+            "n": self.stats.n,
+            "sums": self.stats.sums.tolist(),
+            "cross": self.stats.cross.tolist(),
+            "options": self.stats.options.tolist(),
+        }
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        tmp.replace(self.path)
+
+    @classmethod
+    def load(cls, path: str | Path, inst: CompiledInstrument = PHQ9) -> "ItemAccumulator":
+        acc = cls(inst, path)
+        if acc.path.exists():
+            with acc.path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            if data["instrument"] != inst.id:
+                raise ValueError(f"{path}: state is for {data['instrument']}, not {inst.id}")
+            acc.last_id = data["last_id"]
+            acc.segments = dict(data["segments"])
+            acc.stats = ItemStats(
+                data["n"], np.array(data["sums"], dtype=np.int64), np.array(data["cross"], dtype=np.int64),
+                np.array(data["options"], dtype=np.int64),
+            )
+        return acc
+
+
+def _print_report(result: ItemAnalysis, inst: CompiledInstrument) -> None:
+    print(f"{inst.id}: {result.n:,} complete responses, Cronbach α = {result.alpha:.3f}")
+    opts = " ".join(f"{f'p{k}':>6}" for k in range(len(inst.labels)))
+    print(f"{'item':>5} {'mean':>6} {'sd':>6} {'r_it':>6} {'α−i':>6} {opts} {'miss':>6}")
+    for i, q in enumerate(inst.questions):
+        dist = " ".join(f"{p:6.3f}" for p in result.distribution[i])
+        print(
+            f"{q['no']:>5} {result.item_mean[i]:6.2f} {result.item_sd[i]:6.2f} {result.item_total_r[i]:6.3f} "
+            f"{result.alpha_if_deleted[i]:6.3f} {dist} {result.missing_rate[i]:6.3f}"
+        )
+    if result.domain_keys:
+        print("domains")
+        for d, key in enumerate(result.domain_keys):
+            corr = " ".join(f"{c:6.3f}" for c in result.domain_corr[d])
+            print(f"  {key:<10} α={result.domain_alpha[d]:.3f}  r: {corr}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="코호트 문항 분석 (α, 문항-총점 상관, 응답 분포, 영역 상관)")
+    parser.add_argument("source", help="phq_store SQLite 파일 또는 phq_archive 디렉터리")
+    parser.add_argument("--instrument", default=PHQ9.id)
+    parser.add_argument("--state", help="누적 통계량 JSON (있으면 이후 추가분만 반영하고 갱신)")
+    parser.add_argument("--workers", type=int, default=1, help="아카이브 세그먼트 병렬 작업자 수")
+    args = parser.parse_args()
+
+    inst = load_instrument(args.instrument)
+    acc = ItemAccumulator.load(args.state, inst) if args.state else ItemAccumulator(inst)
+    if Path(args.source).is_dir():
+        added = acc.catch_up_archive(args.source, args.workers)
+    else:
+        from phq_store import connect
+
+        conn = connect(args.source)
+        added = acc.catch_up_store(conn)
+        conn.close()
+    acc.save()
+    print(f"added {added:,} rows")
+    _print_report(analyze(acc.stats, inst), inst)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""규준 참조 백분위·T점수 (사전 계산 누적 분포표)
+
+    python phq_norms.py                       # 규준 집단별 총점 → 백분위/T 표
+    python phq_norms.py --group female --scale somatic
+    python phq_norms.py --norms-file norms/examples/phq9.json
+
+규준 자료는 norms/<검사 id>.json의 집단별 점수 빈도표(총점 0..최대, 영역 점수 0..영역 최대)다.
+norms/에는 실제 규준 표본의 빈도표만 둔다. 파일이 없으면 결과 화면에 규준 비교를 띄우지 않는다.
+norms/examples/의 예시 빈도표는 적재 경로 밖에 있어 CLI의 --norms-file로만 쓴다.
+  {"default": "all", "groups": {"all": {"label": "전체", "n": 5000, "freq": {"total": [...], "somatic": [...]}}}}
+적재할 때 집단·척도마다 한 번
+  백분위  = 100 · (F(x − 1) + f(x) / 2) / N          (중간 순위 백분위)
+  T점수   = 50 + 10 · Φ⁻¹(백분위 / 100)              (정규화 T, 0.1–99.9 백분위로 자름)
+를 점수 길이의 배열로 만들어 두므로, 조회는 점수를 인덱스로 쓰는 배열 읽기 하나다(행렬도 같은 방식).
+"""
+import argparse
+import json
+from functools import lru_cache
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument
+
+NORM_DIR = Path(__file__).resolve().parent / "norms"
+PERCENTILE_CLIP = (0.1, 99.9)
+
+
+class NormGroup(NamedTuple):
+    id: str
+    label: str
+    n: int
+    percentile: Dict[str, np.ndarray]   # 척도 → (점수 범위,) float32
+    t_score: Dict[str, np.ndarray]
+
+
+class NormSet(NamedTuple):
+    instrument: str
+    source: str
+    default: str
+    groups: Dict[str, NormGroup]
+
+
+class NormScore(NamedTuple):
+    scale: str
+    score: int
+    percentile: float
+    t_score: float
+
+
+def _scale_ranges(inst: CompiledInstrument) -> Dict[str, int]:
+    top = len(inst.labels) - 1
+    ranges = {"total": inst.max_total}
+    ranges.update({key: top * len(idx) for key, idx in inst.domain_index})
+    return ranges
+
+
+def _compile_scale(freq: List[int]) -> tuple:
+    f = np.asarray(freq, dtype=np.float64)
+    n = f.sum()
+    pct = 100.0 * (np.cumsum(f) - f / 2) / n
+    z = NormalDist().inv_cdf
+    t = [50.0 + 10.0 * z(p / 100.0) for p in np.clip(pct, *PERCENTILE_CLIP)]
+    return pct.astype(np.float32), np.asarray(t, dtype=np.float32)
+
+
+def compile_norms(spec: Dict[str, object], inst: CompiledInstrument) -> NormSet:
+    """규준 JSON → 집단·척도별 백분위/T 배열. 척도 길이가 검사와 맞지 않으면 ValueError"""
+    ranges = _scale_ranges(inst)
+    groups = {}
+    for gid, g in spec["groups"].items():
+        percentile, t_score = {}, {}
+        for scale, freq in g["freq"].items():
+            if scale not in ranges:
+                raise ValueError(f"{inst.id} norms/{gid}: unknown scale {scale!r}")
+            if len(freq) != ranges[scale] + 1 or sum(freq) <= 0:
+                raise ValueError(f"{inst.id} norms/{gid}: {scale} needs {ranges[scale] + 1} counts")
+            percentile[scale], t_score[scale] = _compile_scale(freq)
+        groups[gid] = NormGroup(gid, g.get("label", gid), int(g.get("n", sum(g["freq"]["total"]))), percentile, t_score)
+    default = spec.get("default", next(iter(groups)))
+    if default not in groups:
+        raise ValueError(f"{inst.id} norms: default group {default!r} not defined")
+    return NormSet(inst.id, spec.get("source", ""), default, groups)
+
+
+def read_norms(path: str | Path, inst: CompiledInstrument = PHQ9) -> NormSet:
+    with open(path, encoding="utf-8") as f:
+        return compile_norms(json.load(f), inst)
+
+
+@lru_cache(maxsize=None)
+def load_norms(inst: CompiledInstrument = PHQ9) -> NormSet | None:
+    """검사의 규준표 (norms/<id>.json이 없으면 None). 검사별로 한 번만 컴파일한다."""
+    path = NORM_DIR / f"{inst.id}.json"
+    return read_norms(path, inst) if path.exists() else None
+
+
+def _group(norms: NormSet, group: str | None) -> NormGroup:
+    try:
+        return norms.groups[group or norms.default]
+    except KeyError:
+        raise KeyError(f"{norms.instrument}: unknown norm group {group!r}") from None
+
+
+def lookup(scores: Dict[str, int], inst: CompiledInstrument = PHQ9, group: str | None = None) -> List[NormScore]:
+    """{"total": 총점, 영역 키: 점수} → 규준이 있는 척도의 (백분위, T) 목록. 규준이 없으면 빈 목록"""
+    norms = load_norms(inst)
+    if norms is None:
+        return []
+    g = _group(norms, group)
+    return [
+        NormScore(scale, score, float(g.percentile[scale][score]), float(g.t_score[scale][score]))
+        for scale, score in scores.items()
+        if scale in g.percentile
+    ]
+
+
+def norm_columns(scored: Dict[str, np.ndarray], inst: CompiledInstrument = PHQ9, group: str | None = None) -> Dict[str, np.ndarray]:
+    """phq_vector.score_matrix 결과 → {"<척도>_percentile", "<척도>_t"} 열 (배열 인덱싱만, 무효 행 총점은 NaN)"""
+    norms = load_norms(inst)
+    if norms is None:
+        return {}
+    g = _group(norms, group)
+    out = {}
+    for scale, pct in g.percentile.items():
+        if scale in scored:
+            out[f"{scale}_percentile"] = pct[scored[scale]]
+            out[f"{scale}_t"] = g.t_score[scale][scored[scale]]
+    if "valid" in scored and "total_percentile" in out:  # 미응답 초과로 총점이 없는 행
+        out["total_percentile"] = np.where(scored["valid"], out["total_percentile"], np.nan)
+        out["total_t"] = np.where(scored["valid"], out["total_t"], np.nan)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="규준 백분위/T점수 표")
+    parser.add_argument("--instrument", default=PHQ9.id)
+    parser.add_argument("--group", default=None, help="규준 집단 id (기본: 규준 파일의 default)")
+    parser.add_argument("--scale", default="total")
+    parser.add_argument("--norms-file", help="norms/ 대신 읽을 빈도표 JSON (예: norms/examples/phq9.json)")
+    args = parser.parse_args()
+
+    inst = load_instrument(args.instrument)
+    norms = read_norms(args.norms_file, inst) if args.norms_file else load_norms(inst)
+    if norms is None:
+        parser.error(f"no norms file for {inst.id} in {NORM_DIR}; pass --norms-file")
+    if norms.source:
+        print(norms.source)
+    g = _group(norms, args.group)
+    print(f"{inst.id} · {g.label} (n={g.n:,}) · {args.scale}")
+    print(f"{'score':>5} {'pct':>6} {'T':>5}")
+    for score, (p, t) in enumerate(zip(g.percentile[args.scale], g.t_score[args.scale])):
+        print(f"{score:>5} {p:>6.1f} {t:>5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""pandas DataFrame 채점 접근자 (노트북 분석용, streamlit 비의존)
+
+    import phq_pandas                                   # 검사 id별 접근자 등록: df.phq9, df.gad7, df.phq2
+    scored = df.phq9.score()                            # 문항 열 기본값 item1..item9 (phq_export/phq_synth 열 이름)
+    scored = df.phq9.score(item_cols=[f"q{i}" for i in range(1, 10)], policy="zero")
+    df = df.join(scored)
+
+문항 열은 점수(0–3 정수, 실수형 NaN·nullable 정수의 NA는 미응답) 또는 LABELS 선택지 문자열
+(범주형 포함, None/NaN은 미응답)이다. 열을 응답 행렬로 바꾼 뒤 phq_vector.score_matrix(앱과 같은 채점
+규칙)를 그대로 쓰므로 행 단위 apply가 없다. 결과 열:
+  total      총점 (UInt8, 미응답 초과로 무효면 <NA>)
+  severity   구간 (순서 있는 범주형, SEVERITY_SEGMENTS 순서, 무효면 NaN)
+  영역 키    영역 점수 (somatic, cog_aff 등, 미응답 0점 합 — 비례 환산하지 않음)
+  item9_flag 안전 문항 양성, unanswered, valid, prorated(총점 비례 환산 여부), quality(phq_quality 비트),
+             theta/theta_se(irt 모수가 있는 검사)
+pandas는 requirements에 없다(분석 환경 전용). 이 모듈을 가져올 때만 필요하다.
+"""
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, available_instruments, load_instrument, parse_missing_policy
+from phq_vector import score_matrix
+
+
+def severity_dtype(inst: CompiledInstrument = PHQ9) -> pd.CategoricalDtype:
+    """구간 라벨의 순서 있는 범주형 (SEVERITY_SEGMENTS 순서이므로 비교·정렬이 심각도 순)"""
+    return pd.CategoricalDtype(inst.band_labels, ordered=True)
+
+
+def _column_codes(col: pd.Series, inst: CompiledInstrument) -> np.ndarray:
+    """문항 열 → 선택지 인덱스 int8 (미응답 −1). 범위 밖 점수·모르는 라벨은 ValueError"""
+    top = len(inst.labels) - 1
+    if pd.api.types.is_numeric_dtype(col.dtype) and not isinstance(col.dtype, pd.CategoricalDtype):
+        values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+        missing = np.isnan(values)
+        bad = ~missing & ((values != np.round(values)) | (values < 0) | (values > top))
+        codes = np.where(missing | bad, -1, values).astype(np.int8)
+    else:
+        codes = pd.Index(inst.labels).get_indexer(col.astype(object)).astype(np.int8)
+        bad = (codes < 0) & col.notna().to_numpy()
+    if bad.any():
+        examples = col[bad].unique()[:3].tolist()
+        raise ValueError(f"{col.name}: expected 0–{top} or one of LABELS, got {examples}")
+    return codes
+
+
+class PhqAccessor:
+    """df.<검사 id> 접근자. 검사는 등록할 때 정해진다(_inst)."""
+
+    _inst: CompiledInstrument = PHQ9
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+
+    def _item_cols(self, item_cols: Sequence[str] | None) -> list:
+        inst = self._inst
+        cols = list(item_cols) if item_cols is not None else [f"item{q['no']}" for q in inst.questions]
+        if len(cols) != inst.n_items:
+            raise ValueError(f"{inst.id}: expected {inst.n_items} item columns, got {len(cols)}")
+        absent = [c for c in cols if c not in self._df.columns]
+        if absent:
+            raise KeyError(f"{inst.id}: missing item columns {absent}")
+        return cols
+
+    def answers(self, item_cols: Sequence[str] | None = None) -> np.ndarray:
+        """(행, 문항 수) int8 응답 행렬 (미응답 −1, phq_vector 입력 형식)"""
+        cols = self._item_cols(item_cols)
+        out = np.empty((len(self._df), len(cols)), dtype=np.int8)
+        for i, c in enumerate(cols):
+            out[:, i] = _column_codes(self._df[c], self._inst)
+        return out
+
+    def score(self, item_cols: Sequence[str] | None = None, policy: str | None = None) -> pd.DataFrame:
+        """문항 열 채점 결과 DataFrame (원본과 같은 인덱스). policy는 "zero", "prorate:2" 같은 미응답 규칙"""
+        inst = self._inst
+        scored = score_matrix(self.answers(item_cols), inst, parse_missing_policy(policy) if policy else None)
+        valid = scored["valid"]
+        codes = np.where(valid, scored["severity_code"].astype(np.int8), -1)
+        out = {
+            "total": pd.arrays.IntegerArray(scored["total"].astype(np.uint8), ~valid),
+            "severity": pd.Categorical.from_codes(codes, dtype=severity_dtype(inst)),
+        }
+        out.update({key: scored[key] for key, _ in inst.domain_index})
+        if inst.safety_item is not None:
+            key = f"item{inst.safety_item}_flag"
+            out[key] = scored[key]
+        for key in ("unanswered", "valid", "prorated", "quality", "theta", "theta_se"):
+            if key in scored:
+                out[key] = scored[key]
+        return pd.DataFrame(out, index=self._df.index)
+
+
+def _register(inst: CompiledInstrument) -> None:
+    accessor = type(f"{inst.id.upper()}Accessor", (PhqAccessor,), {"_inst": inst})
+    pd.api.extensions.register_dataframe_accessor(inst.id)(accessor)
+
+
+for _instrument_id in available_instruments():
+    _register(load_instrument(_instrument_id))
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""부주의 응답·자료 품질 점검 (응답 행렬 단위 벡터 연산)
+
+    python phq_quality.py results.db             # 저장소 결과의 품질 플래그 집계
+    python phq_quality.py archive/ --instrument gad7 --guttman-max 0.4
+
+행마다 아래 조건을 비트 플래그(uint8)로 표시한다. 판정은 모두 열 단위 NumPy 연산이라
+행 수만큼 파이썬 반복을 돌지 않는다. 미응답이 없는 행의 연속 길이·Guttman 오류는 가능한 모든
+응답 패턴(PHQ-9 4^9개)에 대해 한 번 계산해 둔 표를 패턴 번호로 읽는다.
+  longstring   같은 응답이 연속 longstring_run문항 이상 (미응답은 연속을 끊는다, 기본은 0점 연속 제외)
+  guttman      문항 단계(x ≥ k)를 쉬운 순으로 놓았을 때, 쉬운 단계는 실패하고 어려운 단계는 통과한
+               쌍의 수(Guttman 오류)를 r·(S − r)로 나눈 값이 guttman_max 초과 (r 통과 단계 수, S 전체 단계 수).
+               단계 순서는 같은 검사 자료에서 관측한 단계 통과율 순(step_order)이고, 절단값은 자료마다
+               분포를 보고 정한다. 기본은 판정하지 않는다(guttman_max·step_order를 둘 다 줄 때만).
+  functional   기능 손상 응답에 비해 총점이 지나치게 낮음 (예: "매우 어려움"인데 총점 0)
+  too_fast     문항당 응답 시간이 min_seconds_per_item 미만 (응답 시간을 넘긴 경우만)
+"""
+import argparse
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument
+
+LONGSTRING = 1
+GUTTMAN = 2
+FUNCTIONAL = 4
+TOO_FAST = 8
+FLAG_NAMES = {LONGSTRING: "longstring", GUTTMAN: "guttman", FUNCTIONAL: "functional", TOO_FAST: "too_fast"}
+
+CHUNK_ROWS = 1 << 18   # Guttman 단계 행렬(행 × 단계 bool)을 이 크기씩 만든다
+MAX_PATTERNS = 1 << 20  # 이보다 패턴이 많은 검사는 표 없이 행마다 계산
+
+
+class QualityParams(NamedTuple):
+    longstring_run: int | None = None       # None이면 문항 수 (전 문항 같은 응답)
+    longstring_skip_zero: bool = True       # 증상 없음(0점) 연속은 정상 응답으로 본다
+    guttman_max: float | None = None        # None이면 Guttman 판정 안 함
+    step_order: Tuple[Tuple[int, int], ...] | None = None   # 쉬운 단계부터 (문항 인덱스, k), step_order()
+    min_answered: int = 5                   # 응답 문항이 이보다 적으면(PHQ-2 등) 응답 패턴 판정 안 함
+    functional_min_total: Sequence[int] = (0, 0, 1, 3)   # 기능 손상 선택지별 최소 그럴듯한 총점
+    min_seconds_per_item: float = 1.0
+
+
+def flag_names(bits: int) -> List[str]:
+    return [name for bit, name in FLAG_NAMES.items() if bits & bit]
+
+
+def step_order(answers: np.ndarray, inst: CompiledInstrument = PHQ9) -> Tuple[Tuple[int, int], ...]:
+    """관측 자료의 단계(x ≥ k) 통과율이 높은 순(쉬운 단계부터)의 (문항 인덱스, k). 미응답은 분모에서 뺀다."""
+    answers = np.asarray(answers)
+    answered = np.maximum((answers >= 0).sum(axis=0), 1)
+    rates = [
+        (-float((answers[:, i] >= k).sum() / answered[i]), i, k)
+        for i in range(inst.n_items)
+        for k in range(1, len(inst.labels))
+    ]
+    return tuple((i, k) for _, i, k in sorted(rates))
+
+
+def longstring(answers: np.ndarray, skip_zero: bool = True) -> np.ndarray:
+    """행별 같은 응답의 최장 연속 길이 (uint8). 미응답과 (skip_zero면) 0점은 연속을 이루지 않는다."""
+    valid = answers > 0 if skip_zero else answers >= 0
+    run = valid[:, 0].astype(np.uint8)
+    best = run.copy()
+    for j in range(1, answers.shape[1]):
+        same = valid[:, j] & (answers[:, j] == answers[:, j - 1]) & valid[:, j - 1]
+        run = np.where(same, run + 1, valid[:, j]).astype(np.uint8)
+        np.maximum(best, run, out=best)
+    return best
+
+
+def guttman_errors(answers: np.ndarray, order: Sequence[Tuple[int, int]] | None) -> np.ndarray:
+    """행별 정규화 Guttman 오류 (0–1, float32). 단계 순서(step_order)가 없으면 NaN"""
+    out = np.full(len(answers), np.nan, dtype=np.float32)
+    if order is None:
+        return out
+    order = np.asarray(order, dtype=np.intp)
+    for start in range(0, len(answers), CHUNK_ROWS):
+        part = answers[start:start + CHUNK_ROWS]
+        x = part[:, order[:, 0]]                      # (행, 단계) 해당 문항 응답
+        answered = x >= 0
+        passed = x >= order[:, 1]
+        failed = answered & ~passed
+        fails_before = np.cumsum(failed, axis=1, dtype=np.int16) - failed
+        errors = (fails_before * passed).sum(axis=1, dtype=np.int32)
+        r = passed.sum(axis=1, dtype=np.int32)
+        s = answered.sum(axis=1, dtype=np.int32)
+        denom = r * (s - r)
+        out[start:start + len(part)] = np.where(denom > 0, errors / np.maximum(denom, 1), 0.0)
+    return out
+
+
+@lru_cache(maxsize=None)
+def _pattern_tables(inst: CompiledInstrument, skip_zero: bool, order: Tuple[Tuple[int, int], ...] | None) -> tuple | None:
+    """모든 완전 응답 패턴의 (최장 연속, Guttman 오류). 패턴 번호는 phq_core.pack_scores와 같은 자리"""
+    k, n = len(inst.labels), inst.n_items
+    if k ** n > MAX_PATTERNS:
+        return None
+    patterns = (np.arange(k ** n)[:, None] // k ** np.arange(n)) % k
+    patterns = patterns.astype(np.int8)
+    return longstring(patterns, skip_zero), guttman_errors(patterns, order)
+
+
+def _run_and_guttman(answers: np.ndarray, inst: CompiledInstrument, skip_zero: bool, order: tuple | None) -> tuple:
+    tables = _pattern_tables(inst, skip_zero, order)
+    if tables is None:
+        return longstring(answers, skip_zero), guttman_errors(answers, order)
+    k = len(inst.labels)
+    complete = (answers >= 0).all(axis=1)
+    idx = np.where(complete[:, None], answers, 0).astype(np.int32) @ (k ** np.arange(inst.n_items, dtype=np.int32))
+    run, g = tables[0][idx], tables[1][idx]
+    rest = np.flatnonzero(~complete)
+    if len(rest):
+        run[rest] = longstring(answers[rest], skip_zero)
+        g[rest] = guttman_errors(answers[rest], order)
+    return run, g
+
+
+def quality_flags(
+    answers: np.ndarray,
+    inst: CompiledInstrument = PHQ9,
+    total: np.ndarray | None = None,
+    functional: np.ndarray | None = None,
+    seconds: np.ndarray | None = None,
+    params: QualityParams = QualityParams(),
+) -> Dict[str, np.ndarray]:
+    """(N, 문항 수) 응답 행렬(미응답 음수) → {"quality" 비트, "longstring", "guttman"}
+
+    total      채점 총점 (없으면 미응답 0점 합). functional 점검에 쓴다.
+    functional 기능 손상 코드 (0 = 응답 없음, 1.. = 선택지 순서, phq_archive와 같은 부호화)
+    seconds    제출까지 걸린 시간(초), 모르면 NaN
+    """
+    answers = np.asarray(answers)
+    run_limit = params.longstring_run or inst.n_items
+    run, g = _run_and_guttman(answers, inst, params.longstring_skip_zero, _guttman_order(params))
+    enough = (answers >= 0).sum(axis=1) >= params.min_answered
+    flags = np.where(enough & (run >= run_limit), LONGSTRING, 0).astype(np.uint8)
+    if params.guttman_max is not None:
+        flags |= np.where(enough & (g > params.guttman_max), GUTTMAN, 0).astype(np.uint8)
+
+    if functional is not None and inst.functional_options:
+        if total is None:
+            total = np.where(answers >= 0, answers, 0).sum(axis=1)
+        min_total = np.asarray((0, *params.functional_min_total), dtype=np.int16)
+        code = np.clip(np.asarray(functional, dtype=np.intp), 0, len(min_total) - 1)
+        flags |= np.where(np.asarray(total) < min_total[code], FUNCTIONAL, 0).astype(np.uint8)
+    if seconds is not None:
+        fast = np.asarray(seconds, dtype=np.float64) < params.min_seconds_per_item * inst.n_items  # NaN은 False
+        flags |= np.where(fast, TOO_FAST, 0).astype(np.uint8)
+    return {"quality": flags, "longstring": run, "guttman": g}
+
+
+def _guttman_order(params: QualityParams) -> Tuple[Tuple[int, int], ...] | None:
+    return params.step_order if params.guttman_max is not None else None
+
+
+def row_flags(answers: Sequence[int | None], inst: CompiledInstrument = PHQ9, params: QualityParams = QualityParams()) -> int:
+    """응답 하나(미응답 None)의 응답 기반 플래그 비트. 완전 응답은 패턴 표 한 칸만 읽는다."""
+    tables = _pattern_tables(inst, params.longstring_skip_zero, _guttman_order(params))
+    if inst.n_items < params.min_answered:
+        return 0
+    if tables is None or any(a is None for a in answers):
+        row = np.array([[-1 if a is None else a for a in answers]], dtype=np.int8)
+        return int(quality_flags(row, inst, params=params)["quality"][0])
+    k = len(inst.labels)
+    idx = sum(a * k ** i for i, a in enumerate(answers))
+    flags = LONGSTRING if tables[0][idx] >= (params.longstring_run or inst.n_items) else 0
+    if params.guttman_max is not None and tables[1][idx] > params.guttman_max:
+        flags |= GUTTMAN
+    return flags
+
+
+def summarize(flags: np.ndarray) -> Dict[str, int]:
+    """플래그별 건수 + 하나 이상 걸린 건수"""
+    out = {name: int(np.count_nonzero(flags & bit)) for bit, name in FLAG_NAMES.items()}
+    out["any"] = int(np.count_nonzero(flags))
+    return out
+
+
+def _load_rows(source: str, inst: CompiledInstrument) -> np.ndarray:
+    """아카이브 디렉터리 또는 저장소 SQLite → 아카이브 레코드 배열 (해당 검사만)"""
+    if Path(source).is_dir():
+        from phq_archive import Archive
+
+        parts = [seg[seg["instrument"] == inst.code] for seg in Archive(source).segments()]
+        return np.concatenate(parts) if parts else np.empty(0)
+    from phq_archive import rows_from_records
+    from phq_store import AssessmentRecord, connect
+
+    conn = connect(source)
+    cols = ", ".join(AssessmentRecord._fields)
+    rows = conn.execute(f"SELECT {cols} FROM assessments WHERE instrument = ?", (inst.id,)).fetchall()
+    conn.close()
+    return rows_from_records(AssessmentRecord(*r) for r in rows)
+
+
+def answers_from_rows(rows: np.ndarray, inst: CompiledInstrument = PHQ9) -> np.ndarray:
+    """아카이브 레코드 배열 → (N, 문항 수) int8 응답 행렬 (미응답 −1)"""
+    answers = np.empty((len(rows), inst.n_items), dtype=np.int8)
+    for i in range(inst.n_items):
+        answers[:, i] = (rows["answers"] >> (2 * i)) & 3
+        answers[(rows["missing"] >> i) & 1 == 1, i] = -1
+    return answers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="응답 품질(부주의 응답) 플래그 집계")
+    parser.add_argument("source", help="phq_store SQLite 파일 또는 phq_archive 디렉터리")
+    parser.add_argument("--instrument", default=PHQ9.id)
+    parser.add_argument("--guttman-max", type=float, default=None,
+                        help="주면 이 자료의 단계 통과율 순으로 Guttman 오류를 판정 (기본: 판정 안 함)")
+    args = parser.parse_args()
+
+    inst = load_instrument(args.instrument)
+    rows = _load_rows(args.source, inst)
+    if not len(rows):
+        print("no rows")
+        return
+    answers = answers_from_rows(rows, inst)
+    order = step_order(answers, inst) if args.guttman_max is not None else None
+    result = quality_flags(
+        answers, inst, total=rows["total"], functional=rows["functional"],
+        params=QualityParams(guttman_max=args.guttman_max, step_order=order),
+    )
+    print(f"{inst.id}: {len(rows):,} rows")
+    if order is not None:
+        g = result["guttman"][~np.isnan(result["guttman"])]
+        print("  guttman p50/p90/p99  " + "  ".join(f"{v:.2f}" for v in np.quantile(g, (0.5, 0.9, 0.99))))
+    for name, count in summarize(result["quality"]).items():
+        print(f"  {name:<11} {count:>10,}  {100 * count / len(rows):5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
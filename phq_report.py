@@ -0,0 +1,998 @@
+# -*- coding: utf-8 -*-
+"""결과지 HTML 조각과 앱 스타일 (streamlit 비의존)"""
+from functools import lru_cache
+from textwrap import dedent
+from typing import Dict, List, NamedTuple
+
+from phq_core import PHQ9, ResultSummary
+from phq_instruments import CompiledInstrument, load_instrument
+
+# 색상 토큰 (라이트 테마 기본값 – CSS 변수로 재정의)
+INK     = "#0F172A"   # primary text (dark navy)
+SUBTLE  = "#475569"   # secondary text (slate)
+CARD_BG = "#FFFFFF"   # cards are clean white
+APP_BG  = "#F6F8FB"   # off-white app background
+BORDER  = "#E2E8F0"   # subtle border
+BRAND   = "#2563EB"   # keep as-is (brand blue)
+ACCENT  = "#DC2626"   # keep as-is (danger)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 전역 스타일
+APP_CSS = """\
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&family=Noto+Sans+KR:wght@400;500;700;900&display=swap');
+
+:root {
+  --bg: #F6F8FB;
+  --card: #FFFFFF;
+  --ink: #0F172A;
+  --subtle: #334155;
+  --muted: #475569;
+  --border: #E2E8F0;
+  --brand: #2563EB;
+  --accent: #DC2626;
+  --soft: #F8FAFC;
+  --shell-bg: rgba(255,255,255,0.98);
+  --inner-card: #FFFFFF;
+  --chip-bg: #FFFFFF;
+  --chip-border: #CBD5E1;
+  --chip-text: #0F172A;
+}
+
+[data-testid="stAppViewContainer"] {
+  color-scheme: light !important;
+  background: var(--bg) !important;
+}
+
+html, body {
+  color-scheme: light !important;
+  background: var(--bg);
+  color: var(--ink);
+  font-family: "Inter","Noto Sans KR",system-ui,-apple-system,Segoe UI,Roboto,Apple SD Gothic Neo,Helvetica,Arial,sans-serif;
+  -webkit-font-smoothing: antialiased;
+  text-rendering: optimizeLegibility;
+}
+
+body, p, div, span, li, button, label {
+  font-family: "Inter","Noto Sans KR",system-ui,-apple-system,Segoe UI,Roboto,Apple SD Gothic Neo,Helvetica,Arial,sans-serif !important;
+}
+
+[data-testid="block-container"] {
+  max-width: 1100px;
+  padding: 0 1.5rem 3rem;
+  margin: 0 auto;
+}
+
+.hero-section {
+  max-width: 1120px;
+  margin: 24px auto 18px;
+  background: var(--card);
+  border: 1px solid var(--border);
+  border-radius: 32px;
+  padding: 48px 56px;
+  box-shadow: 0 12px 28px rgba(15, 23, 42, 0.08);
+}
+
+.hero-badge {
+  display: inline-flex;
+  padding: 6px 14px;
+  border-radius: 999px;
+  background: rgba(37,99,235,0.12);
+  color: var(--brand);
+  font-weight: 700;
+  font-size: 12px;
+  border: 1px solid rgba(37,99,235,0.25);
+  width: fit-content;
+}
+
+.hero-title {
+  font-size: 2.2rem;
+  font-weight: 900;
+  letter-spacing: -0.6px;
+  margin: 14px 0 10px;
+  line-height: 1.2;
+}
+
+.hero-subtitle {
+  font-size: 1.05rem;
+  color: var(--subtle);
+  line-height: 1.6;
+  margin-bottom: 18px;
+}
+
+.meta-chips {
+  display: flex;
+  flex-wrap: wrap;
+  gap: 10px;
+}
+
+.meta-chip {
+  padding: 6px 12px;
+  border-radius: 999px;
+  background: var(--soft);
+  border: 1px solid var(--border);
+  font-size: 0.85rem;
+  font-weight: 600;
+  color: var(--ink);
+}
+
+.section {
+  max-width: 960px;
+  margin: 22px auto 16px;
+}
+
+.survey-shell {
+  max-width: 960px;
+  margin: 0 auto;
+  padding: 0 14px;
+}
+
+.survey-shell div[data-testid="stVerticalBlock"] {
+  max-width: 960px;
+  margin: 0 auto;
+}
+
+.survey-shell div[data-testid="stButton"] {
+  max-width: 960px;
+  margin: 18px auto 0;
+}
+
+.section-title {
+  font-size: 1.12rem;
+  font-weight: 800;
+  letter-spacing: -0.3px;
+  margin-bottom: 12px;
+}
+
+.section-card {
+  background: var(--card);
+  border: 1px solid var(--border);
+  border-radius: 24px;
+  padding: 26px 30px;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+}
+
+.q-card {
+  background: #fff;
+  border: 1px solid var(--border);
+  border-radius: 18px;
+  padding: 18px 20px;
+  box-shadow: 0 10px 24px rgba(15,23,42,0.08);
+  margin: 0 auto 14px;
+  width: 100%;
+}
+
+.q-no {
+  font-size: 12px;
+  font-weight: 800;
+  color: var(--brand);
+}
+
+.q-text {
+  font-size: 1.02rem;
+  font-weight: 700;
+  color: var(--ink);
+  margin-top: 6px;
+  line-height: 1.5;
+}
+
+.feature-grid {
+  display: grid;
+  grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
+  gap: 18px;
+}
+
+.feature-card {
+  background: var(--card);
+  border: 1px solid var(--border);
+  border-radius: 20px;
+  padding: 22px 24px;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+}
+
+.feature-card h4 {
+  margin: 0 0 8px;
+  font-size: 1rem;
+  font-weight: 800;
+}
+
+.feature-card p {
+  margin: 0;
+  color: var(--subtle);
+  line-height: 1.6;
+}
+
+.stepper {
+  background: var(--soft);
+  border: 1px solid var(--border);
+  border-radius: 24px;
+  padding: 22px 24px;
+}
+
+.steps {
+  display: grid;
+  grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+  gap: 16px;
+}
+
+.step-card {
+  background: var(--card);
+  border: 1px solid var(--border);
+  border-radius: 18px;
+  padding: 18px 20px;
+  box-shadow: 0 8px 20px rgba(15, 23, 42, 0.06);
+}
+
+.step-index {
+  font-size: 0.75rem;
+  font-weight: 800;
+  color: var(--brand);
+  letter-spacing: 0.8px;
+  text-transform: uppercase;
+}
+
+.faq-item {
+  background: var(--card);
+  border: 1px solid var(--border);
+  border-radius: 18px;
+  padding: 18px 20px;
+  box-shadow: 0 8px 20px rgba(15, 23, 42, 0.05);
+  margin-bottom: 12px;
+}
+
+.notice-card {
+  background: #FFFFFF;
+  border: 1px solid #F1C28E;
+  border-radius: 20px;
+  padding: 20px 22px;
+  color: #7C2D12;
+  box-shadow: 0 8px 20px rgba(15, 23, 42, 0.06);
+}
+
+.cta-row {
+  display: flex;
+  flex-wrap: wrap;
+  gap: 12px;
+  align-items: center;
+}
+
+.cta-row .nav-chip {
+  display: inline-flex;
+  padding: 8px 14px;
+  border-radius: 999px;
+  border: 1px solid var(--border);
+  background: var(--card);
+  color: var(--ink);
+  font-weight: 600;
+  text-decoration: none;
+  font-size: 0.9rem;
+}
+
+.progress-track {
+  width: 100%;
+  height: 10px;
+  background: rgba(226,232,240,0.9);
+  border-radius: 999px;
+  overflow: hidden;
+  margin: 10px 0 8px;
+}
+
+.progress-fill {
+  height: 100%;
+  background: var(--brand);
+  border-radius: 999px;
+}
+
+.section-heading {
+  font-size: 1.08rem;
+  font-weight: 800;
+  letter-spacing: -0.3px;
+  margin-bottom: 4px;
+}
+
+.instruction-list {
+  margin: 14px 0 0;
+  padding-left: 20px;
+  line-height: 1.6;
+  color: var(--ink);
+}
+
+.instruction-list li {
+  margin-bottom: 8px;
+}
+
+.small-muted {
+  color: var(--muted) !important;
+  font-size: 0.92rem;
+  letter-spacing: -0.1px;
+}
+
+.report-shell {
+  background: var(--shell-bg);
+  border: 1px solid var(--border);
+  border-radius: 32px;
+  padding: 32px;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+}
+
+.report-shell.compact {
+  padding: 24px 28px;
+}
+
+.report-header {
+  display: flex;
+  justify-content: space-between;
+  align-items: flex-end;
+  gap: 12px;
+  flex-wrap: wrap;
+  margin-bottom: 24px;
+}
+
+.summary-layout {
+  display: grid;
+  grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
+  gap: 28px;
+  align-items: stretch;
+  margin-top: 28px;
+}
+
+.report-card {
+  background: var(--inner-card);
+  border: 1px solid var(--border);
+  border-radius: 20px;
+  padding: 24px;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+}
+
+.gauge-card {
+  background: var(--inner-card);
+  border: 1px solid var(--border);
+  border-radius: 24px;
+  padding: 32px 24px 36px;
+  text-align: center;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+  display: flex;
+  flex-direction: column;
+  gap: 12px;
+}
+
+.gauge-circle {
+  width: 220px;
+  height: 220px;
+  border-radius: 50%;
+  margin: 0 auto 10px;
+  position: relative;
+  display: flex;
+  align-items: center;
+  justify-content: center;
+  box-shadow: inset 0 1px 2px rgba(15, 23, 42, 0.06);
+}
+
+.gauge-circle::after {
+  content: "";
+  position: absolute;
+  inset: 24px;
+  border-radius: 50%;
+  background: var(--card);
+  box-shadow: inset 0 1px 2px rgba(15, 23, 42, 0.06);
+}
+
+.gauge-inner {
+  position: relative;
+  z-index: 2;
+  display: flex;
+  flex-direction: column;
+  align-items: center;
+  gap: 4px;
+}
+
+.gauge-number {
+  font-size: 3.2rem;
+  font-weight: 900;
+  line-height: 1;
+  color: var(--ink);
+}
+
+.gauge-denom {
+  font-size: 1rem;
+  font-weight: 700;
+  color: var(--subtle);
+}
+
+.gauge-severity {
+  display: inline-flex;
+  padding: 6px 20px;
+  border-radius: 999px;
+  font-weight: 800;
+  border: 1.5px solid currentColor;
+  font-size: 1rem;
+}
+
+.metric-label {
+  font-size: 0.82rem;
+  font-weight: 700;
+  letter-spacing: 1.2px;
+  color: var(--subtle);
+  text-transform: uppercase;
+}
+
+.narrative-card {
+  background: var(--inner-card);
+  border: 1px solid var(--border);
+  border-radius: 24px;
+  padding: 28px 30px;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+  display: flex;
+  flex-direction: column;
+  gap: 16px;
+}
+
+.narrative-title {
+  font-weight: 800;
+  font-size: 1rem;
+}
+
+.functional-highlight {
+  border-top: 1px solid var(--border);
+  padding-top: 16px;
+}
+
+.functional-title {
+  font-size: 0.92rem;
+  color: var(--subtle);
+  font-weight: 700;
+  margin-bottom: 6px;
+}
+
+.functional-value {
+  font-size: 1.05rem;
+}
+
+.report-shell p {
+  line-height: 1.65;
+  margin: 0 0 12px;
+}
+
+.functional-divider {
+  height: 1px;
+  width: 100%;
+  max-width: 960px;
+  background: var(--border);
+  margin: 10px auto 18px;
+}
+
+.severity-legend {
+  display: flex;
+  flex-wrap: wrap;
+  gap: 12px;
+  margin-top: 18px;
+}
+
+.legend-chip {
+  display: flex;
+  flex-direction: column;
+  padding: 10px 14px;
+  border-radius: 14px;
+  border: 1px solid var(--border);
+  background: var(--inner-card);
+  min-width: 140px;
+  box-shadow: inset 0 1px 2px rgba(15, 23, 42, 0.06);
+}
+
+.legend-chip strong {
+  font-size: 0.95rem;
+}
+
+.legend-chip small {
+  color: var(--subtle);
+  font-size: 0.8rem;
+}
+
+.domain-panel {
+  border: 1px solid var(--border);
+  border-radius: 24px;
+  padding: 24px 28px;
+  background: var(--inner-card);
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+}
+
+.domain-profile {
+  display: flex;
+  flex-direction: column;
+  gap: 22px;
+}
+
+.domain-note {
+  margin-top: 14px;
+  padding-top: 12px;
+  border-top: 1px solid rgba(148,163,184,0.3);
+  font-size: 0.82rem;
+  color: var(--subtle);
+  line-height: 1.45;
+}
+
+.domain-row {
+  display: grid;
+  grid-template-columns: 1.4fr 2.5fr 0.5fr;
+  gap: 18px;
+  align-items: center;
+}
+
+.domain-title {
+  font-weight: 700;
+  font-size: 1rem;
+}
+
+.domain-desc {
+  font-size: 0.85rem;
+  color: var(--subtle);
+  margin-top: 4px;
+}
+
+.domain-bar {
+  position: relative;
+  height: 16px;
+  background: rgba(226,232,240,0.8);
+  border-radius: 999px;
+  overflow: hidden;
+  border: 1px solid rgba(203,213,225,0.9);
+}
+
+.domain-fill {
+  position: absolute;
+  top: 0;
+  left: 0;
+  bottom: 0;
+  border-radius: 999px;
+  background: var(--brand);
+  box-shadow: inset 0 -2px 0 rgba(255,255,255,0.35);
+}
+
+.domain-score {
+  justify-self: end;
+  font-weight: 700;
+}
+
+.warn {
+  background: #FFF7ED;
+  border: 1px solid #FDBA74;
+  color: #7C2D12;
+  border-radius: 18px;
+  padding: 16px 20px;
+  max-width: 960px;
+  margin: 18px auto 0;
+  font-weight: 600;
+}
+
+.safety {
+  background: #FFF1F2;
+  border: 2px solid #FDA4AF;
+  color: var(--ink);
+  border-radius: 22px;
+  padding: 24px 28px;
+  max-width: 960px;
+  margin: 24px auto 0;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+}
+
+.safety .section-heading {
+  color: var(--accent);
+}
+
+.footer-note {
+  color: var(--subtle);
+  font-size: 12px;
+  max-width: 960px;
+  margin: 24px auto 0;
+  line-height: 1.5;
+  text-align: center;
+}
+
+div[data-testid="stPlotlyChart"] {
+  max-width: 960px;
+  margin: 12px auto 18px;
+  background: #FFFFFF;
+  border: 1px solid var(--border);
+  border-radius: 26px;
+  padding: 18px 18px 6px;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08);
+}
+
+div[data-testid="stPlotlyChart"] > div > div {
+  width: 100% !important;
+}
+
+[data-testid="stToolbar"], #MainMenu, header, footer {
+  display: none !important;
+}
+
+/* ───── 라디오 칩 ───── */
+.q-card div[data-testid="stRadio"] {
+  margin-top: 12px;
+}
+
+div[data-testid="stRadio"] > div[role="radiogroup"] {
+  display: flex;
+  gap: 10px;
+  flex-wrap: wrap;
+}
+
+div[data-testid="stRadio"] input[type="radio"] {
+  position: absolute;
+  opacity: 0;
+  pointer-events: none;
+}
+
+div[data-testid="stRadio"] label {
+  border: 1px solid #CBD5E1;
+  border-radius: 999px;
+  padding: 10px 18px;
+  background: #fff;
+  font-weight: 700;
+  cursor: pointer;
+  display: inline-flex;
+  align-items: center;
+  gap: 8px;
+  transition: all 0.15s ease;
+}
+
+div[data-testid="stRadio"] label:hover {
+  border-color: var(--brand);
+  box-shadow: 0 6px 14px rgba(37, 99, 235, 0.18);
+}
+
+div[data-testid="stRadio"] label.chip-checked {
+  background: rgba(37,99,235,0.10);
+  border-color: var(--brand);
+}
+
+/* 버튼 */
+.stButton {
+  margin: 0 0 14px;
+}
+
+.stButton > button {
+  width: 100%;
+}
+
+.stButton > button[data-testid="baseButton-primary"],
+.stButton > button[kind="primary"] {
+  background: var(--brand) !important;
+  color: #fff !important;
+  border: 1.5px solid var(--brand) !important;
+  border-radius: 12px !important;
+  font-weight: 800 !important;
+  letter-spacing: -0.2px;
+  min-height: 48px;
+  box-shadow: 0 12px 24px rgba(37,99,235,0.28) !important;
+}
+
+.stButton > button:not([data-testid="baseButton-primary"]) {
+  background: var(--inner-card) !important;
+  color: var(--brand) !important;
+  border: 1.5px solid var(--brand) !important;
+  border-radius: 12px !important;
+  font-weight: 800 !important;
+  min-height: 48px;
+  box-shadow: 0 10px 24px rgba(15, 23, 42, 0.08) !important;
+}
+
+button:focus-visible {
+  outline: 3px solid rgba(37, 99, 235, 0.35);
+  outline-offset: 2px;
+}
+
+@media (max-width: 640px) {
+  [data-testid="block-container"] {
+    padding: 0 1rem 2rem;
+  }
+  .hero-section {
+    padding: 28px 24px;
+  }
+  .hero-title {
+    font-size: 1.7rem;
+  }
+  .section {
+    margin: 18px auto 12px;
+  }
+  .report-shell {
+    padding: 24px;
+  }
+  .gauge-circle {
+    width: 180px;
+    height: 180px;
+  }
+  .domain-row {
+    grid-template-columns: 1fr;
+  }
+  .domain-score {
+    justify-self: start;
+  }
+}
+"""
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 결과 해석
+def build_domain_profile_html(scores: List[int], inst: CompiledInstrument = PHQ9) -> str:
+    if len(scores) < inst.n_items:
+        scores = (scores + [0] * inst.n_items)[:inst.n_items]
+
+    rows: List[str] = []
+    for meta in inst.domain_meta:
+        score = sum(scores[i - 1] for i in meta["items"])
+        ratio = (score / meta["max"]) if meta["max"] else 0
+        rows.append(
+            dedent(
+                f"""
+                <div class="domain-row">
+                  <div>
+                    <div class="domain-title">{meta['name']}</div>
+                    <div class="domain-desc">{meta['desc']}</div>
+                  </div>
+                  <div class="domain-bar">
+                    <div class="domain-fill" style="width:{ratio*100:.1f}%"></div>
+                  </div>
+                  <div class="domain-score">{score} / {meta['max']}</div>
+                </div>
+                """
+            ).strip()
+        )
+    rows_html = "\n".join(rows)
+    return (
+        '<div class="domain-panel">\n'
+        '  <div class="domain-profile">\n'
+        f'{rows_html}\n'
+        '  </div>\n'
+        f'{fragments(inst).domain_note}\n'
+        '</div>'
+    )
+
+
+def compose_narrative(
+    total: int,
+    severity: str,
+    functional: str | None,
+    item9: int,
+    inst: CompiledInstrument = PHQ9,
+) -> str:
+    """item9: 안전 문항(PHQ-9은 9번) 점수. 안전 문항이 없는 검사는 무시된다."""
+    base = (
+        f"총점 {total}점({inst.max_total}점 만점)으로, [{severity}] 수준의 {inst.construct} 증상이 보고되었습니다. "
+        f"{inst.guidance[severity]}"
+    )
+    functional_text = (
+        f" 응답자 보고에 따르면, 이러한 증상으로 인한 일·집안일·대인관계의 어려움은 ‘{functional}’ 수준입니다."
+        if functional else ""
+    )
+    safety_text = (
+        f" 특히, 자해/자살 관련 사고({inst.safety_item}번 문항)가 보고되어 이에 대한 즉각적인 관심과 평가가 매우 중요합니다."
+        if inst.safety_item is not None and item9 > 0 else ""
+    )
+    return base + functional_text + safety_text
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 검사별로 고정된 HTML 조각은 명세 해시당 한 번만 만든다.
+class Fragments(NamedTuple):
+    guidance_section: Dict[str, str]   # 구간 라벨 → "다음 단계" 섹션
+    safety: str
+    footer: str
+    domain_note: str
+
+
+@lru_cache(maxsize=None)
+def _fragments_for(spec_hash: str, inst: CompiledInstrument) -> Fragments:
+    numeral = "III" if inst.domain_meta else "II"
+    guidance_section = {
+        label: dedent(
+            f"""
+            <div class="section">
+              <div class="report-shell">
+                <div class="section-heading">{numeral}. 다음 단계</div>
+                <div class="report-card">
+                  <div class="narrative-title">권장 안내</div>
+                  <p>{text}</p>
+                  <ul class="instruction-list">
+                    <li>일상 리듬(수면, 식사, 활동)과 증상 변화를 기록해 보세요.</li>
+                    <li>신뢰할 수 있는 사람과 현재 상태를 공유하는 것도 도움이 됩니다.</li>
+                    <li>필요 시 정신건강 전문가와 상담을 예약해 보세요.</li>
+                  </ul>
+                </div>
+              </div>
+            </div>
+            """
+        )
+        for label, text in inst.guidance.items()
+    }
+    safety = dedent(
+        f"""
+        <div class="safety">
+          <div class="section-heading">안전 안내 (문항 {inst.safety_item} 관련)</div>
+          <div class="small-muted">자살·자해 생각이 있을 때 즉시 도움 받기</div>
+          <div>한국: <b>1393 자살예방상담(24시간)</b>, <b>정신건강상담 1577-0199</b> · 긴급 시 <b>112/119</b>.</div>
+        </div>
+        """
+    ) if inst.safety_item is not None else ""
+    footer = dedent(
+        """
+        <div class="footer-note">
+          {citation}
+        </div>
+        """
+    ).format(citation=inst.citation.replace("\n", "\n  "))
+    domain_note = (
+        '<div class="domain-note small-muted">※ 각 영역의 점수는 높을수록 해당 영역의 '
+        f'{inst.construct} 관련 증상이 더 많이 보고되었음을 의미합니다.</div>'
+    )
+    return Fragments(guidance_section, safety, footer, domain_note)
+
+
+def fragments(inst: CompiledInstrument = PHQ9) -> Fragments:
+    return _fragments_for(inst.spec_hash, inst)
+
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 결과지 섹션 (Streamlit 결과 페이지와 HTTP 결과 엔드포인트가 공유)
+def instrument_of(summary: ResultSummary) -> CompiledInstrument:
+    return load_instrument(summary.instrument)
+
+
+_SUMMARY_TEMPLATE = dedent(
+    """
+    <div class="section">
+      <div class="report-shell">
+        <div class="report-header">
+          <div>
+            <div class="section-heading">I. 종합 소견</div>
+            <div class="small-muted">{title} · 검사 일시: {ts}</div>
+          </div>
+        </div>
+        <div class="summary-layout">
+          <div class="gauge-card">
+            <div class="metric-label">총점</div>
+            <div class="gauge-circle" style="background: conic-gradient({arc_color} {gauge_percent:.2f}%, rgba(226,232,240,0.9) {gauge_percent:.2f}%, rgba(226,232,240,0.9) 100%);">
+              <div class="gauge-inner">
+                <div class="gauge-number">{total}</div>
+                <div class="gauge-denom">/ {max_total}</div>
+              </div>
+            </div>
+            <div class="gauge-severity" style="color:{arc_color};">{sev}</div>
+          </div>
+          <div class="narrative-card">
+            <div class="narrative-title">주요 소견</div>
+            <p>{narrative}</p>{functional_html}
+          </div>
+        </div>
+      </div>
+    </div>
+    """
+)
+
+_FUNCTIONAL_TEMPLATE = """
+        <div class="functional-highlight">
+          <div class="functional-title">일상 기능 손상 ({no}번 문항)</div>
+          <div class="functional-value"><strong>{value}</strong></div>
+        </div>"""
+
+
+def build_summary_section_html(summary: ResultSummary) -> str:
+    inst = instrument_of(summary)
+    total, sev, functional, scores = summary.total, summary.sev, summary.functional, summary.scores
+    safety_score = scores[inst.safety_item - 1] if inst.safety_item is not None else 0
+
+    functional_html = ""
+    if inst.functional_options:
+        functional_html = _FUNCTIONAL_TEMPLATE.format(
+            no=inst.n_items + 1, value=functional if functional else "미응답"
+        )
+    return _SUMMARY_TEMPLATE.format(
+        title=inst.title,
+        ts=summary.ts,
+        arc_color=inst.arc_color.get(sev, BRAND),
+        gauge_percent=(max(0, min(total, inst.max_total)) / inst.max_total) * 100,
+        total=total,
+        max_total=inst.max_total,
+        sev=sev,
+        narrative=compose_narrative(total, sev, functional, safety_score, inst),
+        functional_html=functional_html,
+    )
+
+
+def build_unanswered_html(unanswered: int, prorated: bool = False) -> str:
+    if prorated:
+        return (
+            f'<div class="warn">⚠️ 미응답 {unanswered}개 문항은 응답한 문항의 평균으로 보정해 총점을 '
+            "비례 환산했습니다(영역 점수는 응답한 문항만 합산).</div>"
+        )
+    return f'<div class="warn">⚠️ 미응답 {unanswered}개 문항은 0점으로 계산되었습니다.</div>'
+
+
+def build_theta_html(theta: float, se: float) -> str:
+    return (
+        f'<div class="small-muted" style="margin:4px 0 12px;">문항 반응 이론(GRM) 잠재 특성 점수 '
+        f'θ = <strong>{theta:+.2f}</strong> (표준오차 {se:.2f}) · 보정 표본 평균 0, 표준편차 1 기준</div>'
+    )
+
+
+def needs_safety_block(summary: ResultSummary) -> bool:
+    inst = instrument_of(summary)
+    return inst.safety_item is not None and summary.scores[inst.safety_item - 1] > 0
+
+
+def build_domain_section_html(scores: List[int], inst: CompiledInstrument = PHQ9) -> str:
+    if not inst.domain_meta:
+        return ""
+    domain_html = build_domain_profile_html(scores, inst)
+    return dedent(
+        """
+        <div class="section">
+          <div class="report-shell">
+            <div class="section-heading" style="margin-bottom:12px;">II. 증상 영역별 프로파일</div>
+            {domain_panel}
+          </div>
+        </div>
+        """
+    ).strip().format(domain_panel=domain_html)
+
+
+def build_norm_profile_html(
+    rows: List[tuple], group_label: str, inst: CompiledInstrument = PHQ9
+) -> str:
+    """(척도, 점수, 백분위, T점수) 목록 → 규준 비교 막대 (막대 길이 = 백분위)"""
+    names = {"total": "총점", **{m["key"]: m["name"] for m in inst.domain_meta}}
+    items = "".join(
+        dedent(
+            f"""
+            <div class="domain-row">
+              <div>
+                <div class="domain-title">{names.get(scale, scale)}</div>
+                <div class="domain-desc">{score}점 · T점수 {t:.0f}</div>
+              </div>
+              <div class="domain-bar">
+                <div class="domain-fill" style="width:{pct:.1f}%"></div>
+              </div>
+              <div class="domain-score">{pct:.0f} 백분위</div>
+            </div>
+            """
+        ).strip()
+        for scale, score, pct, t in rows
+    )
+    note = (
+        f'<div class="domain-note small-muted">※ 규준 집단({group_label})과 비교한 상대적 위치입니다(중간 순위 백분위). '
+        "백분위와 T점수(평균 50, 표준편차 10)가 높을수록 증상 보고가 많은 편입니다.</div>"
+    )
+    return f'<div class="domain-panel"><div class="domain-profile">{items}</div>{note}</div>'
+
+
+def build_guidance_section_html(sev: str, inst: CompiledInstrument = PHQ9) -> str:
+    return fragments(inst).guidance_section[sev]
+
+
+def build_report_document(summary: ResultSummary) -> str:
+    """결과 페이지와 같은 구성의 독립 HTML 문서 (버튼 제외)"""
+    inst = instrument_of(summary)
+    frag = fragments(inst)
+    parts = [build_summary_section_html(summary)]
+    if summary.unanswered > 0:
+        parts.append(build_unanswered_html(summary.unanswered, summary.prorated))
+    if needs_safety_block(summary):
+        parts.append(frag.safety)
+    if inst.domain_meta:
+        parts.append(build_domain_section_html(summary.scores, inst))
+    parts.append(frag.guidance_section[summary.sev])
+    parts.append(frag.footer)
+    body = "\n".join(parts)
+    return (
+        "<!DOCTYPE html>\n"
+        '<html lang="ko">\n'
+        "<head>\n"
+        '<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        f"<title>{inst.title} 결과</title>\n"
+        f"<style>\n{APP_CSS}</style>\n"
+        "</head>\n"
+        '<body>\n<div data-testid="block-container">\n'
+        f"{body}\n"
+        "</div>\n</body>\n</html>\n"
+    )
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""모니터링 대시보드용 누적 집계 (레코드당 O(1) 갱신, 원자료 재조회 없음)
+
+검토 앱(phq_staff)이 화면을 그릴 때마다 저장소에서 마지막으로 반영한 assessments.id 뒤의
+레코드만 읽어 따라잡고(catch_up) JSON에 저장한다. SQLite는 쓰기 트랜잭션을 직렬화하므로 id는
+커밋 순서대로 늘어나, 응답자 앱 프로세스가 여럿이어도 id 기준 따라잡기로 빠짐없이 반영된다.
+평균/분산은 Welford 방식으로 누적한다.
+"""
+import copy
+import json
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from phq_core import unpack_scores
+from phq_instruments import CompiledInstrument, load_instrument
+
+DAILY_WINDOW_DAYS = 30  # 일별 건수는 최근 30일만 유지
+
+
+class Welford:
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def sd(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def to_list(self) -> List[float]:
+        return [self.n, self.mean, self.m2]
+
+
+class InstrumentRollup:
+    def __init__(self, inst: CompiledInstrument):
+        self.inst = inst
+        self.n = 0
+        self.by_band = [0] * len(inst.band_labels)
+        self.item_hist = [[0] * (len(inst.labels) + 1) for _ in range(inst.n_items)]  # 마지막 칸 = 미응답
+        self.safety_positive = 0
+        self.total = Welford()
+        self.domains = {key: Welford() for key, _ in inst.domain_index}
+        self.daily: Dict[int, int] = {}  # epoch 일 번호 → 건수
+        self.last_ts = 0
+
+    def add(self, record) -> None:
+        """phq_store.AssessmentRecord 한 건 반영 (문항 수에만 비례)"""
+        inst = self.inst
+        scores = unpack_scores(record.scores, inst.n_items)
+        self.n += 1
+        self.by_band[inst.band_by_total[min(record.total, inst.max_total)]] += 1
+        missing_col = len(inst.labels)
+        for i, s in enumerate(scores):
+            self.item_hist[i][missing_col if record.missing_mask >> i & 1 else s] += 1
+        if inst.safety_item is not None and scores[inst.safety_item - 1] > 0:
+            self.safety_positive += 1
+        self.total.add(record.total)
+        for key, idx in inst.domain_index:
+            self.domains[key].add(sum(scores[i] for i in idx))
+        day = record.ts // 86400
+        if day not in self.daily:
+            self.daily[day] = 0
+            for old in [d for d in self.daily if d <= day - DAILY_WINDOW_DAYS]:  # 날짜가 바뀔 때만
+                del self.daily[old]
+        self.daily[day] += 1
+        self.last_ts = max(self.last_ts, record.ts)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "n": self.n,
+            "by_band": self.by_band,
+            "item_hist": self.item_hist,
+            "safety_positive": self.safety_positive,
+            "total": self.total.to_list(),
+            "domains": {k: w.to_list() for k, w in self.domains.items()},
+            "daily": {str(d): c for d, c in self.daily.items()},
+            "last_ts": self.last_ts,
+        }
+
+    @classmethod
+    def from_dict(cls, inst: CompiledInstrument, data: Dict[str, object]) -> "InstrumentRollup":
+        roll = cls(inst)
+        roll.n = data["n"]
+        roll.by_band = list(data["by_band"])
+        roll.item_hist = [list(row) for row in data["item_hist"]]
+        roll.safety_positive = data["safety_positive"]
+        roll.total = Welford(*data["total"])
+        roll.domains.update({k: Welford(*v) for k, v in data["domains"].items()})
+        roll.daily = {int(d): c for d, c in data["daily"].items()}
+        roll.last_ts = data["last_ts"]
+        return roll
+
+
+class Rollups:
+    """검사별 InstrumentRollup 모음. add_many/snapshot/catch_up은 스레드 안전"""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self.by_instrument: Dict[str, InstrumentRollup] = {}
+        self.last_id = 0  # 반영한 마지막 assessments.id
+        self._lock = threading.Lock()
+        self._catch_up_lock = threading.Lock()  # 같은 구간을 두 번 반영하지 않도록
+
+    def _rollup(self, instrument_id: str) -> InstrumentRollup:
+        roll = self.by_instrument.get(instrument_id)
+        if roll is None:
+            roll = self.by_instrument[instrument_id] = InstrumentRollup(load_instrument(instrument_id))
+        return roll
+
+    def add_many(self, records: Iterable, last_id: int) -> None:
+        with self._lock:
+            for r in records:
+                self._rollup(r.instrument).add(r)
+            self.last_id = max(self.last_id, last_id)
+
+    def snapshot(self, instrument_id: str) -> InstrumentRollup:
+        """대시보드 표시용 복사본 (이력 크기와 무관한 크기)"""
+        with self._lock:
+            return copy.deepcopy(self._rollup(instrument_id))
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            data = {
+                "last_id": self.last_id,
+                "instruments": {k: r.to_dict() for k, r in self.by_instrument.items()},
+            }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        tmp.replace(self.path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Rollups":
+        rollups = cls(path)
+        if rollups.path.exists():
+            with rollups.path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            rollups.last_id = data["last_id"]
+            for instrument_id, roll in data["instruments"].items():
+                rollups.by_instrument[instrument_id] = InstrumentRollup.from_dict(load_instrument(instrument_id), roll)
+        return rollups
+
+    def catch_up(self, conn: sqlite3.Connection, chunk: int = 10_000) -> int:
+        """저장 이후 추가된 레코드(id > last_id)만 반영하고 건수를 돌려준다."""
+        from phq_store import AssessmentRecord
+
+        cols = ", ".join(AssessmentRecord._fields)
+        added = 0
+        with self._catch_up_lock:
+            while True:
+                rows = conn.execute(
+                    f"SELECT id, {cols} FROM assessments WHERE id > ? ORDER BY id LIMIT ?", (self.last_id, chunk)
+                ).fetchall()
+                if not rows:
+                    return added
+                self.add_many((AssessmentRecord(*r[1:]) for r in rows), rows[-1][0])
+                added += len(rows)
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""인구 선별 캠페인 의뢰 부하 몬테카를로 예측
+
+    python phq_simulate.py --daily 5000 --days 30 --replicates 200 --item-probs probs.json
+    python phq_simulate.py --daily 800 --theta-mean 0.2 --irt-params calibrated.irt.json
+
+응답 생성 모형 (CLI는 둘 중 하나를 반드시 받는다)
+  item_probs 문항별 선택지 확률 [[p0, p1, p2, p3] × 문항]을 주면 문항끼리 독립으로 표집 (대상 인구의 관측 응답률)
+  GRM       θ ~ N(theta_mean, theta_sd), 문항 모수는 검사 명세의 보정된 irt 또는 --irt-params 파일.
+            theta_mean/theta_sd는 보정 척도 위 대상 인구의 값이라 직접 정해야 한다. 예시 모수 파일
+            ("example": true, instruments/examples/)을 쓰면 결과가 예시 모수 기반이라고 먼저 출력한다.
+반복(replicate)마다 일별 응답자 수를 Poisson(daily)로 뽑고, 모든 반복·일의 응답자를 이어 붙여
+CHUNK_ROWS행씩 생성해 phq_vector.score_matrix(앱과 같은 채점 규칙)로 채점한다. 일별 집계는
+(일 번호 × 구간) bincount 한 번이라 응답자 단위 파이썬 반복이 없다.
+보고: 구간별 건수, 중등도 이상, 안전 문항 양성, 의뢰(중등도 이상 또는 안전 문항 양성), 영역 점수 평균의
+일별·캠페인 전체 평균과 백분위 구간.
+"""
+import argparse
+import json
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument, with_irt_params
+from phq_vector import score_matrix
+
+CHUNK_ROWS = 1 << 20
+BAND_QUANTILES = (0.05, 0.5, 0.95)
+
+
+class Population(NamedTuple):
+    theta_mean: float = 0.0      # 보정 표본 척도 (대상 인구의 평균은 직접 준다)
+    theta_sd: float = 1.0
+    item_probs: Tuple[Tuple[float, ...], ...] | None = None   # 주면 GRM 대신 문항 독립 표집
+
+
+def sample_answers(n: int, inst: CompiledInstrument, population: Population, rng: np.random.Generator) -> np.ndarray:
+    """(n, 문항 수) int8 응답 행렬. 값은 선택지 인덱스(= 점수, inst.labels 순서)"""
+    answers = np.empty((n, inst.n_items), dtype=np.int8)
+    if population.item_probs is not None:
+        cum = np.cumsum(np.asarray(population.item_probs, dtype=np.float64), axis=1)[:, :-1]
+        for i in range(inst.n_items):
+            answers[:, i] = np.searchsorted(cum[i], rng.random(n), side="right")
+        return answers
+    if inst.irt is None:
+        raise ValueError(f"{inst.id}: no irt parameters; pass item_probs")
+    # X ≥ k ⇔ u < σ(a(θ − b_k)) ⇔ b_k < θ − logit(u)/a 이므로 문항마다 로지스틱 난수 하나와
+    # 경계 b의 searchsorted 한 번이면 된다 (경계별 지수 계산 없음).
+    theta = rng.normal(population.theta_mean, population.theta_sd, n)
+    a, b = inst.irt
+    for i in range(inst.n_items):
+        answers[:, i] = np.searchsorted(b[i], theta - rng.logistic(size=n) / a[i])
+    return answers
+
+
+def _summary(values: np.ndarray) -> Dict[str, float]:
+    q = np.quantile(values, BAND_QUANTILES)
+    return {"mean": float(values.mean()), **{f"p{round(p * 100):02d}": float(v) for p, v in zip(BAND_QUANTILES, q)}}
+
+
+def forecast(
+    daily: float,
+    days: int = 30,
+    replicates: int = 100,
+    inst: CompiledInstrument = PHQ9,
+    population: Population = Population(),
+    referral_total: int | None = None,
+    seed: int | None = None,
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """{"daily"|"campaign": {지표: {"mean", "p05", "p50", "p95"}}}
+
+    referral_total 기본값은 세 번째 구간(PHQ-9 중등도)의 시작 점수.
+    """
+    rng = np.random.default_rng(seed)
+    referral_total = inst.band_cuts[1] if referral_total is None else referral_total
+    n_bands = len(inst.band_labels)
+    slots = replicates * days
+    counts = rng.poisson(daily, slots)
+    ends = np.cumsum(counts)
+
+    bands = np.zeros((slots, n_bands), dtype=np.int64)
+    moderate, safety, referral = (np.zeros(slots, dtype=np.int64) for _ in range(3))
+    domain_sums = {key: np.zeros(slots) for key, _ in inst.domain_index}
+    flag_key = None if inst.safety_item is None else f"item{inst.safety_item}_flag"
+
+    start_slot = 0
+    while start_slot < slots:
+        base = ends[start_slot - 1] if start_slot else 0
+        stop_slot = max(start_slot + 1, int(np.searchsorted(ends, base + CHUNK_ROWS, side="right")))
+        stop_slot = min(stop_slot, slots)
+        slot = np.repeat(np.arange(start_slot, stop_slot), counts[start_slot:stop_slot])
+        scored = score_matrix(sample_answers(len(slot), inst, population, rng), inst)
+        local = slot - start_slot
+        width = stop_slot - start_slot
+        sl = slice(start_slot, stop_slot)
+        bands[sl] += np.bincount(local * n_bands + scored["severity_code"], minlength=width * n_bands).reshape(width, n_bands)
+        refer = scored["total"] >= referral_total
+        moderate[sl] += np.bincount(local, weights=refer, minlength=width).astype(np.int64)
+        if flag_key:
+            flag = scored[flag_key]
+            safety[sl] += np.bincount(local, weights=flag, minlength=width).astype(np.int64)
+            refer = refer | flag
+        referral[sl] += np.bincount(local, weights=refer, minlength=width).astype(np.int64)
+        for key in domain_sums:
+            domain_sums[key][sl] += np.bincount(local, weights=scored[key], minlength=width)
+        start_slot = stop_slot
+
+    metrics: Dict[str, np.ndarray] = {"respondents": counts}
+    metrics.update({f"band:{label}": bands[:, k] for k, label in enumerate(inst.band_labels)})
+    metrics["moderate_plus"] = moderate
+    if flag_key:
+        metrics["safety_positive"] = safety
+    metrics["referral"] = referral
+    per_campaign = {name: v.reshape(replicates, days).sum(axis=1) for name, v in metrics.items()}
+    daily_out = {name: _summary(v) for name, v in metrics.items()}
+    with np.errstate(invalid="ignore"):
+        for key, sums in domain_sums.items():
+            daily_out[f"mean:{key}"] = _summary(np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)[counts > 0])
+    return {"daily": daily_out, "campaign": {name: _summary(v) for name, v in per_campaign.items()}}
+
+
+def _load_item_probs(path: str, inst: CompiledInstrument) -> Tuple[Tuple[float, ...], ...]:
+    with open(path, encoding="utf-8") as f:
+        probs = json.load(f)
+    if len(probs) != inst.n_items or any(len(p) != len(inst.labels) or abs(sum(p) - 1) > 1e-6 for p in probs):
+        raise ValueError(f"item probabilities must be {inst.n_items} rows of {len(inst.labels)} values summing to 1")
+    return tuple(tuple(map(float, p)) for p in probs)
+
+
+def add_population_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--item-probs", help="문항별 선택지 확률 JSON ([[p0..p3] × 문항], 관측 응답률)")
+    parser.add_argument("--irt-params", help="검사 명세 대신 쓸 GRM 모수 JSON (phq_instruments.with_irt_params)")
+    parser.add_argument("--theta-mean", type=float, default=Population().theta_mean, help="GRM θ 평균 (보정 척도)")
+    parser.add_argument("--theta-sd", type=float, default=Population().theta_sd)
+
+
+def population_from_args(parser: argparse.ArgumentParser, args: argparse.Namespace, inst: CompiledInstrument) -> tuple:
+    """--item-probs 또는 GRM 모수(명세의 보정된 irt, --irt-params) → (검사, Population). 둘 다 없으면 종료"""
+    if args.item_probs:
+        return inst, Population(args.theta_mean, args.theta_sd, _load_item_probs(args.item_probs, inst))
+    example = False
+    if args.irt_params:
+        inst = with_irt_params(inst, args.irt_params)
+        with open(args.irt_params, encoding="utf-8") as f:
+            example = bool(json.load(f).get("example"))
+    if inst.irt is None:
+        parser.error(f"{inst.id}: pass --item-probs (observed response rates) or --irt-params (calibrated GRM)")
+    if example:
+        print(
+            f"note: responses are drawn from EXAMPLE GRM parameters ({args.irt_params}) with "
+            f"theta ~ N({args.theta_mean}, {args.theta_sd}); the output is not an estimate for any real population"
+        )
+    return inst, Population(args.theta_mean, args.theta_sd)
+
+
+def _print_block(title: str, block: Dict[str, Dict[str, float]], keys: Sequence[str]) -> None:
+    print(title)
+    print(f"  {'':<22} {'mean':>10} {'p05':>10} {'p50':>10} {'p95':>10}")
+    for name in keys:
+        s = block[name]
+        print(f"  {name:<22} " + " ".join(f"{s[k]:>10,.1f}" for k in ("mean", "p05", "p50", "p95")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="선별 캠페인 의뢰 부하 예측 (몬테카를로)")
+    parser.add_argument("--daily", type=float, required=True, help="일평균 응답자 수")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--replicates", type=int, default=100)
+    parser.add_argument("--instrument", default=PHQ9.id)
+    add_population_args(parser)
+    parser.add_argument("--referral-total", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    inst, population = population_from_args(parser, args, load_instrument(args.instrument))
+    result = forecast(args.daily, args.days, args.replicates, inst, population, args.referral_total, args.seed)
+    n = int(result["campaign"]["respondents"]["mean"] * args.replicates)
+    print(f"{inst.id}: {args.replicates} × {args.days} days, ~{n:,} simulated respondents")
+    _print_block("per day", result["daily"], list(result["daily"]))
+    _print_block(f"per campaign ({args.days} days)", result["campaign"], list(result["campaign"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""기관 내부 검토 앱 (위험도 우선 검토 큐 · 저장된 결과 목록 · 모니터링 대시보드)
+
+    PHQ_STORE_PATH=results.db PHQ_STAFF_PASSWORD=... streamlit run phq_staff.py --server.port 8510
+
+응답자용 phq_9.py와 따로 띄우는 앱이다. 검토 큐·결과 목록·집계 화면은 응답자 앱의 공개 URL로는 열리지 않으며,
+이 앱은 내부망에만 노출한다. PHQ_STAFF_PASSWORD가 없으면 어떤 화면도 열지 않고,
+세션마다 비밀번호로 로그인해야 한다.
+대시보드 집계는 <PHQ_STORE_PATH>.rollup.json에 두고, 화면을 그릴 때 그 뒤에 저장된 레코드만 따라잡는다.
+"""
+import hmac
+import os
+from datetime import date, datetime, timedelta
+from typing import List
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from phq_browse import BrowseFilter, ResultBrowser
+from phq_core import PHQ9, ResultSummary, decode_result, encode_result, unpack_scores
+from phq_instruments import CompiledInstrument, available_instruments, load_instrument, parse_missing_policy
+from phq_report import (
+    APP_CSS,
+    BRAND,
+    INK,
+    build_domain_section_html,
+    build_summary_section_html,
+    build_unanswered_html,
+    fragments,
+    needs_safety_block,
+)
+from phq_rollup import Rollups
+from phq_store import connect
+from phq_triage import TriageQueue
+
+PASSWORD_ENV = "PHQ_STAFF_PASSWORD"
+STORE_PATH = os.environ.get("PHQ_STORE_PATH", "").strip()
+TRIAGE_PAGE_SIZE = 20
+RESULTS_PAGE_SIZE = 25
+
+
+st.set_page_config(page_title="PHQ 검토", page_icon="🩺", layout="wide")
+st.markdown(f"<style>\n{APP_CSS}</style>", unsafe_allow_html=True)
+
+
+def _require_login() -> None:
+    """PHQ_STAFF_PASSWORD로 세션 로그인. 미설정이면 앱 전체를 닫는다."""
+    password = os.environ.get(PASSWORD_ENV, "")
+    if not password:
+        st.error(f"{PASSWORD_ENV}가 설정되지 않아 검토 앱을 열 수 없습니다.")
+        st.stop()
+    if st.session_state.get("staff_authenticated"):
+        return
+    st.markdown('<div class="section"><div class="section-title">검토 앱 로그인</div></div>', unsafe_allow_html=True)
+    with st.form("staff_login"):
+        given = st.text_input("비밀번호", type="password")
+        submitted = st.form_submit_button("로그인", type="primary")
+    if submitted:
+        if hmac.compare_digest(given.encode("utf-8"), password.encode("utf-8")):
+            st.session_state.staff_authenticated = True
+            st.rerun()
+        st.error("비밀번호가 올바르지 않습니다.")
+    st.stop()
+
+
+def _conn():
+    """세션마다 읽기 연결 하나 (응답자 앱의 저장 스레드와는 WAL로 동시 접근)"""
+    if "staff_conn" not in st.session_state:
+        st.session_state.staff_conn = connect(STORE_PATH)
+    return st.session_state.staff_conn
+
+
+@st.cache_resource
+def _rollups() -> Rollups:
+    """대시보드 누적 집계 (프로세스당 1개, 세션 사이 공유)"""
+    return Rollups.load(STORE_PATH + ".rollup.json")
+
+
+def build_item_distribution_chart(item_hist: List[List[int]], inst: CompiledInstrument) -> go.Figure:
+    """문항별 응답 분포 (선택지별 비율 누적 막대, 미응답 포함)"""
+    names = list(inst.labels) + ["미응답"]
+    colors = ["#dbeafe", "#93c5fd", "#3b82f6", "#1e3a8a", "#e5e7eb"]
+    y = [f"{q['no']}. {q['ko'][:18]}" for q in inst.questions]
+    fig = go.Figure()
+    for k, name in enumerate(names):
+        counts = [row[k] for row in item_hist]
+        fig.add_trace(
+            go.Bar(
+                x=[c / max(1, sum(row)) * 100 for c, row in zip(counts, item_hist)],
+                y=y,
+                orientation="h",
+                name=name,
+                marker=dict(color=colors[k % len(colors)], line=dict(width=0)),
+                customdata=counts,
+                hovertemplate=f"{name} · %{{customdata}}건 (%{{x:.1f}}%)<extra></extra>",
+            )
+        )
+    fig.update_layout(
+        barmode="stack",
+        xaxis=dict(range=[0, 100], ticksuffix="%", showgrid=False),
+        yaxis=dict(autorange="reversed"),
+        legend=dict(orientation="h", y=-0.12),
+        margin=dict(l=10, r=10, t=10, b=40),
+        height=60 + 34 * inst.n_items,
+        paper_bgcolor="#ffffff",
+        plot_bgcolor="#ffffff",
+        font=dict(color=INK, family="Inter, 'Noto Sans KR', Arial, sans-serif"),
+    )
+    return fig
+
+
+def _pick_instrument(key: str) -> CompiledInstrument:
+    ids = available_instruments()
+    return load_instrument(st.selectbox("검사", ids, index=ids.index(PHQ9.id), key=key))
+
+
+def render_dashboard() -> None:
+    """누적 집계(phq_rollup) 대시보드. 새 레코드만 따라잡으므로 이력 크기와 무관하게 그린다."""
+    inst = _pick_instrument("dashboard_instrument")
+    rollups = _rollups()
+    if rollups.catch_up(_conn()):
+        rollups.save()
+    roll = rollups.snapshot(inst.id)
+
+    st.markdown(
+        f'<div class="section"><div class="section-title">{inst.title} 모니터링</div>'
+        f'<div class="small-muted">저장된 결과 누적 집계 · 화면을 열 때마다 갱신</div></div>',
+        unsafe_allow_html=True,
+    )
+    today = (datetime.now() - datetime(1970, 1, 1)).days
+    week = sum(c for d, c in roll.daily.items() if d > today - 7)
+    cols = st.columns(4)
+    cols[0].metric("누적 검사", f"{roll.n:,}")
+    cols[1].metric("오늘 / 최근 7일", f"{roll.daily.get(today, 0):,} / {week:,}")
+    cols[2].metric("평균 총점", f"{roll.total.mean:.1f}", f"SD {roll.total.sd:.1f}", delta_color="off")
+    if inst.safety_item is not None:
+        rate = roll.safety_positive / roll.n * 100 if roll.n else 0.0
+        cols[3].metric(f"{inst.safety_item}번 문항 > 0", f"{rate:.1f}%", f"{roll.safety_positive:,}건", delta_color="off")
+    if roll.n == 0:
+        st.info("아직 저장된 결과가 없습니다.")
+        return
+
+    band_fig = go.Figure(
+        go.Bar(
+            x=list(inst.band_labels),
+            y=roll.by_band,
+            marker=dict(color=[seg["color"] for seg in inst.segments]),
+            text=[f"{c / roll.n * 100:.1f}%" for c in roll.by_band],
+            hovertemplate="%{x} · %{y}건<extra></extra>",
+        )
+    )
+    band_fig.update_layout(height=280, margin=dict(l=10, r=10, t=10, b=10), paper_bgcolor="#ffffff", plot_bgcolor="#ffffff")
+    days = [today - k for k in range(29, -1, -1)]
+    volume_fig = go.Figure(
+        go.Scatter(
+            x=[date(1970, 1, 1) + timedelta(days=d) for d in days],
+            y=[roll.daily.get(d, 0) for d in days],
+            mode="lines+markers",
+            line=dict(color=BRAND),
+        )
+    )
+    volume_fig.update_layout(height=280, margin=dict(l=10, r=10, t=10, b=10), paper_bgcolor="#ffffff", plot_bgcolor="#ffffff")
+
+    left, right = st.columns(2)
+    with left:
+        st.markdown("**심각도 분포**")
+        st.plotly_chart(band_fig, use_container_width=True, config={"displayModeBar": False})
+    with right:
+        st.markdown("**일별 검사 수 (최근 30일)**")
+        st.plotly_chart(volume_fig, use_container_width=True, config={"displayModeBar": False})
+
+    st.markdown("**문항별 응답 분포**")
+    st.plotly_chart(build_item_distribution_chart(roll.item_hist, inst), use_container_width=True, config={"displayModeBar": False})
+
+    if inst.domain_meta:
+        rows = "".join(
+            f"<tr><td>{meta['name']}</td><td>{roll.domains[meta['key']].mean:.2f} / {meta['max']}</td>"
+            f"<td>{roll.domains[meta['key']].sd:.2f}</td></tr>"
+            for meta in inst.domain_meta
+        )
+        st.markdown(
+            f'<div class="section"><div class="section-title">영역 평균</div>'
+            f'<table><tr><th>영역</th><th>평균</th><th>SD</th></tr>{rows}</table></div>',
+            unsafe_allow_html=True,
+        )
+
+
+def render_triage() -> None:
+    """위험도 우선 검토 큐 (phq_triage). 페이지 이동은 키셋 커서 스택으로 한다."""
+    if "triage" not in st.session_state:  # 세션마다 연결 하나 (저장 스레드와는 WAL로 동시 접근)
+        st.session_state.triage = TriageQueue(STORE_PATH)
+        st.session_state.triage_cursors = [None]
+    queue: TriageQueue = st.session_state.triage
+    cursors = st.session_state.triage_cursors
+
+    counts = queue.counts()
+    st.markdown(
+        '<div class="section"><div class="section-title">검토 큐</div>'
+        f'<div class="small-muted">대기 {counts.get("open", 0):,} · 검토 중 {counts.get("claimed", 0):,} · '
+        f'완료 {counts.get("acked", 0):,} — 안전 문항 양성 → 심각도 → 최근 순</div></div>',
+        unsafe_allow_html=True,
+    )
+    reviewer = st.text_input("검토자", key="triage_reviewer").strip()
+    if st.button("다음 항목 가져오기", type="primary", disabled=not reviewer):
+        item = queue.claim(reviewer)
+        if item is None:
+            st.info("대기 중인 항목이 없습니다.")
+        else:
+            st.success(f"#{item.assessment_id} ({item.severity}, {item.total}점)을 가져왔습니다.")
+
+    status = st.radio("상태", ["open", "claimed"], format_func={"open": "대기", "claimed": "검토 중"}.get, horizontal=True)
+    if st.session_state.get("triage_status") != status:
+        st.session_state.triage_status = status
+        cursors[:] = [None]
+    items, next_cursor = queue.page(TRIAGE_PAGE_SIZE, cursors[-1], status)
+
+    for item in items:
+        when = datetime(1970, 1, 1) + timedelta(seconds=item.ts)
+        cols = st.columns([5, 1, 1])
+        badge = "🚩 " if item.flagged else ""
+        owner = f" · {item.claimed_by}" if item.claimed_by else ""
+        cols[0].markdown(
+            f"{badge}**#{item.assessment_id}** {load_instrument(item.instrument).title} · "
+            f"{item.total}점 **{item.severity}** · {when:%Y-%m-%d %H:%M}{owner}"
+        )
+        if item.status == "open" and cols[1].button("가져오기", key=f"claim-{item.assessment_id}", disabled=not reviewer):
+            queue.claim(reviewer, item.assessment_id)
+            st.rerun()
+        if item.status == "claimed" and cols[1].button("되돌리기", key=f"release-{item.assessment_id}"):
+            queue.release(item.assessment_id)
+            st.rerun()
+        if cols[2].button("확인", key=f"ack-{item.assessment_id}", disabled=not reviewer):
+            if not queue.acknowledge(item.assessment_id, reviewer):
+                st.warning("다른 검토자가 가져간 항목입니다.")
+            st.rerun()
+    if not items:
+        st.caption("표시할 항목이 없습니다.")
+
+    nav = st.columns(2)
+    if nav[0].button("이전", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if nav[1].button("다음", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+
+
+def _stored_summary(browser: ResultBrowser, assessment_id: int) -> ResultSummary | None:
+    """저장된 레코드 → 결과 요약. 기록된 미응답 규칙으로 토큰을 거쳐 응답자 화면과 같은 총점을 재현한다."""
+    rec = browser.record(assessment_id)
+    if rec is None:
+        return None
+    inst = load_instrument(rec.instrument)
+    missing = [bool(rec.missing_mask >> i & 1) for i in range(inst.n_items)]
+    when = datetime(1970, 1, 1) + timedelta(seconds=rec.ts)
+    policy = parse_missing_policy(rec.missing_policy)
+    return decode_result(
+        encode_result(unpack_scores(rec.scores, inst.n_items), missing, rec.functional, when, inst, policy)
+    )
+
+
+def render_stored_result(browser: ResultBrowser, assessment_id: int) -> None:
+    """결과 목록에서 연 한 건 (응답자 결과 화면의 요약·미응답·안전·영역 블록)"""
+    if st.button("← 결과 목록"):
+        del st.session_state.browser_open
+        st.rerun()
+    summary = _stored_summary(browser, assessment_id)
+    if summary is None:
+        st.warning(f"#{assessment_id} 결과를 찾을 수 없습니다.")
+        return
+    inst = load_instrument(summary.instrument)
+    st.markdown(build_summary_section_html(summary), unsafe_allow_html=True)
+    if summary.unanswered > 0:
+        st.markdown(build_unanswered_html(summary.unanswered, summary.prorated), unsafe_allow_html=True)
+    if needs_safety_block(summary):
+        st.markdown(fragments(inst).safety, unsafe_allow_html=True)
+    if inst.domain_meta:
+        st.markdown(build_domain_section_html(summary.scores, inst), unsafe_allow_html=True)
+
+
+def render_results_browser() -> None:
+    """저장된 결과 목록 (phq_browse 키셋 페이지). 보이는 한 페이지만 읽는다."""
+    if "browser" not in st.session_state:  # 세션마다 연결 하나 (저장 스레드와는 WAL로 동시 접근)
+        st.session_state.browser = ResultBrowser(STORE_PATH)
+        st.session_state.browser_cursors = [None]
+    browser: ResultBrowser = st.session_state.browser
+    cursors = st.session_state.browser_cursors
+    if "browser_open" in st.session_state:
+        render_stored_result(browser, st.session_state.browser_open)
+        return
+
+    st.markdown('<div class="section"><div class="section-title">저장된 결과</div></div>', unsafe_allow_html=True)
+    f_cols = st.columns([1, 1, 2, 1])
+    with f_cols[0]:
+        inst = _pick_instrument("browser_instrument")
+    severity = f_cols[1].selectbox("심각도", ["전체", *inst.band_labels])
+    period = f_cols[2].date_input("기간", value=())
+    flagged = f_cols[3].checkbox(f"{inst.safety_item}번 문항 > 0") if inst.safety_item is not None else False
+    flt = BrowseFilter(
+        instrument=inst.id,
+        severity=None if severity == "전체" else severity,
+        flagged_only=flagged,
+        start=period[0] if len(period) > 0 else None,
+        end=period[1] if len(period) > 1 else (period[0] if len(period) == 1 else None),
+    )
+    if st.session_state.get("browser_filter") != flt:
+        st.session_state.browser_filter = flt
+        cursors[:] = [None]
+
+    rows, next_cursor = browser.page(flt, cursors[-1], RESULTS_PAGE_SIZE)
+    for row in rows:
+        bg, fg = inst.pill[row.severity]
+        when = datetime(1970, 1, 1) + timedelta(seconds=row.ts)
+        cols = st.columns([2, 1, 1, 2, 1])
+        cols[0].markdown(f"#{row.id} · {when:%Y-%m-%d %H:%M}")
+        cols[1].markdown(f"**{row.total}점**")
+        cols[2].markdown(
+            f'<span style="background:{bg};color:{fg};padding:2px 10px;border-radius:999px;'
+            f'font-size:0.85rem;font-weight:600;">{row.severity}</span>',
+            unsafe_allow_html=True,
+        )
+        cols[3].markdown(f"{row.functional or '—'}{' · 🚩' if row.flagged else ''}")
+        if cols[4].button("열기", key=f"open-{row.id}"):
+            st.session_state.browser_open = row.id
+            st.rerun()
+    if not rows:
+        st.caption("조건에 맞는 결과가 없습니다.")
+
+    nav = st.columns(2)
+    if nav[0].button("이전", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if nav[1].button("다음", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+
+
+VIEWS = {
+    "검토 큐": render_triage,
+    "결과 목록": render_results_browser,
+    "대시보드": render_dashboard,
+}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 로그인 → 화면 선택
+_require_login()
+if not STORE_PATH:
+    st.warning("검토 앱은 결과 저장소(PHQ_STORE_PATH)를 지정해야 사용할 수 있습니다.")
+    st.stop()
+with st.sidebar:
+    view = st.radio("화면", list(VIEWS))
+    if st.button("로그아웃"):
+        st.session_state.clear()
+        st.rerun()
+VIEWS[view]()
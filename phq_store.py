@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""완료된 검사 결과의 비동기 일괄 저장 (opt-in, SQLite WAL)
+
+PHQ_STORE_PATH 환경변수로 DB 경로를 지정했을 때만 앱이 저장한다.
+제출 경로는 ResultWriter.submit()으로 제한 큐에 넣기만 하고 바로 돌아가며,
+백그라운드 스레드가 건수/시간 기준으로 모아 한 트랜잭션에 커밋한다.
+커밋이 실패하면 배치를 버리지 않고 로그를 남긴 뒤 백오프하며 다시 시도한다.
+"""
+import atexit
+import calendar
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from phq_core import pack_scores, policy_total
+from phq_instruments import CompiledInstrument, available_instruments, load_instrument
+from phq_triage import TRIAGE_SCHEMA, backfill, triage_priority
+
+log = logging.getLogger(__name__)
+
+RETRY_BASE = 0.5    # 커밋 실패 후 첫 재시도까지(초), 실패마다 두 배
+RETRY_MAX = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id           INTEGER PRIMARY KEY,
+    ts           INTEGER NOT NULL,   -- 검사 시각 (결과 토큰과 같은 naive 로컬 시각의 epoch 초)
+    instrument   TEXT    NOT NULL,
+    total        INTEGER NOT NULL,
+    severity     TEXT    NOT NULL,
+    functional   TEXT,
+    scores       INTEGER NOT NULL,   -- 문항당 2비트 묶음 (phq_core.pack_scores)
+    missing_mask INTEGER NOT NULL,
+    unanswered   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_assessments_ts ON assessments (ts);
+"""
+
+
+def _add_flagged(conn: sqlite3.Connection) -> None:
+    """v2: 안전 문항 양성 여부 열 + 결과 목록(키셋 페이지)용 색인"""
+    conn.execute("ALTER TABLE assessments ADD COLUMN flagged INTEGER NOT NULL DEFAULT 0")
+    for instrument_id in available_instruments():
+        inst = load_instrument(instrument_id)
+        if inst.safety_item is not None:
+            conn.execute(
+                "UPDATE assessments SET flagged = ((scores >> ?) & 3) > 0 WHERE instrument = ?",
+                (2 * (inst.safety_item - 1), inst.id),
+            )
+    conn.execute("CREATE INDEX ix_assessments_browse ON assessments (instrument, ts DESC, id DESC)")
+    conn.execute("CREATE INDEX ix_assessments_severity ON assessments (instrument, severity, ts DESC, id DESC)")
+    conn.execute("CREATE INDEX ix_assessments_flagged ON assessments (instrument, flagged, ts DESC, id DESC)")
+
+
+def _add_respondent(conn: sqlite3.Connection) -> None:
+    """v3: 응답자 가명 + (응답자, 검사, 시각) 범위 읽기용 부분 색인 (추이 그래프 열까지 포함해 표 조회 없음)"""
+    conn.execute("ALTER TABLE assessments ADD COLUMN respondent TEXT")
+    conn.execute(
+        "CREATE INDEX ix_assessments_respondent ON assessments (respondent, instrument, ts, total, scores) "
+        "WHERE respondent IS NOT NULL"
+    )
+
+
+def _add_missing_policy(conn: sqlite3.Connection) -> None:
+    """v4: 총점에 적용한 미응답 처리 규칙 ("zero", "prorate:2" …). 이전 행은 모두 0점 처리였다."""
+    conn.execute("ALTER TABLE assessments ADD COLUMN missing_policy TEXT NOT NULL DEFAULT 'zero'")
+
+
+# (user_version, 적용 함수). 새 DB도 SCHEMA 뒤에 차례로 적용한다.
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (2, _add_flagged),
+    (3, _add_respondent),
+    (4, _add_missing_policy),
+]
+
+_INSERT = (
+    "INSERT INTO assessments "
+    "(ts, instrument, total, severity, functional, scores, missing_mask, unanswered, flagged, respondent, "
+    "missing_policy) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class AssessmentRecord(NamedTuple):
+    ts: int
+    instrument: str
+    total: int
+    severity: str
+    functional: str | None
+    scores: int
+    missing_mask: int
+    unanswered: int
+    flagged: bool = False   # 안전 문항 점수 > 0
+    respondent: str | None = None   # phq_core.respondent_pseudonym
+    missing_policy: str = "zero"    # total에 적용한 규칙 (MissingPolicy 문자열)
+
+
+def make_record(
+    scores: Sequence[int],
+    missing: Sequence[bool],
+    functional: str | None,
+    when: datetime,
+    inst: CompiledInstrument,
+    respondent: str | None = None,
+) -> AssessmentRecord:
+    """제출 값 → 저장 레코드. 총점은 검사의 missing_policy (앱 제출 경로·결과 토큰과 동일)
+
+    규칙상 무효(미응답 초과)면 ValueError. 문항 점수의 미응답은 0으로 묶는다.
+    """
+    scores = [0 if m else s for s, m in zip(scores, missing)]
+    unanswered = sum(1 for m in missing if m)
+    total = policy_total(sum(scores), unanswered, inst)
+    if total is None:
+        raise ValueError(f"{inst.id}: {unanswered} unanswered items exceed policy {inst.missing_policy}")
+    flagged = inst.safety_item is not None and scores[inst.safety_item - 1] > 0
+    return AssessmentRecord(
+        ts=calendar.timegm(when.timetuple()),
+        instrument=inst.id,
+        total=total,
+        severity=inst.severity(total),
+        functional=functional,
+        scores=pack_scores(scores),
+        missing_mask=sum(1 << i for i, m in enumerate(missing) if m),
+        unanswered=unanswered,
+        flagged=flagged,
+        respondent=respondent,
+        missing_policy=str(inst.missing_policy),
+    )
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA + TRIAGE_SCHEMA)
+    _migrate(conn)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATIONS[-1][0]:
+        return
+    conn.execute("BEGIN IMMEDIATE")  # 다른 연결과 동시에 열려도 한 번만 적용
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, step in MIGRATIONS:
+            if version < target:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+_STOP = object()
+
+
+class ResultWriter(threading.Thread):
+    """제한 큐 + 그룹 커밋 저장 스레드.
+
+    batch_size건이 모이거나 flush_interval초가 지나면 커밋한다. 큐가 가득 차면
+    submit()은 기다리지 않고 False를 돌려주며 dropped로 집계한다.
+    커밋이 실패하면(DB 잠김, 디스크 오류 등) 배치를 유지한 채 RETRY_BASE…RETRY_MAX초 간격으로
+    다시 시도하고, 그동안 배치가 batch_size에 이르면 큐에서 더 꺼내지 않는다(넘치면 dropped).
+    healthy()와 stats()의 alive/failing/last_error로 스레드 상태를 확인할 수 있다.
+    대시보드 집계(phq_rollup)는 여기서 갱신하지 않는다 — 응답자 앱 프로세스가 여럿이어도
+    검토 앱(phq_staff)이 저장소를 id 순으로 따라잡아 한 곳에서 유지한다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        super().__init__(name="phq-result-writer", daemon=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.committed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.last_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+        self._commit_ms_total = 0.0
+        self.failed_commits = 0
+        self.failing = 0          # 연속 실패 횟수 (성공하면 0)
+        self.retry_rows = 0       # 재시도를 기다리는 배치 크기
+        self.last_error: str | None = None
+
+    def submit(self, record: AssessmentRecord) -> bool:
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def run(self) -> None:
+        conn: sqlite3.Connection | None = None
+        batch: List[AssessmentRecord] = []
+        deadline = None
+        stopping = False
+        try:
+            while not stopping:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                item = None
+                if len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        pass
+                else:  # 실패한 배치가 가득 찬 채 재시도를 기다리는 중
+                    time.sleep(timeout)
+                if item is _STOP:
+                    stopping = True
+                elif item is not None:
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                due = time.monotonic() >= deadline if deadline is not None else False
+                if batch and (stopping or due or (len(batch) >= self.batch_size and not self.failing)):
+                    try:
+                        conn = conn or connect(self.path)
+                        self._commit(conn, batch)
+                    except Exception as exc:
+                        if conn is not None:
+                            conn.close()
+                            conn = None
+                        self._failed(exc, len(batch))
+                        if stopping:
+                            log.error("result writer stopping with %d uncommitted records", len(batch))
+                        deadline = time.monotonic() + min(RETRY_MAX, RETRY_BASE * 2 ** (self.failing - 1))
+                        continue
+                    batch = []
+                    deadline = None
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _failed(self, exc: Exception, rows: int) -> None:
+        log.warning("result writer commit of %d records failed: %s", rows, exc, exc_info=True)
+        with self._lock:
+            self.failed_commits += 1
+            self.failing += 1
+            self.retry_rows = rows
+            self.last_error = f"{type(exc).__name__}: {exc}"
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[AssessmentRecord]) -> None:
+        """배치를 한 트랜잭션에 기록한다. 실패하면 아무것도 남기지 않는다."""
+        t0 = time.perf_counter()
+        # 쓰기 잠금을 먼저 잡아 다른 프로세스의 삽입이 끼어들지 못하게 한 뒤 id 범위를 정한다.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            first_id = (conn.execute("SELECT max(id) FROM assessments").fetchone()[0] or 0) + 1
+            conn.executemany(_INSERT, batch)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            if last_id != first_id + len(batch) - 1:
+                raise sqlite3.IntegrityError(f"batch ids {first_id}..{last_id} are not contiguous")
+            conn.executemany(
+                "INSERT INTO triage (assessment_id, priority) VALUES (?, ?)",
+                [(first_id + k, triage_priority(r)) for k, r in enumerate(batch)],
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.committed += len(batch)
+            self.batches += 1
+            self.last_commit_ms = ms
+            self.max_commit_ms = max(self.max_commit_ms, ms)
+            self._commit_ms_total += ms
+            self.failing = 0
+            self.retry_rows = 0
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """큐에 남은 레코드를 모두 커밋한 뒤 종료"""
+        if self.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                log.error("result writer queue full at shutdown; %d records not committed", self._queue.qsize())
+                return
+            self.join(timeout)
+
+    def healthy(self) -> bool:
+        """스레드가 살아 있고 마지막 커밋이 성공했는지"""
+        with self._lock:
+            return self.is_alive() and not self.failing
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "alive": self.is_alive(),
+                "failing": self.failing,
+                "failed_commits": self.failed_commits,
+                "retry_rows": self.retry_rows,
+                "last_error": self.last_error,
+                "queue_depth": self._queue.qsize(),
+                "committed": self.committed,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "last_commit_ms": self.last_commit_ms,
+                "max_commit_ms": self.max_commit_ms,
+                "mean_commit_ms": self._commit_ms_total / self.batches if self.batches else 0.0,
+            }
+
+
+def writer_from_env() -> ResultWriter | None:
+    """PHQ_STORE_PATH가 있으면 저장 스레드를 시작해 돌려준다 (프로세스 종료 시 자동 flush)."""
+    path = os.environ.get("PHQ_STORE_PATH", "").strip()
+    if not path:
+        return None
+    conn = connect(path)
+    backfill(conn)
+    conn.close()
+    writer = ResultWriter(path)
+    writer.start()
+    atexit.register(writer.close)
+    return writer
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""벤치마크·테스트용 합성 응답 생성기 (청크 단위로 CSV / JSONL / Parquet에 바로 씀)
+
+    python phq_synth.py 10000000 synth.parquet --seed 1 --item-probs probs.json
+    python phq_synth.py 100000 synth.csv --loading 0.5 --missing-rate 0.02 --labels --irt-params instruments/examples/phq9.irt.json
+    python phq_synth.py 50000 synth.jsonl --corr corr.json --item-probs probs.json
+
+열: ts(timestamp[s]), item1..itemN, functional
+  문항 값은 선택지 인덱스(= 점수, LABELS 순서), 미응답은 빈 값(null). --labels면 LABELS 문자열.
+  functional은 phq_archive와 같은 코드(0 = 응답 없음, 1.. = FUNCTIONAL_OPTIONS 순서), --labels면 선택지 문자열.
+
+생성 모형(가우스 코퓰라)
+  잠재 z ~ N(0, R)에서 문항 i의 응답은 z_i를 누적 주변확률의 정규 분위수 경계로 자른 값이다.
+  R은 1요인(모든 문항 간 상관 loading²) 또는 --corr로 준 전체 상관행렬(촐레스키 분해).
+  주변확률은 --item-probs 또는 GRM(명세의 보정된 irt, --irt-params)을 θ 분포로 적분한 값이다.
+  CLI는 둘 중 하나를 반드시 받고, 예시 모수 파일이면 결과가 예시 모수 기반이라고 먼저 출력한다
+  (phq_simulate.population_from_args와 같은 규칙).
+  기능 손상은 문항 z 평균(표준화)에 functional_loading으로 묶인 잠재값을 같은 방식으로 자른다.
+  미응답은 문항마다 missing_rate 확률의 MCAR, 시각은 per_day 비율의 포아송 과정(오름차순)이다.
+CHUNK_ROWS행씩 만들어 쓰고 버리므로 메모리 사용량은 전체 행 수와 무관하다.
+"""
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import NormalDist
+from typing import Iterator, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from phq_core import PHQ9
+from phq_instruments import CompiledInstrument, load_instrument
+from phq_simulate import Population, add_population_args, population_from_args
+
+CHUNK_ROWS = 1 << 20
+QUAD_POINTS = 121
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+class SynthParams(NamedTuple):
+    population: Population = Population()      # 주변확률 (item_probs가 있으면 그대로 사용)
+    loading: float = 0.7                          # 1요인 적재량 (문항 간 잠재 상관 0.49)
+    corr: Tuple[Tuple[float, ...], ...] | None = None   # 주면 loading 대신 전체 상관행렬
+    missing_rate: float = 0.0
+    functional_probs: Sequence[float] = (0.5, 0.3, 0.15, 0.05)
+    functional_loading: float = 0.6
+    functional_missing: float = 0.1
+    start: int = 1767225600                       # 2026-01-01 00:00 UTC
+    per_day: float = 10000.0
+
+
+def item_marginals(inst: CompiledInstrument, population: Population = Population()) -> np.ndarray:
+    """(문항, 선택지) 응답 주변확률. item_probs가 없으면 GRM을 θ ~ N(mean, sd)로 적분"""
+    if population.item_probs is not None:
+        return np.asarray(population.item_probs, dtype=np.float64)
+    if inst.irt is None:
+        raise ValueError(f"{inst.id}: no irt parameters; pass item_probs")
+    z = np.linspace(-6, 6, QUAD_POINTS)
+    w = np.exp(-0.5 * z ** 2)
+    w /= w.sum()
+    theta = population.theta_mean + population.theta_sd * z
+    a = np.asarray(inst.irt[0])[:, None, None]
+    b = np.asarray(inst.irt[1])[:, :, None]
+    at_least = (1.0 / (1.0 + np.exp(-a * (theta - b)))) @ w        # (문항, 선택지−1)
+    cum = np.concatenate([np.ones((inst.n_items, 1)), at_least, np.zeros((inst.n_items, 1))], axis=1)
+    return cum[:, :-1] - cum[:, 1:]
+
+
+def _cuts(probs: np.ndarray) -> np.ndarray:
+    """행별 주변확률 → 정규 분위수 경계 (…, 선택지−1)"""
+    inv = NormalDist().inv_cdf
+    cum = np.cumsum(probs, axis=-1)[..., :-1]
+    return np.vectorize(lambda p: inv(min(max(p, 1e-12), 1 - 1e-12)))(cum)
+
+
+def _mixing(inst: CompiledInstrument, params: SynthParams) -> np.ndarray:
+    """독립 표준정규 (행, 문항) @ mixing.T ~ N(0, R)"""
+    if params.corr is None:
+        lam = params.loading
+        r = np.full((inst.n_items, inst.n_items), lam * lam)
+        np.fill_diagonal(r, 1.0)
+    else:
+        r = np.asarray(params.corr, dtype=np.float64)
+        if r.shape != (inst.n_items, inst.n_items) or not np.allclose(r, r.T) or not np.allclose(np.diag(r), 1):
+            raise ValueError(f"corr must be a symmetric {inst.n_items}×{inst.n_items} matrix with unit diagonal")
+    try:
+        return np.linalg.cholesky(r)
+    except np.linalg.LinAlgError:
+        raise ValueError("corr is not positive definite") from None
+
+
+def generate(
+    n: int, inst: CompiledInstrument = PHQ9, params: SynthParams = SynthParams(), seed: int | None = None,
+    chunk: int = CHUNK_ROWS,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """(ts int64 초, 응답 (행, 문항) int8 미응답 −1, 기능 손상 코드 int8) 청크를 차례로 낸다."""
+    rng = np.random.default_rng(seed)
+    mixing = _mixing(inst, params).T.astype(np.float32)
+    cuts = _cuts(item_marginals(inst, params.population)).astype(np.float32)
+    # 기능 손상 요인 = 문항 z 평균 / 그 표준편차 sqrt(1ᵀR1)/문항 수 → z @ to_factor
+    corr = mixing.T @ mixing
+    to_factor = np.full(inst.n_items, 1.0 / np.sqrt(corr.sum()), dtype=np.float32)
+    f_cuts = _cuts(np.asarray(params.functional_probs, dtype=np.float64)) if inst.functional_options else None
+    f_lam = params.functional_loading
+    gap = 86400.0 / params.per_day
+    clock = float(params.start)
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        z = rng.standard_normal((m, inst.n_items), dtype=np.float32) @ mixing
+        # 경계 수가 적으므로(선택지−1) 경계별 비교를 더하는 편이 searchsorted보다 빠르다
+        # 문항 열이 연속 메모리가 되도록 (문항, 행)으로 만들어 전치 뷰로 낸다 (Arrow 열 변환 시 복사 없음)
+        answers = np.zeros((inst.n_items, m), dtype=np.int8)
+        for k in range(cuts.shape[1]):
+            answers += (z.T > cuts[:, k, None]).view(np.int8)
+        if params.missing_rate > 0:
+            answers[rng.random((inst.n_items, m), dtype=np.float32) < params.missing_rate] = -1
+
+        if f_cuts is not None:
+            noise = rng.standard_normal(m, dtype=np.float32)
+            latent = f_lam * (z @ to_factor) + np.float32(np.sqrt(1 - f_lam * f_lam)) * noise
+            functional = (np.searchsorted(f_cuts, latent) + 1).astype(np.int8)
+            if params.functional_missing > 0:
+                functional[rng.random(m, dtype=np.float32) < params.functional_missing] = 0
+        else:
+            functional = np.zeros(m, dtype=np.int8)
+
+        arrivals = clock + np.cumsum(rng.exponential(gap, m))
+        clock = float(arrivals[-1])
+        yield arrivals.astype(np.int64), answers.T, functional
+
+
+def _batch(ts: np.ndarray, answers: np.ndarray, functional: np.ndarray, inst: CompiledInstrument, labels: bool) -> pa.RecordBatch:
+    item_labels = pa.array(inst.labels, type=pa.string())
+    f_labels = pa.array(inst.functional_options or [], type=pa.string())
+    columns = [pa.array(ts, type=pa.timestamp("s"))]
+    names = ["ts"]
+    for i, q in enumerate(inst.questions):
+        missing = answers[:, i] < 0
+        col = pa.array(answers[:, i].view(np.uint8), mask=missing if missing.any() else None)
+        columns.append(item_labels.take(col) if labels else col)
+        names.append(f"item{q['no']}")
+    if inst.functional_options:
+        codes = pa.array(functional.astype(np.uint8))
+        if labels:
+            codes = f_labels.take(pa.array(functional.astype(np.int64) - 1, mask=functional == 0))
+        columns.append(codes)
+        names.append("functional")
+    return pa.RecordBatch.from_arrays(columns, names=names)
+
+
+def _jsonl_lines(batch: pa.RecordBatch) -> memoryview:
+    """RecordBatch → JSON Lines (열 단위 문자열 결합, 행 반복 없음)"""
+    import pyarrow.compute as pc
+
+    pieces = []
+    for k, name in enumerate(batch.schema.names):
+        col = batch.column(k)
+        if pa.types.is_timestamp(col.type):
+            iso = pc.utf8_replace_slice(col.cast(pa.string()), 10, 11, "T")   # strftime보다 한 자릿수 빠름
+            text = pc.binary_join_element_wise('"', iso, '"', "")
+        elif pa.types.is_string(col.type):
+            text = pc.binary_join_element_wise('"', col, '"', "")
+        else:
+            text = col.cast(pa.string())
+        pieces.append(f'{"{" if k == 0 else ","}"{name}":')
+        pieces.append(pc.fill_null(text, "null"))
+    lines = pc.binary_join_element_wise(*pieces, "}\n", "")
+    offsets = np.frombuffer(lines.buffers()[1], dtype=np.int32)
+    return memoryview(lines.buffers()[2])[offsets[lines.offset]:offsets[lines.offset + len(lines)]]
+
+
+def write(path: str, n: int, inst: CompiledInstrument = PHQ9, params: SynthParams = SynthParams(),
+          seed: int | None = None, labels: bool = False) -> int:
+    """확장자(.csv/.jsonl/.parquet)에 맞는 형식으로 n행을 청크 단위로 쓴다. 쓴 행 수를 돌려준다."""
+    fmt = Path(path).suffix.lstrip(".")
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported output format {fmt!r} (use {', '.join(FORMATS)})")
+    writer = None
+    written = 0
+    with open(path, "wb") as sink:
+        try:
+            for ts, answers, functional in generate(n, inst, params, seed):
+                batch = _batch(ts, answers, functional, inst, labels)
+                if fmt == "jsonl":
+                    sink.write(_jsonl_lines(batch))
+                else:
+                    writer = writer or _open_writer(fmt, sink, batch.schema, inst)
+                    writer.write_batch(batch)
+                written += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+    return written
+
+
+def _open_writer(fmt: str, sink, schema: pa.Schema, inst: CompiledInstrument):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(sink, schema.with_metadata({"instrument": inst.id}), compression="zstd")
+    import pyarrow.csv as pacsv
+
+    return pacsv.CSVWriter(sink, schema)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="합성 응답 데이터 생성 (CSV/JSONL/Parquet)")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("dest", help=".csv, .jsonl 또는 .parquet")
+    parser.add_argument("--instrument", default=PHQ9.id)
+    add_population_args(parser)
+    parser.add_argument("--loading", type=float, default=SynthParams().loading, help="1요인 적재량 (0–1)")
+    parser.add_argument("--corr", help="문항 잠재 상관행렬 JSON (loading 대신)")
+    parser.add_argument("--missing-rate", type=float, default=SynthParams().missing_rate)
+    parser.add_argument("--functional-missing", type=float, default=SynthParams().functional_missing)
+    parser.add_argument("--start", default=None, help="첫 응답 시각 이후 (YYYY-MM-DD, UTC)")
+    parser.add_argument("--per-day", type=float, default=SynthParams().per_day)
+    parser.add_argument("--labels", action="store_true", help="문항·기능 손상을 선택지 문자열로 쓴다")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if not 0 <= args.loading < 1:
+        parser.error("--loading must be in [0, 1)")
+    inst, population = population_from_args(parser, args, load_instrument(args.instrument))
+    corr = None
+    if args.corr:
+        with open(args.corr, encoding="utf-8") as f:
+            corr = tuple(tuple(map(float, row)) for row in json.load(f))
+    start = SynthParams().start
+    if args.start:
+        start = int(datetime.strptime(args.start, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+    params = SynthParams(
+        population=population,
+        loading=args.loading,
+        corr=corr,
+        missing_rate=args.missing_rate,
+        functional_missing=args.functional_missing,
+        start=start,
+        per_day=args.per_day,
+    )
+    n = write(args.dest, args.rows, inst, params, args.seed, args.labels)
+    print(f"wrote {n:,} {inst.id} rows to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""저장된 결과의 위험도 우선 검토 큐 (임상 검토용)
+
+우선순위: 안전 문항(PHQ-9 9번) > 0  →  심각도 구간(높을수록 먼저)  →  최근 검사.
+세 값을 정수 하나(priority)로 묶어 triage 테이블에 두고 (status, priority, id) 색인을
+우선순위 색인으로 쓴다. 맨 앞 항목 가져오기(claim), 확인(acknowledge), 되돌리기(release)는
+색인 탐색 한 번(O(log n))이고, 페이지 넘김은 마지막 (priority, id) 다음부터 읽는 키셋 방식이라
+저장소 전체를 정렬하지 않는다.
+
+triage 행은 ResultWriter가 결과를 커밋하는 같은 트랜잭션에서 함께 넣는다.
+"""
+import sqlite3
+import time
+from typing import List, NamedTuple, Tuple
+
+from phq_core import unpack_scores
+from phq_instruments import load_instrument
+
+TRIAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS triage (
+    assessment_id INTEGER PRIMARY KEY REFERENCES assessments (id),
+    priority      INTEGER NOT NULL,   -- 안전 문항 양성(1비트) | 구간 인덱스(8비트) | 검사 시각(32비트)
+    status        TEXT    NOT NULL DEFAULT 'open',   -- open | claimed | acked
+    claimed_by    TEXT,
+    claimed_at    INTEGER,
+    acked_at      INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_triage_queue ON triage (status, priority DESC, assessment_id DESC);
+"""
+
+_COLUMNS = (
+    "t.assessment_id, t.priority, t.status, t.claimed_by, a.ts, a.instrument, a.total, a.severity"
+)
+
+
+class TriageItem(NamedTuple):
+    assessment_id: int
+    priority: int
+    status: str
+    claimed_by: str | None
+    ts: int
+    instrument: str
+    total: int
+    severity: str
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.priority >> 40)
+
+
+Cursor = Tuple[int, int]  # 마지막으로 본 (priority, assessment_id)
+
+
+def triage_priority(record) -> int:
+    """phq_store.AssessmentRecord → 정수 우선순위 (클수록 먼저)"""
+    inst = load_instrument(record.instrument)
+    flagged = inst.safety_item is not None and unpack_scores(record.scores, inst.n_items)[inst.safety_item - 1] > 0
+    band = inst.band_by_total[min(record.total, inst.max_total)]
+    return (int(flagged) << 40) | (band << 32) | (record.ts & 0xFFFFFFFF)
+
+
+class TriageQueue:
+    def __init__(self, db_path: str):
+        from phq_store import connect
+
+        self.conn = connect(db_path)
+
+    def page(self, limit: int = 20, after: Cursor | None = None, status: str = "open") -> Tuple[List[TriageItem], Cursor | None]:
+        """우선순위 순 한 페이지와 다음 페이지 커서(없으면 None)"""
+        sql = f"SELECT {_COLUMNS} FROM triage t JOIN assessments a ON a.id = t.assessment_id WHERE t.status = ?"
+        params: list = [status]
+        if after is not None:
+            sql += " AND (t.priority, t.assessment_id) < (?, ?)"
+            params += list(after)
+        sql += " ORDER BY t.priority DESC, t.assessment_id DESC LIMIT ?"
+        items = [TriageItem(*row) for row in self.conn.execute(sql, params + [limit])]
+        cursor = (items[-1].priority, items[-1].assessment_id) if len(items) == limit else None
+        return items, cursor
+
+    def claim(self, reviewer: str, assessment_id: int | None = None) -> TriageItem | None:
+        """가장 급한 open 항목(또는 지정 항목)을 reviewer에게 배정. 남은 항목이 없으면 None"""
+        target = (
+            "(SELECT assessment_id FROM triage WHERE status = 'open' "
+            "ORDER BY priority DESC, assessment_id DESC LIMIT 1)"
+            if assessment_id is None
+            else "?"
+        )
+        params = [reviewer, int(time.time())] + ([] if assessment_id is None else [assessment_id])
+        with self.conn:
+            row = self.conn.execute(
+                f"UPDATE triage SET status = 'claimed', claimed_by = ?, claimed_at = ? "
+                f"WHERE assessment_id = {target} AND status = 'open' RETURNING assessment_id",
+                params,
+            ).fetchone()
+        return None if row is None else self.get(row[0])
+
+    def acknowledge(self, assessment_id: int, reviewer: str) -> bool:
+        """검토 완료 처리. open이거나 같은 reviewer가 가져간 항목만"""
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE triage SET status = 'acked', claimed_by = ?, acked_at = ? "
+                "WHERE assessment_id = ? AND (status = 'open' OR (status = 'claimed' AND claimed_by = ?))",
+                (reviewer, int(time.time()), assessment_id, reviewer),
+            )
+        return cur.rowcount == 1
+
+    def release(self, assessment_id: int) -> bool:
+        """가져간 항목을 다시 큐로"""
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE triage SET status = 'open', claimed_by = NULL, claimed_at = NULL "
+                "WHERE assessment_id = ? AND status = 'claimed'",
+                (assessment_id,),
+            )
+        return cur.rowcount == 1
+
+    def get(self, assessment_id: int) -> TriageItem | None:
+        row = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM triage t JOIN assessments a ON a.id = t.assessment_id WHERE t.assessment_id = ?",
+            (assessment_id,),
+        ).fetchone()
+        return None if row is None else TriageItem(*row)
+
+    def counts(self) -> dict:
+        return dict(self.conn.execute("SELECT status, count(*) FROM triage GROUP BY status"))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def backfill(conn: sqlite3.Connection, chunk: int = 10_000) -> int:
+    """triage 행이 없는 기존 결과(이 기능 이전에 저장된 것)를 큐에 넣는다."""
+    from phq_store import AssessmentRecord
+
+    cols = ", ".join(f"a.{c}" for c in AssessmentRecord._fields)
+    added = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT a.id, {cols} FROM assessments a LEFT JOIN triage t ON t.assessment_id = a.id "
+            f"WHERE t.assessment_id IS NULL LIMIT ?",
+            (chunk,),
+        ).fetchall()
+        if not rows:
+            return added
+        with conn:
+            conn.executemany(
+                "INSERT INTO triage (assessment_id, priority) VALUES (?, ?)",
+                [(r[0], triage_priority(AssessmentRecord(*r[1:]))) for r in rows],
+            )
+        added += len(rows)
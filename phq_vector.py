@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""PHQ-9 벡터화 채점 (NumPy). phq_core.phq_severity/DOMAIN_META와 같은 규칙을 행렬 단위로 적용한다.
+
+다른 검사(phq_instruments)도 inst 인자로 같은 경로를 쓴다. 검사별 배열 표는
+spec_hash를 키로 한 번만 만든다.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Sequence
+
+import numpy as np
+
+from phq_core import DOMAIN_META, PHQ9, SEVERITY_SEGMENTS, phq_severity
+from phq_instruments import CompiledInstrument, MissingPolicy
+from phq_irt import eap_scores
+from phq_quality import flag_names, quality_flags
+
+N_ITEMS = 9
+MISSING = -1  # 응답 행렬에서 미응답 표시 (채점 시 0점)
+
+SEVERITY_LABELS = tuple(seg["label"] for seg in SEVERITY_SEGMENTS)
+SEVERITY_CUTS = np.array([seg["start"] for seg in SEVERITY_SEGMENTS[1:]], dtype=np.uint8)  # 5, 10, 15, 20
+SEVERITY_CODE_BY_TOTAL = np.searchsorted(SEVERITY_CUTS, np.arange(28), side="right").astype(np.uint8)
+if any(SEVERITY_LABELS[c] != phq_severity(t) for t, c in enumerate(SEVERITY_CODE_BY_TOTAL)):
+    raise ValueError("SEVERITY_CUTS disagree with phq_core.phq_severity")
+
+DOMAIN_COLUMNS = {meta["key"]: np.array(meta["items"]) - 1 for meta in DOMAIN_META}
+
+
+class _Tables(NamedTuple):
+    code_by_total: np.ndarray
+    labels: np.ndarray
+    domain_columns: Dict[str, np.ndarray]
+    safety_col: int | None
+
+
+@lru_cache(maxsize=None)
+def _tables_for(spec_hash: str, inst: CompiledInstrument) -> _Tables:
+    if inst is PHQ9:
+        domain_columns = DOMAIN_COLUMNS
+    else:
+        domain_columns = {key: np.array(idx, dtype=np.intp) for key, idx in inst.domain_index}
+    return _Tables(
+        code_by_total=np.array(inst.band_by_total, dtype=np.uint8),
+        labels=np.asarray(inst.band_labels, dtype=object),
+        domain_columns=domain_columns,
+        safety_col=None if inst.safety_item is None else inst.safety_item - 1,
+    )
+
+
+def _tables(inst: CompiledInstrument) -> _Tables:
+    return _tables_for(inst.spec_hash, inst)
+
+
+def as_answer_matrix(rows: Iterable[Sequence[int | None]], inst: CompiledInstrument = PHQ9) -> np.ndarray:
+    """응답 목록 → (N, 문항 수) int8 행렬. None은 MISSING, 범위 밖 값은 ValueError"""
+    n_items = inst.n_items
+    mat = np.array(
+        [[MISSING if a is None else a for a in row] for row in rows],
+        dtype=np.int16,
+    )
+    if mat.size == 0:
+        return np.empty((0, n_items), dtype=np.int8)
+    if mat.ndim != 2 or mat.shape[1] != n_items:
+        raise ValueError(f"answers must contain {n_items} items")
+    if mat.min() < MISSING or mat.max() > len(inst.labels) - 1:
+        raise ValueError(f"answers must be 0–{len(inst.labels) - 1} or null")
+    return mat.astype(np.int8)
+
+
+def _policy_totals(raw: np.ndarray, unanswered: np.ndarray, inst: CompiledInstrument, policy: MissingPolicy) -> tuple:
+    """phq_core.policy_total의 행렬판 → (총점, 유효 여부). 무효 행의 총점은 0"""
+    valid = np.ones(len(raw), dtype=bool) if policy.max_missing is None else unanswered <= policy.max_missing
+    if policy.method == "zero":
+        return np.where(valid, raw, 0).astype(np.uint8), valid
+    answered = inst.n_items - unanswered.astype(np.int32)
+    valid &= answered > 0
+    prorated = (2 * raw.astype(np.int32) * inst.n_items + answered) // (2 * np.maximum(answered, 1))
+    total = np.where(unanswered > 0, np.minimum(prorated, inst.max_total), raw)
+    return np.where(valid, total, 0).astype(np.uint8), valid
+
+
+def score_matrix(answers: np.ndarray, inst: CompiledInstrument = PHQ9, policy: MissingPolicy | None = None) -> Dict[str, np.ndarray]:
+    """(N, 문항 수) 응답 행렬 채점. 미응답(음수)은 문항 점수·영역 점수에서 0점이고,
+    총점은 미응답 처리 규칙(기본은 검사의 missing_policy)을 따른다. 무효 행은 valid=False.
+    prorated는 총점을 비례 환산한 행이다(영역 점수는 환산하지 않는다).
+
+    검사에 irt 모수가 있으면 theta/theta_se(EAP, 미응답 문항은 우도에서 제외)도 채운다.
+    quality는 응답만으로 판정하는 품질 플래그 비트(phq_quality 기본 규칙: longstring)다.
+    """
+    tables = _tables(inst)
+    answered = answers >= 0
+    scores = np.where(answered, answers, 0).astype(np.uint8)
+    unanswered = (inst.n_items - answered.sum(axis=1)).astype(np.uint8)
+    policy = policy or inst.missing_policy
+    total, valid = _policy_totals(scores.sum(axis=1, dtype=np.uint8), unanswered, inst, policy)
+    out = {
+        "total": total,
+        "severity_code": tables.code_by_total[total],
+        "unanswered": unanswered,
+        "valid": valid,
+        "prorated": valid & (unanswered > 0) if policy.method == "prorate" else np.zeros(len(total), dtype=bool),
+        "quality": quality_flags(answers, inst)["quality"],
+    }
+    if tables.safety_col is not None:
+        out[f"item{inst.safety_item}_flag"] = scores[:, tables.safety_col] > 0
+    for key, cols in tables.domain_columns.items():
+        out[key] = scores[:, cols].sum(axis=1, dtype=np.uint8)
+    if inst.irt is not None:
+        out.update(eap_scores(answers, inst))
+    return out
+
+
+def severity_labels(codes: np.ndarray, inst: CompiledInstrument = PHQ9) -> np.ndarray:
+    return _tables(inst).labels[codes]
+
+
+def results_as_dicts(
+    scored: Dict[str, np.ndarray], inst: CompiledInstrument = PHQ9, policy: MissingPolicy | None = None
+) -> List[Dict[str, object]]:
+    """score_matrix 결과 → phq_core.score_answers와 같은 모양의 dict 목록 (policy는 score_matrix와 같게)"""
+    cols = {k: v.tolist() for k, v in scored.items()}
+    labels = inst.band_labels
+    severity = [labels[c] if ok else None for c, ok in zip(cols["severity_code"], cols["valid"])]
+    totals = [t if ok else None for t, ok in zip(cols["total"], cols["valid"])]
+    policy_text = str(policy or inst.missing_policy)
+    keys = list(_tables(inst).domain_columns)
+    flag_key = None if inst.safety_item is None else f"item{inst.safety_item}_flag"
+    out = []
+    for i in range(len(severity)):
+        res: Dict[str, object] = {
+            "total": totals[i],
+            "severity": severity[i],
+            "domains": {k: cols[k][i] for k in keys},
+        }
+        if flag_key:
+            res[flag_key] = cols[flag_key][i]
+        res["unanswered"] = cols["unanswered"][i]
+        res["missing_policy"] = policy_text
+        res["prorated"] = cols["prorated"][i]
+        res["quality"] = flag_names(cols["quality"][i])
+        if "theta" in cols:
+            res["theta"] = round(cols["theta"][i], 3)
+            res["theta_se"] = round(cols["theta_se"][i], 3)
+        out.append(res)
+    return out
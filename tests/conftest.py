@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""테스트 공통 설정: 저장소 루트를 import 경로에 넣고, 모듈을 가져오기 전에 환경 변수를 고정한다."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# phq_core는 import 시점에 키를 읽는다 — 가명이 실행마다 같도록 고정
+os.environ.setdefault("PHQ_RESULT_SECRET", "test-secret")
+os.environ.setdefault("PHQ_IRT_CACHE_DIR", tempfile.mkdtemp(prefix="phq_irt_test_"))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from phq_accuracy import auc, bootstrap, count_scores, cutoff_table, merge_counts, present
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    ref = rng.random(n) < 0.3
+    total = np.clip(np.round(rng.normal(np.where(ref, 14, 6), 4)), 0, 27).astype(np.int64)
+    return total, ref.astype(np.int64)
+
+
+def test_cutoff_table_matches_direct_counts():
+    total, ref = _sample()
+    table = cutoff_table(count_scores(total, ref))
+    for c in (0, 5, 10, 27):
+        pos = total >= c
+        tp, fp = int((pos & (ref == 1)).sum()), int((pos & (ref == 0)).sum())
+        assert table["tp"][c] == tp and table["fp"][c] == fp
+        assert table["sensitivity"][c] == pytest.approx(tp / (ref == 1).sum())
+
+
+def test_auc_matches_pairwise():
+    total, ref = _sample(300, seed=1)
+    p, n = total[ref == 1], total[ref == 0]
+    pairwise = ((p[:, None] > n[None, :]) + 0.5 * (p[:, None] == n[None, :])).mean()
+    assert auc(count_scores(total, ref)) == pytest.approx(pairwise)
+
+
+def test_merge_and_bootstrap():
+    total, ref = _sample()
+    whole = count_scores(total, ref)
+    merged = merge_counts([count_scores(total[:250], ref[:250]), count_scores(total[250:], ref[250:])])
+    np.testing.assert_array_equal(merged.positive, whole.positive)
+    ci = bootstrap(whole, 200, seed=3)
+    assert ci["auc"][0] <= auc(whole) <= ci["auc"][1]
+
+
+@pytest.mark.parametrize(
+    "total, ref",
+    [
+        ([3.0, np.nan, 5.0], [0, 1, 1]),          # 빈 총점 (Arrow → NaN)
+        ([3, 4, 5], [0.0, np.nan, 1.0]),          # 빈 진단: bool로 바꾸면 양성이 되던 값
+        ([3, 4, 5], np.array([0, None, 1], dtype=object)),
+        ([3, 4, 5], [0, 2, 1]),                   # 0/1이 아닌 진단
+        ([3, 4.5, 5], [0, 1, 1]),
+        ([3, 28, 5], [0, 1, 1]),
+    ],
+)
+def test_count_scores_rejects_bad_rows(total, ref):
+    with pytest.raises(ValueError):
+        count_scores(np.asarray(total), np.asarray(ref))
+
+
+def test_present():
+    assert present(np.array([1.0, np.nan])).tolist() == [True, False]
+    assert present(np.array([1, None, "x"], dtype=object)).tolist() == [True, False, True]
+    assert present(np.array([True, False])).tolist() == [True, True]
+
+
+def test_cli_missing_rows(tmp_path):
+    path = tmp_path / "v.csv"
+    path.write_text("total,reference\n3,0\n,1\n12,\n15,1\n4,0\n", encoding="utf-8")
+    cmd = [sys.executable, os.path.join(ROOT, "phq_accuracy.py"), str(path)]
+    strict = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+    assert strict.returncode != 0 and "missing" in strict.stderr
+    dropped = subprocess.run(cmd + ["--drop-missing"], capture_output=True, text=True, cwd=ROOT)
+    assert dropped.returncode == 0, dropped.stderr
+    assert "dropped 2 rows" in dropped.stdout and "3 rows, 1 reference-positive" in dropped.stdout
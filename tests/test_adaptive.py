@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""적응형(PHQ-2 선별) 실시 흐름 — streamlit AppTest로 앱 스크립트를 그대로 돌린다."""
+import os
+
+import pytest
+
+from phq_core import PHQ9, decode_result
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "phq_9.py")
+
+
+def _start_adaptive():
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.query_params["mode"] = "adaptive"
+    at.run()
+    at.button(key="cta-hero").click().run()
+    assert [r.key for r in at.radio] == ["q1", "q2"]
+    return at
+
+
+def _submit(at):
+    at.button[0].click().run()
+    assert not at.exception
+
+
+def test_negative_gate_goes_to_phq2_result():
+    at = _start_adaptive()
+    at.radio(key="q1").set_value(PHQ9.labels[1])
+    at.radio(key="q2").set_value(PHQ9.labels[1])
+    _submit(at)
+    summary = decode_result(at.query_params["r"])
+    assert summary.instrument == "phq2" and summary.total == 2
+
+
+def test_positive_gate_reveals_remaining_items():
+    at = _start_adaptive()
+    at.radio(key="q1").set_value(PHQ9.labels[2])
+    at.radio(key="q2").set_value(PHQ9.labels[1])
+    _submit(at)
+    assert [r.key for r in at.radio] == [f"q{i}" for i in range(3, 10)] + ["functional-impact"]
+    for i in range(3, 10):
+        at.radio(key=f"q{i}").set_value(PHQ9.labels[1])
+    at.radio(key="functional-impact").set_value(PHQ9.functional_options[0])
+    _submit(at)
+    summary = decode_result(at.query_params["r"])
+    assert summary.instrument == "phq9"
+    assert summary.scores == [2, 1] + [1] * 7 and summary.total == 10
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import phq_alerts
+from phq_alerts import AlertPipeline, make_stub_server, safety_event
+from phq_core import PHQ9
+from phq_instruments import load_instrument
+
+
+def _event(item9=1):
+    return safety_event([1] * 8 + [item9], 8 + item9, "2026-03-01T09:30", PHQ9, "tok")
+
+
+def _outbox_ids(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {r[0] for r in conn.execute("SELECT event_id FROM outbox")}
+    finally:
+        conn.close()
+
+
+def _wait(pred, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not pred():
+        if time.monotonic() > end:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def stub():
+    server = make_stub_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_safety_event_only_for_positive_item():
+    assert _event(0) is None
+    assert safety_event([3] * 7, 21, "2026-03-01T09:30", load_instrument("gad7")) is None
+    ev = _event(2)
+    assert ev["item"] == 9 and ev["item_score"] == 2 and ev["total"] == 10
+
+
+def test_enqueue_persists_before_delivery(tmp_path):
+    # 배달 스레드를 시작하지 않아도 enqueue가 돌아온 시점에 이미 디스크에 있다.
+    path = str(tmp_path / "outbox.db")
+    pipeline = AlertPipeline("http://127.0.0.1:9/unused", path)
+    events = [_event() for _ in range(3)]
+    assert all(pipeline.enqueue(e) for e in events)
+    assert _outbox_ids(path) == {e["event_id"] for e in events}
+    pipeline.close()
+
+
+def test_enqueue_not_blocked_by_slow_webhook(tmp_path, stub):
+    stub.delay = 1.0
+    path = str(tmp_path / "outbox.db")
+    pipeline = AlertPipeline(f"http://127.0.0.1:{stub.server_address[1]}/", path)
+    pipeline.start()
+    pipeline.enqueue(_event())
+    time.sleep(0.1)  # 배달 스레드가 첫 POST에서 기다리는 중
+    t0 = time.perf_counter()
+    second = _event()
+    assert pipeline.enqueue(second)
+    assert time.perf_counter() - t0 < 0.5
+    assert second["event_id"] in _outbox_ids(path)
+    _wait(lambda: pipeline.stats()["delivered"] == 2)
+    pipeline.close()
+    assert len(stub.seen) == 2
+
+
+def test_retry_until_delivered_and_restart(tmp_path, stub, monkeypatch):
+    monkeypatch.setattr(phq_alerts, "BASE_BACKOFF", 0.02)
+    stub.fail_rate = 1.0
+    path = str(tmp_path / "outbox.db")
+    url = f"http://127.0.0.1:{stub.server_address[1]}/"
+    pipeline = AlertPipeline(url, path)
+    pipeline.start()
+    events = [_event() for _ in range(5)]
+    for e in events:
+        pipeline.enqueue(e)
+    _wait(lambda: pipeline.stats()["failed_attempts"] >= 2)
+    assert pipeline.stats()["last_error"] == "HTTP 503"
+    pipeline.close()
+    assert len(_outbox_ids(path)) == 5
+
+    stub.fail_rate = 0.0
+    restarted = AlertPipeline(url, path)
+    restarted.start()
+    _wait(lambda: restarted.stats()["delivered"] == 5)
+    restarted.close()
+    assert stub.seen == {e["event_id"] for e in events}
+    assert _outbox_ids(path) == set()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import numpy as np
+
+from phq_archive import ARCHIVE_DTYPE, HEADER_BYTES, POLICY_LABELS, Archive, ArchiveWriter, import_store, rows_from_records
+from phq_core import PHQ9, pack_scores, unpack_scores
+from phq_instruments import load_instrument
+from phq_store import ResultWriter, make_record
+
+
+def _rows(n, seed=0, inst=PHQ9):
+    rng = np.random.default_rng(seed)
+    answers = rng.integers(0, 4, size=(n, inst.n_items))
+    missing = rng.random((n, inst.n_items)) < 0.05
+    missing[missing.sum(axis=1) > 2] = False
+    answers[missing] = 0
+    rows = np.zeros(n, dtype=ARCHIVE_DTYPE)
+    rows["ts"] = 1_770_000_000 + np.arange(n) * 60
+    rows["answers"] = [pack_scores(a) for a in answers.tolist()]
+    rows["missing"] = (missing * (1 << np.arange(inst.n_items))).sum(axis=1)
+    rows["instrument"] = inst.code
+    rows["total"] = answers.sum(axis=1)
+    return rows, answers, missing
+
+
+def test_append_across_segments(tmp_path):
+    rows, _, _ = _rows(1000)
+    with ArchiveWriter(tmp_path, segment_records=300) as w:
+        w.append(rows[:450])
+        w.append(rows[450:])
+    archive = Archive(tmp_path)
+    assert len(archive) == 1000
+    assert [len(s) for s in archive.segments()] == [300, 300, 300, 100]
+    np.testing.assert_array_equal(np.concatenate(list(archive.segments())), rows)
+
+
+def test_reopen_truncates_partial_record(tmp_path):
+    rows, _, _ = _rows(10)
+    with ArchiveWriter(tmp_path) as w:
+        w.append(rows[:5])
+    seg = next(tmp_path.glob("seg-*.phqa"))
+    with seg.open("ab") as f:
+        f.write(b"\x01\x02\x03")  # 쓰다 만 레코드
+    with ArchiveWriter(tmp_path) as w:
+        w.append(rows[5:])
+    assert seg.stat().st_size == HEADER_BYTES + 10 * ARCHIVE_DTYPE.itemsize
+    np.testing.assert_array_equal(next(Archive(tmp_path).segments()), rows)
+
+
+def test_aggregates_match_direct_computation(tmp_path):
+    rows, answers, missing = _rows(5000, seed=3)
+    gad_rows, _, _ = _rows(700, seed=4, inst=load_instrument("gad7"))
+    with ArchiveWriter(tmp_path, segment_records=2048) as w:
+        w.append(rows)
+        w.append(gad_rows)
+    archive = Archive(tmp_path)
+    totals = answers.sum(axis=1)
+    np.testing.assert_array_equal(archive.total_histogram(), np.bincount(totals, minlength=28))
+    counts = archive.severity_counts()
+    assert sum(counts.values()) == 5000
+    assert counts[PHQ9.band_labels[0]] == int((totals < 5).sum())
+    means = archive.item_means()
+    answered = ~missing
+    expected = (answers * answered).sum(axis=0) / answered.sum(axis=0)
+    np.testing.assert_allclose(means, expected)
+    assert archive.item_positive_count(9) == int((answers[:, 8] > 0).sum())
+    assert sum(archive.severity_counts(load_instrument("gad7")).values()) == 700
+
+
+def test_import_store(tmp_path):
+    db = str(tmp_path / "s.db")
+    writer = ResultWriter(db, flush_interval=0.01)
+    writer.start()
+    records = [
+        make_record([i % 4] * 7 + [0, 1], [False] * 7 + [True, False], None, datetime(2026, 3, 1, 9, i), PHQ9)
+        for i in range(30)
+    ]
+    for r in records:
+        writer.submit(r)
+    writer.close()
+
+    last = import_store(db, str(tmp_path / "arch"), site=3)
+    assert last == 30
+    seg = next(Archive(tmp_path / "arch").segments())
+    np.testing.assert_array_equal(seg, rows_from_records(records, site=3))
+    assert (seg["policy"] & 1).all() and (seg["site"] == 3).all()
+    assert {POLICY_LABELS[c] for c in seg["policy"] >> 1} == {"prorate:2"}
+    assert unpack_scores(int(seg["answers"][5])) == [1] * 7 + [0, 1]
+    assert import_store(db, str(tmp_path / "arch"), after_id=last) == last
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from phq_api import score_one
+from phq_batcher import MicroBatcher
+from phq_instruments import load_instrument
+
+
+def _rows(n):
+    return [[(i + j) % 4 if (i + j) % 11 else None for j in range(9)] for i in range(n)]
+
+
+def test_batched_results_match_score_one():
+    async def run():
+        batcher = MicroBatcher(window_ms=1, max_items=64)
+        rows = _rows(150)
+        results = await asyncio.gather(*(batcher.score(r) for r in rows))
+        return batcher, rows, results
+
+    batcher, rows, results = asyncio.run(run())
+    for row, got in zip(rows, results):
+        want = score_one({"answers": row})
+        want.pop("id")
+        assert got == want
+    assert batcher.items == 150
+    assert batcher.batches == 3  # 64 + 64 + 창 만료 22
+
+
+def test_mixed_instruments_split_per_flush():
+    async def run():
+        batcher = MicroBatcher(window_ms=1)
+        gad7 = load_instrument("gad7")
+        a = batcher.submit([1] * 9)
+        b = batcher.submit([2] * 7, gad7)
+        return batcher, await a, await b
+
+    batcher, a, b = asyncio.run(run())
+    assert a["total"] == 9 and b["total"] == 14
+    assert batcher.batches == 2
+
+
+def test_invalid_answers_rejected_at_submit():
+    async def run():
+        batcher = MicroBatcher()
+        with pytest.raises(ValueError):
+            batcher.submit([5] * 9)
+        assert batcher.stats()["items"] == 0
+
+    asyncio.run(run())
+
+
+def test_scoring_error_fails_only_that_group(monkeypatch):
+    import phq_batcher
+
+    gad7 = load_instrument("gad7")
+    real = phq_batcher.score_matrix
+
+    def broken(answers, inst):
+        if inst.id == "phq9":
+            raise RuntimeError("boom")
+        return real(answers, inst)
+
+    monkeypatch.setattr(phq_batcher, "score_matrix", broken)
+
+    async def run():
+        batcher = MicroBatcher(window_ms=1)
+        a = batcher.submit([1] * 9)
+        b = batcher.submit([2] * 7, gad7)
+        return await asyncio.wait_for(asyncio.gather(a, b, return_exceptions=True), 1)
+
+    a, b = asyncio.run(run())
+    assert isinstance(a, RuntimeError)
+    assert b["total"] == 14
+
+
+def test_submit_copies_answers():
+    async def run():
+        batcher = MicroBatcher(window_ms=1)
+        row = [1] * 9
+        fut = batcher.submit(row)
+        row[:] = [3] * 9
+        return await fut
+
+    assert asyncio.run(run())["total"] == 9
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""phq_change 그룹 연산 — 응답자별 파이썬 반복으로 계산한 기준값과 비교한다."""
+import csv
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from phq_change import ChangeParams, cohort_summary, load_cohort, s_diff, successive_changes, write_csv
+from phq_core import PHQ9, respondent_pseudonym
+from phq_store import ResultWriter, connect, make_record
+
+
+def _cohort(seed=7, n=400, respondents=60):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(0, respondents, n),
+        rng.choice(np.arange(1_700_000_000, 1_800_000_000, 60), n, replace=False),
+        rng.integers(0, 28, n),
+    )
+
+
+def _reference(respondent, ts, total, params, sd):
+    out = {}
+    sdiff = s_diff(sd, params.reliability)
+    for r in np.unique(respondent):
+        idx = np.flatnonzero(respondent == r)
+        y = [int(v) for v in total[idx][np.argsort(ts[idx])]]
+        if len(y) < 2:
+            continue
+        change = y[-1] - y[0]
+        rci = change / sdiff
+        steps = [b - a for a, b in zip(y, y[1:])]
+        out[int(r)] = {
+            "n": len(y),
+            "baseline": y[0],
+            "latest": y[-1],
+            "change": change,
+            "max_step_drop": max(0, -min(steps)),
+            "rci": rci,
+            "reliable_improvement": rci <= -1.96,
+            "reliable_deterioration": rci >= 1.96,
+            "response": y[0] > 0 and -change >= 0.5 * y[0],
+            "remission": y[-1] < 5,
+            "recovered": rci <= -1.96 and y[0] >= params.caseness and y[-1] < params.caseness,
+        }
+    return out
+
+
+@pytest.mark.parametrize("offset", [0, 1 << 40])  # 단일 키 정렬 / lexsort 경로
+def test_cohort_summary_matches_reference(offset):
+    respondent, ts, total = _cohort()
+    respondent = respondent + offset
+    params = ChangeParams(sd=5.0)
+    got = cohort_summary(respondent, ts, total, PHQ9, params)
+    ref = _reference(respondent, ts, total, params, 5.0)
+    assert got["respondent"].tolist() == sorted(ref)
+    for i, r in enumerate(got["respondent"].tolist()):
+        for key, want in ref[r].items():
+            value = got[key][i].item()
+            if key == "rci":
+                assert value == pytest.approx(want, rel=1e-6)
+            else:
+                assert value == want, (r, key)
+
+
+def test_sd_estimated_from_baseline():
+    respondent, ts, total = _cohort(seed=3)
+    got = cohort_summary(respondent, ts, total)
+    sd = float(np.std(got["baseline"].astype(float), ddof=1))
+    expected = got["change"] / (math.sqrt(2) * sd * math.sqrt(1 - 0.89))
+    np.testing.assert_allclose(got["rci"], expected, rtol=1e-5)
+
+
+def test_successive_changes():
+    respondent = np.array([2, 1, 2, 1, 3])
+    ts = np.array([20, 30, 10, 10, 5])
+    total = np.array([5, 9, 12, 3, 7])
+    pairs = successive_changes(respondent, ts, total)
+    assert pairs["respondent"].tolist() == [1, 2]
+    assert pairs["ts_from"].tolist() == [10, 10] and pairs["ts_to"].tolist() == [30, 20]
+    assert pairs["change"].tolist() == [6, -7]
+
+
+def test_single_administrations_only():
+    got = cohort_summary(np.array([1, 2]), np.array([10, 20]), np.array([5, 6]), params=ChangeParams(sd=4.0))
+    assert len(got["respondent"]) == 0 and len(got["max_step_drop"]) == 0
+
+
+def test_load_cohort_and_csv(tmp_path):
+    path = str(tmp_path / "store.db")
+    writer = ResultWriter(path, flush_interval=0.01)
+    writer.start()
+    a, b = respondent_pseudonym("A"), respondent_pseudonym("B")
+    for day, score, who in ((1, 2, a), (8, 1, a), (1, 1, b), (2, 0, None)):
+        writer.submit(make_record([score] * 9, [False] * 9, None, datetime(2026, 3, day, 9, 0), PHQ9, who))
+    writer.close()
+
+    codes, ts, total, labels = load_cohort(connect(path), PHQ9)
+    assert len(codes) == 3 and set(labels) == {a, b}
+    summary = cohort_summary(codes, ts, total, PHQ9, ChangeParams(sd=5.0))
+    out = tmp_path / "summary.csv"
+    write_csv(str(out), summary, labels)
+    with open(out, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert rows[0]["respondent"] == a and rows[0]["baseline"] == "18" and rows[0]["latest"] == "9"
+    assert rows[0]["response"] == "True"
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import base64
+import struct
+from datetime import datetime, timezone
+
+import pytest
+
+from phq_core import (
+    PHQ9, InvalidResultToken, _TOKEN_STRUCT, _sign, decode_result, encode_result, invite_pseudonym, pack_scores,
+    respondent_invite, respondent_pseudonym, unpack_scores,
+)
+from phq_instruments import MissingPolicy, load_instrument
+
+WHEN = datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def _raw(token: str) -> bytes:
+    return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+
+
+def _token(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def test_pack_roundtrip():
+    scores = [0, 1, 2, 3, 3, 2, 1, 0, 1]
+    assert unpack_scores(pack_scores(scores)) == scores
+
+
+def test_roundtrip_complete():
+    scores = [1, 2, 0, 3, 1, 1, 2, 0, 1]
+    token = encode_result(scores, [False] * 9, PHQ9.functional_options[2], WHEN)
+    summary = decode_result(token)
+    assert summary.scores == scores
+    assert summary.total == 11
+    assert summary.sev == PHQ9.severity(11)
+    assert summary.functional == PHQ9.functional_options[2]
+    assert summary.ts == "2026-03-01 09:30"
+    assert summary.unanswered == 0 and not summary.prorated
+    assert summary.instrument == "phq9"
+
+
+def test_functional_none():
+    token = encode_result([0] * 9, [False] * 9, None, WHEN)
+    assert decode_result(token).functional is None
+
+
+def test_prorated_flag_and_total():
+    scores = [2, 2, 2, 2, 2, 2, 2, 0, 0]
+    missing = [False] * 7 + [True, True]
+    summary = decode_result(encode_result(scores, missing, None, WHEN))
+    assert summary.prorated
+    assert summary.unanswered == 2
+    assert summary.missing_mask == 0b110000000
+    assert summary.total == 18  # 14 / 7 × 9
+
+    zero = decode_result(encode_result(scores, missing, None, WHEN, policy=MissingPolicy("zero")))
+    assert not zero.prorated and zero.total == 14
+
+
+def test_too_many_missing_rejected():
+    with pytest.raises(ValueError):
+        encode_result([0] * 9, [True] * 3 + [False] * 6, None, WHEN)
+
+
+def test_other_instrument():
+    gad7 = load_instrument("gad7")
+    summary = decode_result(encode_result([3] * 7, [False] * 7, None, WHEN, gad7))
+    assert summary.instrument == "gad7" and summary.total == 21
+
+
+def test_tampered_body_rejected():
+    raw = bytearray(_raw(encode_result([1] * 9, [False] * 9, None, WHEN)))
+    raw[-_TOKEN_STRUCT.size + 2] ^= 0x01  # 본문 한 비트
+    with pytest.raises(InvalidResultToken, match="signature"):
+        decode_result(_token(bytes(raw)))
+
+
+def test_bad_signature_rejected():
+    raw = bytearray(_raw(encode_result([1] * 9, [False] * 9, None, WHEN)))
+    raw[-1] ^= 0xFF
+    with pytest.raises(InvalidResultToken, match="signature"):
+        decode_result(_token(bytes(raw)))
+
+
+@pytest.mark.parametrize("token", ["", "!!!", "AAAA", _token(b"\x02" * 30)])
+def test_malformed_rejected(token):
+    with pytest.raises(InvalidResultToken):
+        decode_result(token)
+
+
+def test_v1_layout_rejected():
+    # 버전 1(검사 코드 없음) 레이아웃은 서명이 맞아도 읽지 않는다
+    payload = struct.pack(">BII", 1, 29_000_000, pack_scores([1] * 9))
+    with pytest.raises(InvalidResultToken):
+        decode_result(_token(payload + _sign(payload)))
+
+
+def test_unknown_version_rejected():
+    payload = _TOKEN_STRUCT.pack(7, PHQ9.code, 29_000_000, 0)
+    with pytest.raises(InvalidResultToken, match="version"):
+        decode_result(_token(payload + _sign(payload)))
+
+
+def test_unknown_instrument_rejected():
+    payload = _TOKEN_STRUCT.pack(2, 250, 29_000_000, 0)
+    with pytest.raises(InvalidResultToken, match="instrument"):
+        decode_result(_token(payload + _sign(payload)))
+
+
+def test_respondent_pseudonym_stable():
+    assert respondent_pseudonym(" A-17 ") == respondent_pseudonym("A-17")
+    assert respondent_pseudonym("A-17") != respondent_pseudonym("A-18")
+    assert len(respondent_pseudonym("A-17")) == 32
+
+
+def test_respondent_is_signed_into_token():
+    pseudonym = respondent_pseudonym("A-17")
+    token = encode_result([1] * 9, [False] * 9, None, WHEN, respondent=pseudonym)
+    assert decode_result(token).respondent == pseudonym
+    assert decode_result(encode_result([1] * 9, [False] * 9, None, WHEN)).respondent is None
+
+    raw = bytearray(_raw(token))
+    raw[_TOKEN_STRUCT.size] ^= 0x01  # 가명 바이트만 바꾸면 서명이 맞지 않는다
+    with pytest.raises(InvalidResultToken, match="signature"):
+        decode_result(_token(bytes(raw)))
+    with pytest.raises(ValueError):
+        encode_result([1] * 9, [False] * 9, None, WHEN, respondent="A-17")
+
+
+def test_respondent_invite():
+    invite = respondent_invite("A-17")
+    assert invite_pseudonym(invite) == respondent_pseudonym("A-17")
+    assert invite_pseudonym("A-17") is None
+    assert invite_pseudonym(respondent_pseudonym("A-17")) is None
+    tampered = ("B" if invite[0] != "B" else "C") + invite[1:]
+    assert invite_pseudonym(tampered) is None
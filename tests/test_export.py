@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from phq_archive import ARCHIVE_DTYPE, ArchiveWriter, import_store
+from phq_core import PHQ9, score_answers
+from phq_export import _STORE_CHUNK_SQL, arrow_schema, export, open_arrow, to_table
+from phq_instruments import load_instrument
+from phq_store import AssessmentRecord, ResultWriter, connect, make_record
+
+GAD7 = load_instrument("gad7")
+
+
+def _answers(n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, 4, (n, 9)).tolist()
+    for k in range(0, n, 7):
+        rows[k][3] = None
+    return rows
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "s.db")
+    writer = ResultWriter(path, flush_interval=0.01)
+    writer.start()
+    for i, row in enumerate(_answers(60)):
+        missing = [a is None for a in row]
+        writer.submit(make_record([a or 0 for a in row], missing, None, datetime(2026, 3, 1, 9, i), PHQ9))
+        if i % 3 == 0:
+            writer.submit(make_record([1] * 7, [False] * 7, None, datetime(2026, 3, 1, 9, i), GAD7))
+    writer.close()
+    return path
+
+
+def _check(table, rows):
+    assert table.schema.names == arrow_schema(PHQ9).names  # Parquet은 timestamp[s]를 ms로 저장한다
+    assert table.num_rows == len(rows)
+    cols = table.to_pydict()
+    for k, row in enumerate(rows):
+        want = score_answers(row)
+        assert [cols[f"item{i}"][k] for i in range(1, 10)] == row
+        assert cols["total"][k] == want["total"]
+        assert cols["severity"][k] == want["severity"]
+        assert cols["unanswered"][k] == want["unanswered"]
+        assert {key: cols[key][k] for key in want["domains"]} == want["domains"]
+        assert cols["prorated"][k] is want["prorated"]
+        assert cols["missing_policy"][k] == want["missing_policy"]
+
+
+def test_store_to_parquet_and_arrow(store, tmp_path):
+    rows = _answers(60)
+    assert export(store, str(tmp_path / "out.parquet")) == 60
+    _check(pq.read_table(tmp_path / "out.parquet"), rows)
+    assert export(store, str(tmp_path / "out.arrow")) == 60
+    _check(open_arrow(str(tmp_path / "out.arrow")), rows)
+    assert to_table(store, GAD7).num_rows == 20
+
+
+def test_store_chunks_scan_primary_key_range(store):
+    conn = connect(store)
+    sql = _STORE_CHUNK_SQL.format(cols=", ".join(AssessmentRecord._fields))
+    plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (0, PHQ9.id, 10))]
+    assert any("USING INTEGER PRIMARY KEY (rowid>?)" in step for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_archive_source_matches_store(store, tmp_path):
+    import_store(store, str(tmp_path / "arch"))
+    assert to_table(str(tmp_path / "arch")).equals(to_table(store))
+
+
+def test_archive_without_policy_code(tmp_path):
+    # 규칙 코드를 넣기 전 세그먼트는 policy 바이트가 비례 환산 여부(0/1)뿐이다.
+    rows = np.zeros(2, dtype=ARCHIVE_DTYPE)
+    rows["instrument"], rows["total"], rows["missing"], rows["policy"] = PHQ9.code, 9, [0, 1], [0, 1]
+    writer = ArchiveWriter(tmp_path / "arch")
+    writer.append(rows)
+    writer.close()
+    cols = to_table(str(tmp_path / "arch")).to_pydict()
+    assert cols["prorated"] == [False, True]
+    assert cols["missing_policy"] == [None, None]
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""응답자 이력 조회와 결과 화면의 이력 — 가명은 서명된 토큰에서만 읽는다."""
+import os
+from datetime import datetime
+
+import pytest
+
+from phq_core import PHQ9, encode_result, respondent_invite, respondent_pseudonym
+from phq_history import fetch_history
+from phq_store import ResultWriter, connect, make_record
+
+pytest.importorskip("streamlit")
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "phq_9.py")
+VICTIM = respondent_pseudonym("A-17")
+WHEN = datetime(2026, 3, 2, 9, 0)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = str(tmp_path / "store.db")
+    writer = ResultWriter(path, flush_interval=0.01)
+    writer.start()
+    for day, score in ((1, 1), (2, 2), (3, 3)):
+        writer.submit(make_record([score] * 9, [False] * 9, None, datetime(2026, 3, day, 9, 0), PHQ9, VICTIM))
+    writer.submit(make_record([0] * 9, [False] * 9, None, datetime(2026, 3, 4, 9, 0), PHQ9, respondent_pseudonym("B")))
+    writer.close()
+    monkeypatch.setenv("PHQ_STORE_PATH", path)
+    st.cache_resource.clear()  # 앱의 저장 스레드를 이 저장소로 다시 만든다
+    yield path
+    st.cache_resource.clear()
+
+
+def test_fetch_history_oldest_first(store):
+    history = fetch_history(connect(store), VICTIM, PHQ9)
+    assert [a.total for a in history] == [9, 18, 27]
+    assert history[0].domains == {"somatic": 4, "cog_aff": 5}
+    assert fetch_history(connect(store), respondent_pseudonym("nobody"), PHQ9) == []
+
+
+def _result_page(token, rid=None):
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.query_params["r"] = token
+    if rid is not None:
+        at.query_params["rid"] = rid
+    at.run()
+    assert not at.exception
+    return at
+
+
+def _has_history(at):
+    return any("실시 이력" in m.value for m in at.markdown)
+
+
+def test_history_from_signed_token(store):
+    token = encode_result([2] * 9, [False] * 9, None, WHEN, respondent=VICTIM)
+    assert _has_history(_result_page(token))
+
+
+def test_rid_on_result_url_is_ignored(store):
+    token = encode_result([2] * 9, [False] * 9, None, WHEN)
+    assert not _has_history(_result_page(token, rid=respondent_invite("A-17")))
+
+
+@pytest.mark.parametrize("signed", [True, False])
+def test_submission_links_only_signed_invite(store, signed):
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.query_params["rid"] = respondent_invite("A-17") if signed else "A-17"  # 번호만으로는 연결되지 않는다
+    at.run()
+    at.button(key="cta-hero").click().run()
+    for i in range(1, 10):
+        at.radio(key=f"q{i}").set_value(PHQ9.labels[0])
+    at.radio(key="functional-impact").set_value(PHQ9.functional_options[0])
+    at.button[0].click().run()
+    assert not at.exception
+    assert _has_history(at) is signed
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import http.client
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from phq_core import encode_result
+from phq_http import CACHE_CONTROL, make_server, render_report
+
+WHEN = datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def server():
+    srv = make_server("127.0.0.1", 0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv.server_address[1]
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(port, path, headers=None, method="GET"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request(method, path, headers=headers or {})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp, body
+
+
+def test_render_is_deterministic():
+    token = encode_result([1] * 9, [False] * 9, None, WHEN)
+    etag, body = render_report(token)
+    assert render_report(token) == (etag, body)
+    assert etag.startswith('"') and etag.endswith('"')
+    other = encode_result([2] * 9, [False] * 9, None, WHEN)
+    assert render_report(other)[0] != etag
+
+
+def test_get_and_conditional_get(server):
+    token = encode_result([1, 2, 0, 3, 1, 1, 2, 0, 1], [False] * 9, None, WHEN)
+    resp, body = _get(server, f"/report/{token}")
+    assert resp.status == 200
+    assert resp.getheader("Cache-Control") == CACHE_CONTROL
+    assert resp.getheader("Content-Type").startswith("text/html")
+    etag = resp.getheader("ETag")
+    assert body
+
+    resp, body = _get(server, f"/report?r={token}", {"If-None-Match": etag})
+    assert resp.status == 304 and body == b""
+    assert resp.getheader("ETag") == etag
+
+    resp, body = _get(server, f"/report/{token}", method="HEAD")
+    assert resp.status == 200 and body == b""
+
+
+def test_invalid_and_unknown_paths(server):
+    assert _get(server, "/report/not-a-token")[0].status == 400
+    assert _get(server, "/elsewhere")[0].status == 404
+    assert _get(server, "/healthz")[0].status == 200
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+import phq_index
+from phq_archive import ARCHIVE_DTYPE, ArchiveWriter
+from phq_core import PHQ9
+from phq_index import PartitionIndex
+
+DAY0 = date(2026, 3, 1)
+
+
+def _rows(n, seed, start_day=DAY0):
+    rng = np.random.default_rng(seed)
+    rows = np.zeros(n, dtype=ARCHIVE_DTYPE)
+    base = (start_day - date(1970, 1, 1)).days * 86400
+    rows["ts"] = base + rng.integers(0, 10 * 86400, n)
+    rows["instrument"] = PHQ9.code
+    rows["total"] = rng.integers(0, 28, n)
+    rows["site"] = rng.integers(1, 4, n)
+    return rows
+
+
+def _expected(rows, start, end, bands=None, site=None):
+    day = rows["ts"] // 86400
+    lo, hi = (start - date(1970, 1, 1)).days, (end - date(1970, 1, 1)).days
+    sev = np.array([PHQ9.severity(int(t)) for t in rows["total"]])
+    mask = (day >= lo) & (day <= hi)
+    if bands is not None:
+        mask &= np.isin(sev, bands)
+    if site is not None:
+        mask &= rows["site"] == site
+    return rows[mask]
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(phq_index, "BLOCK_RECORDS", 64)
+
+
+def test_counts_and_rows(tmp_path, small_blocks):
+    rows = _rows(3000, seed=1)
+    with ArchiveWriter(tmp_path, segment_records=1000) as w:
+        w.append(rows)
+    index = PartitionIndex.load(tmp_path)
+    assert index.update() == 3000
+
+    start, end = DAY0 + timedelta(days=2), DAY0 + timedelta(days=5)
+    bands = list(PHQ9.band_labels[3:])
+    for site in (None, 2):
+        want = _expected(rows, start, end, bands, site)
+        assert index.count(start, end, bands, site) == len(want)
+        got = index.rows(start, end, bands, site)
+        assert sorted(got.tolist()) == sorted(want.tolist())
+    by_band = index.counts_by_band(DAY0, DAY0 + timedelta(days=20))
+    assert sum(by_band.values()) == 3000
+
+
+def test_incremental_update_and_reload(tmp_path, small_blocks):
+    first, second = _rows(500, seed=2), _rows(700, seed=3)
+    with ArchiveWriter(tmp_path, segment_records=800) as w:
+        w.append(first)
+    index = PartitionIndex.load(tmp_path)
+    index.update()
+    index.save()
+    with ArchiveWriter(tmp_path, segment_records=800) as w:
+        w.append(second)
+
+    reloaded = PartitionIndex.load(tmp_path)
+    assert reloaded.update() == 700
+    assert reloaded.update() == 0
+    both = np.concatenate([first, second])
+    end = DAY0 + timedelta(days=10)
+    assert reloaded.count(DAY0, end) == 1200
+    assert sorted(reloaded.rows(DAY0, end, site=1).tolist()) == sorted(_expected(both, DAY0, end, site=1).tolist())
+    for blocks in reloaded.blocks.values():
+        assert len(blocks) == len(set(blocks))
+
+
+def test_empty_query(tmp_path):
+    index = PartitionIndex.load(tmp_path)
+    assert index.count(DAY0, DAY0) == 0
+    assert len(index.rows(DAY0, DAY0)) == 0
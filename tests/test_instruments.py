@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import copy
+import json
+
+import pytest
+
+from phq_core import COG_AFF, PHQ9, SOMATIC, phq_severity
+from phq_instruments import (
+    SPEC_DIR, MissingPolicy, available_instruments, compile_instrument, instrument_by_code, load_instrument,
+    parse_missing_policy,
+)
+
+
+def _spec(instrument_id="phq9"):
+    with (SPEC_DIR / f"{instrument_id}.json").open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_available_and_codes_unique():
+    ids = available_instruments()
+    assert {"phq9", "gad7", "phq2"} <= set(ids)
+    codes = [load_instrument(i).code for i in ids]
+    assert len(set(codes)) == len(codes)
+    for i in ids:
+        assert instrument_by_code(load_instrument(i).code).id == i
+
+
+def test_phq9_tables():
+    assert PHQ9.max_total == 27
+    assert PHQ9.band_cuts == (5, 10, 15, 20)
+    assert [phq_severity(t) for t in (0, 4, 5, 9, 10, 14, 15, 19, 20, 27)] == [
+        PHQ9.band_labels[k] for k in (0, 0, 1, 1, 2, 2, 3, 3, 4, 4)
+    ]
+    assert dict(PHQ9.domain_index) == {
+        "somatic": tuple(i - 1 for i in SOMATIC), "cog_aff": tuple(i - 1 for i in COG_AFF),
+    }
+    assert PHQ9.severity(-3) == PHQ9.severity(0) and PHQ9.severity(99) == PHQ9.severity(27)
+
+
+def test_spec_hash_tracks_content():
+    spec = _spec()
+    changed = copy.deepcopy(spec)
+    changed["bands"][0]["guidance"] += "."
+    assert compile_instrument(spec).spec_hash == PHQ9.spec_hash
+    assert compile_instrument(changed).spec_hash != PHQ9.spec_hash
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda s: s["items"].pop(),                                   # 밴드가 0..max를 덮지 않음
+    lambda s: s["items"][0].update(no=2),                         # 문항 번호
+    lambda s: s["bands"][1].update(min=6),                        # 구간 사이 빈틈
+    lambda s: s["domains"][0]["items"].append(10),                # 없는 문항
+    lambda s: s.update(safety_item=12),
+    lambda s: s.update(missing_policy="mean"),
+    lambda s: s.update(irt={"a": [1.0] * 9, "b": [[1.0, 0.0, 2.0]] * 9}),  # 경계값이 증가하지 않음
+])
+def test_invalid_specs_rejected(mutate):
+    spec = _spec()
+    mutate(spec)
+    with pytest.raises(ValueError):
+        compile_instrument(spec)
+
+
+def test_unknown_instrument():
+    with pytest.raises(KeyError):
+        load_instrument("nope")
+    with pytest.raises(KeyError):
+        instrument_by_code(250)
+
+
+def test_parse_missing_policy():
+    assert parse_missing_policy("zero") == MissingPolicy("zero")
+    assert parse_missing_policy("prorate:2") == MissingPolicy("prorate", 2)
+    assert str(MissingPolicy("prorate", 2)) == "prorate:2"
+    for bad in ("", "prorate:-1", "prorate:x", "mean"):
+        with pytest.raises(ValueError):
+            parse_missing_policy(bad)
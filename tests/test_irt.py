@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""GRM EAP 점수 — 기본 배포에서는 꺼져 있고, 모수 파일을 명시적으로 붙일 때만 계산한다."""
+import os
+
+import numpy as np
+import pytest
+
+from phq_api import score_one
+from phq_core import PHQ9
+from phq_instruments import SPEC_DIR, load_instrument, with_irt_params
+from phq_irt import eap_for, eap_scores, eap_table
+from phq_vector import score_matrix
+
+EXAMPLE = os.path.join(SPEC_DIR, "examples", "phq9.irt.json")
+
+
+@pytest.fixture(scope="module")
+def example_inst():
+    return with_irt_params(PHQ9, EXAMPLE)
+
+
+def test_no_theta_without_calibrated_params():
+    for instrument_id in ("phq9", "gad7", "phq2"):
+        assert load_instrument(instrument_id).irt is None
+    assert eap_for([1] * 9, [False] * 9) is None
+    assert "theta" not in score_matrix(np.ones((3, 9), dtype=np.int8), PHQ9)
+    assert "theta" not in score_one({"answers": [1] * 9})
+
+
+def test_example_params_only_when_attached(example_inst):
+    assert example_inst.irt is not None and PHQ9.irt is None
+    assert example_inst.spec_hash == PHQ9.spec_hash
+
+
+def _reference_eap(row, inst):
+    nodes = np.linspace(-4.0, 4.0, 61)
+    post = np.exp(-0.5 * nodes ** 2)
+    for (a, bs), x in zip(zip(*inst.irt), row):
+        cum = [1.0] + [1 / (1 + np.exp(-a * (nodes - b))) for b in bs] + [0.0]
+        post = post * (np.asarray(cum[x]) - np.asarray(cum[x + 1]))
+    post /= post.sum()
+    theta = post @ nodes
+    return theta, np.sqrt(post @ nodes ** 2 - theta ** 2)
+
+
+def test_table_matches_direct_posterior(example_inst):
+    rng = np.random.default_rng(0)
+    answers = rng.integers(0, 4, (50, 9)).astype(np.int8)
+    got = eap_scores(answers, example_inst)
+    assert eap_table(example_inst) is not None
+    ref = np.array([_reference_eap(row, example_inst) for row in answers])
+    np.testing.assert_allclose(got["theta"], ref[:, 0], atol=1e-5)
+    np.testing.assert_allclose(got["theta_se"], ref[:, 1], atol=1e-5)
+
+
+def test_missing_items_use_answered_only(example_inst):
+    full = eap_for([2] * 9, [False] * 9, example_inst)
+    partial = eap_for([2] * 8 + [0], [False] * 8 + [True], example_inst)
+    assert partial != full
+    assert partial[1] > full[1]  # 문항이 적으면 사후 SD가 크다
+    higher = eap_for([3] * 8 + [0], [False] * 8 + [True], example_inst)
+    assert higher[0] > partial[0]
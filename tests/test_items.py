@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from phq_core import PHQ9
+from phq_items import ItemAccumulator, accumulate, analyze, merge
+from phq_store import ResultWriter, connect, make_record
+
+
+def _answers(n=500, seed=0, missing=0.0):
+    rng = np.random.default_rng(seed)
+    trait = rng.normal(size=(n, 1))
+    x = np.clip(np.round(1.2 + trait + rng.normal(scale=0.8, size=(n, 9))), 0, 3).astype(np.int8)
+    x[rng.random(x.shape) < missing] = -1
+    return x
+
+
+def _alpha(x):
+    cov = np.cov(x, rowvar=False)
+    k = x.shape[1]
+    return k / (k - 1) * (1 - np.trace(cov) / cov.sum())
+
+
+def test_analyze_matches_direct_numpy_on_complete_rows():
+    x = _answers(missing=0.02)
+    result = analyze(accumulate(x))
+    complete = x[(x >= 0).all(axis=1)].astype(np.float64)
+    assert result.n == len(complete) < len(x)
+    assert result.alpha == pytest.approx(_alpha(complete))
+    total = complete.sum(axis=1)
+    for i in range(9):
+        rest = total - complete[:, i]
+        assert result.item_total_r[i] == pytest.approx(np.corrcoef(complete[:, i], rest)[0, 1])
+        assert result.alpha_if_deleted[i] == pytest.approx(_alpha(np.delete(complete, i, axis=1)))
+    np.testing.assert_allclose(result.item_mean, complete.mean(axis=0))
+    np.testing.assert_allclose(result.item_sd, complete.std(axis=0, ddof=1))
+
+
+def test_options_count_every_row_including_missing():
+    x = _answers(200, seed=1, missing=0.1)
+    stats = accumulate(x)
+    for i in range(9):
+        np.testing.assert_array_equal(stats.options[i, :4], np.bincount(x[x[:, i] >= 0, i], minlength=4))
+        assert stats.options[i, -1] == (x[:, i] < 0).sum()
+    result = analyze(stats)
+    np.testing.assert_allclose(result.missing_rate, (x < 0).mean(axis=0))
+    np.testing.assert_allclose(result.distribution.sum(axis=1), 1)
+
+
+def test_merge_is_order_invariant():
+    x = _answers(300, seed=2, missing=0.03)
+    parts = [accumulate(x[:100]), accumulate(x[100:170]), accumulate(x[170:])]
+    whole = accumulate(x)
+    for merged in (merge(parts), merge(parts[::-1])):
+        assert merged.n == whole.n
+        np.testing.assert_array_equal(merged.cross, whole.cross)
+        np.testing.assert_array_equal(merged.options, whole.options)
+
+
+def test_too_few_complete_rows_gives_nan():
+    result = analyze(accumulate(_answers(1)))
+    assert np.isnan(result.alpha)
+
+
+def _fill(path, rows):
+    writer = ResultWriter(path, flush_interval=0.01)
+    writer.start()
+    for i, scores in enumerate(rows):
+        writer.submit(make_record(scores, [False] * 9, None, datetime(2026, 3, 1, 9, i % 60), PHQ9))
+    writer.close()
+
+
+def test_store_catch_up_incremental_and_persisted(tmp_path):
+    path = str(tmp_path / "s.db")
+    x = _answers(90, seed=3)
+    _fill(path, x[:60].tolist())
+
+    acc = ItemAccumulator.load(path + ".items.json")
+    assert acc.catch_up_store(connect(path), chunk=25) == 60
+    acc.save()
+
+    _fill(path, x[60:].tolist())
+    reloaded = ItemAccumulator.load(path + ".items.json")
+    assert reloaded.last_id == 60
+    assert reloaded.catch_up_store(connect(path)) == 30
+    np.testing.assert_array_equal(reloaded.stats.cross, accumulate(x).cross)
+    assert analyze(reloaded.stats).alpha == pytest.approx(_alpha(x.astype(np.float64)))
+
+
+def test_load_rejects_other_instrument(tmp_path):
+    from phq_instruments import load_instrument
+
+    acc = ItemAccumulator(PHQ9, tmp_path / "items.json")
+    acc.save()
+    with pytest.raises(ValueError):
+        ItemAccumulator.load(tmp_path / "items.json", load_instrument("gad7"))
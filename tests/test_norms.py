@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""규준 백분위/T점수 — norms/에 실제 규준이 있을 때만 적재하고, 예시 빈도표는 자동으로 쓰지 않는다."""
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import phq_norms
+from phq_core import PHQ9, encode_result
+from phq_norms import NORM_DIR, compile_norms, load_norms, lookup, norm_columns, read_norms
+from phq_vector import score_matrix
+
+EXAMPLE = os.path.join(NORM_DIR, "examples", "phq9.json")
+
+
+@pytest.fixture
+def configured(tmp_path, monkeypatch):
+    shutil.copy(EXAMPLE, tmp_path / "phq9.json")
+    monkeypatch.setattr(phq_norms, "NORM_DIR", tmp_path)
+    load_norms.cache_clear()
+    yield
+    load_norms.cache_clear()
+
+
+def test_no_norms_by_default():
+    load_norms.cache_clear()
+    assert load_norms(PHQ9) is None
+    assert lookup({"total": 10}) == []
+    assert norm_columns(score_matrix(np.ones((2, 9), dtype=np.int8), PHQ9)) == {}
+
+
+def test_midrank_percentile_and_t():
+    spec = {"groups": {"g": {"freq": {"total": [50, 30, 20] + [0] * 25}}}}
+    g = compile_norms(spec, PHQ9).groups["g"]
+    np.testing.assert_allclose(g.percentile["total"][:3], [25.0, 65.0, 90.0], rtol=1e-6)
+    assert g.t_score["total"][0] == pytest.approx(50 + 10 * -0.6744898, abs=1e-3)
+    assert g.percentile["total"][-1] == pytest.approx(100.0)
+
+
+def test_bad_scale_length_rejected():
+    with pytest.raises(ValueError, match="needs 28 counts"):
+        compile_norms({"groups": {"g": {"freq": {"total": [1] * 10}}}}, PHQ9)
+
+
+def test_configured_norms_lookup(configured):
+    norms = load_norms(PHQ9)
+    assert norms is not None and norms.default == "all"
+    rows = lookup({"total": 10, "somatic": 4})
+    assert [r.scale for r in rows] == ["total", "somatic"]
+    assert 50 < rows[0].percentile < 100 and rows[0].t_score > 50
+    assert read_norms(EXAMPLE).groups.keys() == norms.groups.keys()
+
+    answers = np.array([[1] * 9, [-1] * 9], dtype=np.int8)
+    cols = norm_columns(score_matrix(answers, PHQ9), PHQ9)
+    assert np.isnan(cols["total_percentile"][1]) and not np.isnan(cols["total_percentile"][0])
+
+
+def test_result_page_without_norms():
+    pytest.importorskip("streamlit")
+    from streamlit.testing.v1 import AppTest
+
+    load_norms.cache_clear()
+    app = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "phq_9.py")
+    at = AppTest.from_file(app, default_timeout=30)
+    at.query_params["r"] = encode_result([1] * 9, [False] * 9, None, datetime(2026, 3, 1, 9, 0))
+    at.run()
+    assert not at.exception
+    assert not any("규준 비교" in m.value for m in at.markdown)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import phq_pandas  # noqa: E402,F401  (df.phq9 접근자 등록)
+from phq_core import PHQ9  # noqa: E402
+from phq_vector import score_matrix  # noqa: E402
+
+COLS = [f"item{i}" for i in range(1, 10)]
+
+
+def _frame(rows, index=None):
+    return pd.DataFrame(rows, columns=COLS, index=index)
+
+
+def test_numeric_columns_match_score_matrix():
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 4, (50, 9)).astype(np.int8)
+    x[rng.random(x.shape) < 0.05] = -1
+    df = _frame(np.where(x >= 0, x, np.nan), index=range(100, 150))
+    scored = df.phq9.score()
+    expected = score_matrix(x, PHQ9)
+    assert list(scored.index) == list(df.index)
+    valid = expected["valid"]
+    np.testing.assert_array_equal(scored["valid"], valid)
+    np.testing.assert_array_equal(scored["total"][valid].astype(int), expected["total"][valid])
+    assert scored["total"][~valid].isna().all()
+    np.testing.assert_array_equal(scored["prorated"], expected["prorated"])
+    for key, _ in PHQ9.domain_index:
+        np.testing.assert_array_equal(scored[key], expected[key])
+
+
+def test_labels_nullable_ints_and_numbers_agree():
+    labels = _frame([[PHQ9.labels[1]] * 8 + [None], [PHQ9.labels[3]] * 9])
+    ints = _frame([[1] * 8 + [None], [3] * 9]).astype("Int64")
+    cats = labels.astype(pd.CategoricalDtype(PHQ9.labels))
+    a, b, c = labels.phq9.score(), ints.phq9.score(), cats.phq9.score()
+    pd.testing.assert_frame_equal(a, b)
+    pd.testing.assert_frame_equal(a, c)
+    assert list(a["prorated"]) == [True, False]
+    assert list(a["unanswered"]) == [1, 0]
+
+
+def test_invalid_rows_are_na_not_wrapped_uint8():
+    df = _frame([[None] * 3 + [1] * 6, [0] * 9])
+    scored = df.phq9.score()
+    assert scored["total"].dtype == "UInt8"
+    assert pd.isna(scored["total"][0]) and scored["total"][1] == 0
+    assert pd.isna(scored["severity"][0]) and scored["severity"][1] == PHQ9.band_labels[0]
+    assert scored["severity"].cat.ordered
+
+
+def test_policy_argument():
+    df = _frame([[1] * 8 + [None]])
+    assert not df.phq9.score(policy="prorate:0")["valid"][0]
+    zero = df.phq9.score(policy="zero")
+    assert zero["valid"][0] and zero["total"][0] == 8 and not zero["prorated"][0]
+
+
+@pytest.mark.parametrize("bad", [4, 1.5, -1, "가끔"])
+def test_bad_values_raise(bad):
+    df = _frame([[1] * 8 + [bad]])
+    with pytest.raises(ValueError, match="item9"):
+        df.phq9.score()
+
+
+def test_missing_or_wrong_number_of_columns():
+    df = _frame([[1] * 9]).drop(columns="item4")
+    with pytest.raises(KeyError):
+        df.phq9.score()
+    with pytest.raises(ValueError):
+        df.phq9.score(item_cols=COLS[:8])
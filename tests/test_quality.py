@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from phq_core import PHQ9
+from phq_quality import (
+    FUNCTIONAL, GUTTMAN, LONGSTRING, TOO_FAST, QualityParams, guttman_errors, longstring, quality_flags, row_flags,
+    step_order,
+)
+
+
+def _cohort(n=3000, seed=0):
+    """문항마다 응답 경향이 다른 자료 (문항 4가 가장 쉽고 문항 9가 가장 어렵다)"""
+    rng = np.random.default_rng(seed)
+    ease = np.array([0.9, 0.8, 1.1, 1.4, 0.7, 0.6, 0.5, 0.4, 0.1])
+    theta = rng.normal(0, 1, (n, 1))
+    answers = np.clip(np.round(theta + ease + rng.normal(0, 0.5, (n, 9))), 0, 3).astype(np.int8)
+    answers[rng.random(answers.shape) < 0.02] = -1
+    return answers
+
+
+def test_step_order_follows_observed_rates():
+    answers = _cohort()
+    order = step_order(answers, PHQ9)
+    assert len(order) == 27 and set(order) == {(i, k) for i in range(9) for k in (1, 2, 3)}
+    assert order[0] == (3, 1) and order[-1] == (8, 3)
+    rates = [(answers[:, i] >= k).sum() / (answers[:, i] >= 0).sum() for i, k in order]
+    assert rates == sorted(rates, reverse=True)
+
+
+def test_guttman_errors_extremes():
+    order = tuple((i, k) for k in (1, 2, 3) for i in range(9))  # 문항 순서 = 쉬운 순
+    consistent = np.array([[2, 1, 1, 1, 1, 1, 1, 1, 1]], dtype=np.int8)  # 쉬운 단계 10개만 통과
+    reversed_ = np.array([[0, 0, 0, 0, 0, 0, 0, 0, 3]], dtype=np.int8)   # 가장 어려운 문항만 통과
+    assert guttman_errors(consistent, order)[0] == 0
+    assert guttman_errors(reversed_, order)[0] == np.float32(48 / 72)
+    assert np.isnan(guttman_errors(consistent, None)[0])
+
+
+def test_guttman_off_by_default():
+    answers = _cohort(500)
+    assert not (quality_flags(answers, PHQ9)["quality"] & GUTTMAN).any()
+    assert QualityParams().guttman_max is None
+
+
+def test_guttman_with_observed_order_table_matches_rows():
+    answers = _cohort(800)
+    params = QualityParams(guttman_max=0.3, step_order=step_order(answers, PHQ9))
+    flags = quality_flags(answers, PHQ9, params=params)["quality"]
+    assert 0 < np.count_nonzero(flags & GUTTMAN) < len(answers) // 4
+    for row, bits in zip(answers[:200], flags[:200]):
+        got = row_flags([None if a < 0 else int(a) for a in row], PHQ9, params)
+        assert got == bits & (LONGSTRING | GUTTMAN)
+    rng = np.random.default_rng(5)
+    noise = rng.integers(0, 4, (800, 9)).astype(np.int8)
+    noise_rate = np.count_nonzero(quality_flags(noise, PHQ9, params=params)["quality"] & GUTTMAN) / 800
+    assert noise_rate > np.count_nonzero(flags & GUTTMAN) / 800
+
+
+def test_longstring_functional_too_fast():
+    answers = np.array([[2] * 9, [0] * 9, [1, 2] * 4 + [1], [3] * 4 + [-1] + [3] * 4], dtype=np.int8)
+    assert longstring(answers).tolist() == [9, 0, 1, 4]
+    out = quality_flags(answers, PHQ9, functional=np.array([0, 4, 0, 0]), seconds=np.array([3.0, 60, np.nan, 60]))
+    assert out["quality"].tolist() == [LONGSTRING | TOO_FAST, FUNCTIONAL, 0, 0]
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from phq_core import PHQ9
+from phq_rollup import Rollups, Welford
+from phq_store import ResultWriter, connect, make_record
+
+
+def test_welford_matches_numpy():
+    xs = np.random.default_rng(0).normal(10, 3, 1000)
+    w = Welford()
+    for x in xs:
+        w.add(float(x))
+    assert w.n == 1000
+    assert w.mean == pytest.approx(xs.mean())
+    assert w.sd == pytest.approx(xs.std(ddof=1))
+
+
+def _fill(path, rows):
+    writer = ResultWriter(path, flush_interval=0.01)
+    writer.start()
+    for scores in rows:
+        writer.submit(make_record(scores, [False] * 9, None, datetime(2026, 3, 1, 9, 0), PHQ9))
+    writer.close()
+
+
+def test_catch_up_incremental_and_persisted(tmp_path):
+    path = str(tmp_path / "s.db")
+    rng = np.random.default_rng(1)
+    first = rng.integers(0, 4, (40, 9)).tolist()
+    second = rng.integers(0, 4, (25, 9)).tolist()
+    _fill(path, first)
+
+    rollups = Rollups.load(path + ".rollup.json")
+    conn = connect(path)
+    assert rollups.catch_up(conn) == 40
+    rollups.save()
+
+    _fill(path, second)
+    reloaded = Rollups.load(path + ".rollup.json")
+    assert reloaded.last_id == 40
+    assert reloaded.catch_up(conn) == 25
+    assert reloaded.catch_up(conn) == 0
+
+    roll = reloaded.snapshot("phq9")
+    totals = [sum(r) for r in first + second]
+    assert roll.n == 65
+    assert roll.total.mean == pytest.approx(np.mean(totals))
+    assert roll.total.sd == pytest.approx(np.std(totals, ddof=1))
+    assert sum(roll.by_band) == 65
+    assert roll.safety_positive == sum(1 for r in first + second if r[8] > 0)
+
+
+def test_concurrent_catch_up_counts_once(tmp_path):
+    path = str(tmp_path / "s.db")
+    _fill(path, [[1] * 9] * 300)
+    rollups = Rollups()
+    threads = [threading.Thread(target=rollups.catch_up, args=(connect(path), 7)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert rollups.snapshot("phq9").n == 300
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from phq_core import PHQ9
+from phq_instruments import SPEC_DIR, with_irt_params
+from phq_simulate import Population, forecast, sample_answers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_IRT = os.path.join(SPEC_DIR, "examples", "phq9.irt.json")
+PROBS = tuple((0.5, 0.3, 0.15, 0.05) for _ in range(9))
+
+
+def test_item_probs_sampling():
+    answers = sample_answers(200_000, PHQ9, Population(item_probs=PROBS), np.random.default_rng(0))
+    freq = np.stack([np.bincount(answers[:, i], minlength=4) for i in range(9)]) / len(answers)
+    np.testing.assert_allclose(freq, PROBS, atol=0.005)
+
+
+def test_grm_needs_params():
+    with pytest.raises(ValueError, match="item_probs"):
+        sample_answers(10, PHQ9, Population(), np.random.default_rng(0))
+    answers = sample_answers(1000, with_irt_params(PHQ9, EXAMPLE_IRT), Population(), np.random.default_rng(0))
+    assert answers.shape == (1000, 9) and answers.min() >= 0 and answers.max() <= 3
+
+
+def test_forecast_counts_add_up():
+    result = forecast(500, days=5, replicates=20, population=Population(item_probs=PROBS), seed=1)
+    daily = result["daily"]
+    bands = sum(daily[f"band:{label}"]["mean"] for label in PHQ9.band_labels)
+    assert bands == pytest.approx(daily["respondents"]["mean"])
+    assert daily["respondents"]["mean"] == pytest.approx(500, rel=0.05)
+    assert daily["referral"]["mean"] >= daily["moderate_plus"]["mean"]
+
+
+def _cli(*args):
+    cmd = [sys.executable, os.path.join(ROOT, "phq_simulate.py"), "--daily", "50", "--days", "2", "--replicates", "3"]
+    return subprocess.run(cmd + list(args), capture_output=True, text=True, cwd=ROOT)
+
+
+def test_cli_requires_response_model(tmp_path):
+    bare = _cli()
+    assert bare.returncode != 0 and "--item-probs" in bare.stderr
+    example = _cli("--irt-params", EXAMPLE_IRT)
+    assert example.returncode == 0 and example.stdout.startswith("note: responses are drawn from EXAMPLE")
+    probs = tmp_path / "probs.json"
+    probs.write_text(str([list(p) for p in PROBS]), encoding="utf-8")
+    observed = _cli("--item-probs", str(probs))
+    assert observed.returncode == 0 and "EXAMPLE" not in observed.stdout
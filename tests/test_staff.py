@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""내부 검토 앱(phq_staff) 접근 제어와 화면 — streamlit AppTest로 앱 스크립트를 그대로 돌린다."""
+import os
+from datetime import datetime
+
+import pytest
+
+from phq_core import PHQ9
+from phq_store import ResultWriter, make_record
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAFF_APP = os.path.join(ROOT, "phq_staff.py")
+RESPONDENT_APP = os.path.join(ROOT, "phq_9.py")
+PASSWORD = "correct horse"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = str(tmp_path / "store.db")
+    writer = ResultWriter(path, flush_interval=0.01)
+    writer.start()
+    for i in range(12):
+        writer.submit(make_record([i % 4] * 9, [False] * 9, None, datetime(2026, 3, 1, 9, i), PHQ9))
+    writer.close()
+    monkeypatch.setenv("PHQ_STORE_PATH", path)
+    monkeypatch.setenv("PHQ_STAFF_PASSWORD", PASSWORD)
+    return path
+
+
+def _login(password=PASSWORD):
+    at = AppTest.from_file(STAFF_APP, default_timeout=30)
+    at.run()
+    at.text_input[0].input(password)
+    at.button[0].click().run()
+    return at
+
+
+def test_closed_without_password(store, monkeypatch):
+    monkeypatch.delenv("PHQ_STAFF_PASSWORD")
+    at = AppTest.from_file(STAFF_APP, default_timeout=30).run()
+    assert at.error and not at.metric
+
+
+def test_wrong_password_shows_nothing(store):
+    at = _login("wrong")
+    assert at.error and not at.metric and not at.sidebar.radio
+
+
+def test_dashboard_after_login(store):
+    at = _login()
+    at.sidebar.radio[0].set_value("대시보드").run()
+    assert not at.exception
+    assert at.metric[0].value == "12"
+    assert os.path.exists(store + ".rollup.json")
+
+
+def test_triage_claim_after_login(store):
+    at = _login()
+    assert not at.exception
+    at.text_input(key="triage_reviewer").input("dr-kim").run()
+    at.button[0].click().run()  # 다음 항목 가져오기
+    assert at.success and "#12" in at.success[0].value  # 9번 문항 양성 중 가장 높은 구간·최근
+
+
+def test_results_browser_opens_stored_result(store):
+    at = _login()
+    at.sidebar.radio[0].set_value("결과 목록").run()
+    assert not at.exception
+    opens = [b for b in at.button if (b.key or "").startswith("open-")]
+    assert len(opens) == 12 and opens[0].key == "open-12"  # 최신순
+    at.button(key="open-12").click().run()
+    assert not at.exception
+    html = "".join(m.value for m in at.markdown)
+    assert "27" in html  # 문항마다 3점 → 총점 27
+    at.button[0].click().run()  # ← 결과 목록
+    assert any((b.key or "").startswith("open-") for b in at.button)
+
+
+@pytest.mark.parametrize("view", ["dashboard", "triage", "results"])
+def test_respondent_app_has_no_staff_views(store, view):
+    at = AppTest.from_file(RESPONDENT_APP, default_timeout=30)
+    at.query_params["view"] = view
+    at.run()
+    assert not at.exception
+    assert not at.metric and not at.text_input
+    assert any(b.key == "cta-hero" for b in at.button)  # 랜딩 페이지
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+import phq_store
+from phq_core import PHQ9, pack_scores
+from phq_instruments import load_instrument
+from phq_store import MIGRATIONS, SCHEMA, ResultWriter, connect, make_record
+
+WHEN = datetime(2026, 3, 1, 9, 30)
+
+
+def _record(scores, missing=None, respondent=None, inst=PHQ9):
+    return make_record(scores, missing or [False] * len(scores), None, WHEN, inst, respondent)
+
+
+def _wait(pred, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not pred():
+        if time.monotonic() > end:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+def test_make_record_prorates_and_flags():
+    rec = _record([2] * 7 + [0, 1], [False] * 7 + [True, False])
+    assert rec.total == 17 and rec.missing_policy == "prorate:2"  # (14 + 1) / 8 × 9 = 16.9
+    assert rec.flagged and rec.unanswered == 1 and rec.missing_mask == 1 << 7
+    with pytest.raises(ValueError):
+        _record([0] * 9, [True] * 3 + [False] * 6)
+
+
+def test_migrates_v1_database(tmp_path):
+    path = str(tmp_path / "v1.db")
+    old = sqlite3.connect(path)
+    old.executescript(SCHEMA)
+    old.execute(
+        "INSERT INTO assessments (ts, instrument, total, severity, functional, scores, missing_mask, unanswered) "
+        "VALUES (0, 'phq9', 9, ?, NULL, ?, 0, 0)",
+        (PHQ9.severity(9), pack_scores([1] * 9)),
+    )
+    old.execute(
+        "INSERT INTO assessments (ts, instrument, total, severity, functional, scores, missing_mask, unanswered) "
+        "VALUES (0, 'phq9', 8, ?, NULL, ?, 0, 0)",
+        (PHQ9.severity(8), pack_scores([1] * 8 + [0])),
+    )
+    old.commit()
+    old.close()
+
+    conn = connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == MIGRATIONS[-1][0]
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(assessments)")}
+    assert {"flagged", "respondent", "missing_policy"} <= cols
+    assert [r[0] for r in conn.execute("SELECT flagged FROM assessments ORDER BY id")] == [1, 0]
+    assert {r[0] for r in conn.execute("SELECT missing_policy FROM assessments")} == {"zero"}
+    conn.close()
+    connect(path).close()  # 두 번째 연결은 다시 적용하지 않는다
+
+
+def test_writer_commits_and_closes(tmp_path):
+    path = str(tmp_path / "w.db")
+    writer = ResultWriter(path, batch_size=8, flush_interval=0.05)
+    writer.start()
+    gad7 = load_instrument("gad7")
+    for i in range(20):
+        assert writer.submit(_record([i % 4] * 9) if i % 2 else _record([1] * 7, inst=gad7))
+    writer.close()
+    stats = writer.stats()
+    assert stats["committed"] == 20 and stats["failed_commits"] == 0
+    assert not stats["alive"]
+    conn = connect(path)
+    assert conn.execute("SELECT count(*) FROM assessments").fetchone()[0] == 20
+    assert conn.execute("SELECT count(*) FROM triage").fetchone()[0] == 20
+
+
+def test_writer_retries_failed_commit(tmp_path, monkeypatch):
+    monkeypatch.setattr(phq_store, "RETRY_BASE", 0.02)
+    writer = ResultWriter(str(tmp_path / "r.db"), batch_size=4, flush_interval=0.01)
+    real_commit = writer._commit
+    failures = [2]
+
+    def flaky(conn, batch):
+        if failures[0]:
+            failures[0] -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return real_commit(conn, batch)
+
+    monkeypatch.setattr(writer, "_commit", flaky)
+    writer.start()
+    for _ in range(3):
+        writer.submit(_record([1] * 9))
+    _wait(lambda: writer.stats()["failed_commits"] >= 1)
+    assert not writer.healthy()
+    assert "database is locked" in writer.stats()["last_error"]
+    _wait(lambda: writer.stats()["committed"] == 3)
+    assert writer.healthy()
+    assert writer.stats()["failed_commits"] == 2 and writer.stats()["retry_rows"] == 0
+    writer.close()
+
+
+def test_unhealthy_when_thread_not_running(tmp_path):
+    writer = ResultWriter(str(tmp_path / "x.db"))
+    assert not writer.healthy()
+    assert writer.stats()["alive"] is False
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from phq_core import PHQ9
+from phq_instruments import SPEC_DIR, with_irt_params
+from phq_simulate import Population
+from phq_synth import SynthParams, generate, item_marginals, write
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_IRT = os.path.join(SPEC_DIR, "examples", "phq9.irt.json")
+PROBS = tuple((0.4, 0.3, 0.2, 0.1) for _ in range(9))
+OBSERVED = SynthParams(population=Population(item_probs=PROBS))
+
+
+def test_marginals_need_probs_or_params():
+    with pytest.raises(ValueError, match="item_probs"):
+        item_marginals(PHQ9)
+    np.testing.assert_allclose(item_marginals(PHQ9, Population(item_probs=PROBS)), PROBS)
+    grm = item_marginals(with_irt_params(PHQ9, EXAMPLE_IRT))
+    np.testing.assert_allclose(grm.sum(axis=1), 1.0)
+    assert (grm[:, 0] > grm[:, 3]).all()
+
+
+def test_generate_reproduces_marginals_and_correlation():
+    ts, answers, functional = next(generate(100_000, PHQ9, OBSERVED, seed=0))
+    freq = np.stack([np.bincount(answers[:, i], minlength=4) for i in range(9)]) / len(answers)
+    np.testing.assert_allclose(freq, PROBS, atol=0.01)
+    r = np.corrcoef(answers[:, 0], answers[:, 1])[0, 1]
+    assert 0.3 < r < 0.49  # 잠재 상관 0.49를 자른 값은 그보다 약하다
+    assert (np.diff(ts) >= 0).all() and set(np.unique(functional)) <= {0, 1, 2, 3, 4}
+
+
+def test_write_parquet_with_missing(tmp_path):
+    params = OBSERVED._replace(missing_rate=0.05)
+    assert write(str(tmp_path / "s.parquet"), 5000, PHQ9, params, seed=1) == 5000
+    table = pq.read_table(tmp_path / "s.parquet")
+    assert table.column_names[:2] == ["ts", "item1"]
+    assert 0.03 < table.column("item1").null_count / 5000 < 0.07
+
+
+def test_cli_requires_response_model(tmp_path):
+    cmd = [sys.executable, os.path.join(ROOT, "phq_synth.py"), "100", str(tmp_path / "s.csv")]
+    bare = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+    assert bare.returncode != 0 and "--item-probs" in bare.stderr
+    example = subprocess.run(cmd + ["--irt-params", EXAMPLE_IRT], capture_output=True, text=True, cwd=ROOT)
+    assert example.returncode == 0 and example.stdout.startswith("note: responses are drawn from EXAMPLE")
+    probs = tmp_path / "probs.json"
+    probs.write_text(json.dumps([list(p) for p in PROBS]), encoding="utf-8")
+    observed = subprocess.run(cmd + ["--item-probs", str(probs)], capture_output=True, text=True, cwd=ROOT)
+    assert observed.returncode == 0 and "EXAMPLE" not in observed.stdout
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from datetime import datetime
+
+from phq_core import PHQ9
+from phq_instruments import load_instrument
+from phq_store import AssessmentRecord, ResultWriter, connect, make_record
+from phq_triage import TriageQueue, backfill, triage_priority
+
+
+def _rec(scores, minute, inst=PHQ9):
+    return make_record(scores, [False] * len(scores), None, datetime(2026, 3, 1, 9, minute), inst)
+
+
+def _store(path, records, **kw):
+    writer = ResultWriter(path, flush_interval=0.01, **kw)
+    writer.start()
+    for r in records:
+        writer.submit(r)
+    writer.close()
+
+
+def test_priority_order():
+    flagged_mild = _rec([1] * 8 + [1], 0)           # 9점, 안전 문항 양성
+    severe = _rec([3] * 8 + [0], 1)                 # 24점
+    severe_later = _rec([3] * 8 + [0], 2)
+    mild = _rec([1] * 8 + [0], 3)
+    ordered = sorted([mild, severe, flagged_mild, severe_later], key=triage_priority, reverse=True)
+    assert ordered == [flagged_mild, severe_later, severe, mild]
+
+
+def test_queue_claim_ack_release_and_paging(tmp_path):
+    path = str(tmp_path / "t.db")
+    records = [_rec([k % 4] * 8 + [int(k % 5 == 0)], k) for k in range(30)]
+    records.append(_rec([2] * 7, 30, load_instrument("gad7")))
+    _store(path, records)
+    q = TriageQueue(path)
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = q.page(7, cursor)
+        seen += items
+        if cursor is None:
+            break
+    assert len(seen) == 31
+    assert [i.priority for i in seen] == sorted((i.priority for i in seen), reverse=True)
+    assert all(i.flagged for i in seen[:6]) and not any(i.flagged for i in seen[6:])
+
+    first = q.claim("a")
+    assert first.assessment_id == seen[0].assessment_id and first.claimed_by == "a"
+    second = q.claim("b")
+    assert second.assessment_id == seen[1].assessment_id
+    assert q.claim("b", first.assessment_id) is None       # 이미 가져간 항목
+    assert not q.acknowledge(first.assessment_id, "b")      # 다른 검토자
+    assert q.acknowledge(first.assessment_id, "a")
+    assert q.release(second.assessment_id)
+    assert q.acknowledge(seen[5].assessment_id, "c")        # open 항목은 바로 확인
+    assert q.counts() == {"open": 29, "acked": 2}
+    assert q.claim("a").assessment_id == second.assessment_id
+    q.close()
+
+
+def test_triage_rows_match_assessments_with_concurrent_writers(tmp_path):
+    path = str(tmp_path / "c.db")
+    writers = [ResultWriter(path, batch_size=16, flush_interval=0.001) for _ in range(3)]
+    for w in writers:
+        w.start()
+    for k in range(900):
+        writers[k % 3].submit(_rec([k % 4] * 8 + [k % 2], k % 60))
+    for w in writers:
+        w.close()
+    conn = connect(path)
+    cols = ", ".join(f"a.{c}" for c in AssessmentRecord._fields)
+    rows = conn.execute(
+        f"SELECT t.priority, {cols} FROM triage t JOIN assessments a ON a.id = t.assessment_id"
+    ).fetchall()
+    assert len(rows) == 900
+    assert all(r[0] == triage_priority(AssessmentRecord(*r[1:])) for r in rows)
+
+
+def test_commit_waits_for_other_writer_before_numbering(tmp_path):
+    # 다른 프로세스가 쓰기 트랜잭션 중에 행을 넣고 있으면, 그 커밋 뒤의 id부터 triage에 연결해야 한다.
+    path = str(tmp_path / "l.db")
+    _store(path, [_rec([1] * 9, 0)])
+    other = connect(path)
+    other.execute("BEGIN IMMEDIATE")
+    other.execute(
+        "INSERT INTO assessments (ts, instrument, total, severity, scores, missing_mask, unanswered) "
+        "VALUES (0, 'phq9', 0, ?, 0, 0, 0)",
+        (PHQ9.severity(0),),
+    )
+    writer = ResultWriter(path)
+    batch = [_rec([3] * 9, 1), _rec([2] * 9, 2)]
+    done = threading.Thread(target=writer._commit, args=(connect(path), batch))
+    done.start()
+    time.sleep(0.2)
+    other.commit()
+    done.join()
+    conn = connect(path)
+    linked = dict(conn.execute("SELECT a.id, a.total FROM triage t JOIN assessments a ON a.id = t.assessment_id"))
+    assert linked == {1: 9, 3: 27, 4: 18}
+
+
+def test_backfill_adds_missing_rows(tmp_path):
+    path = str(tmp_path / "b.db")
+    _store(path, [_rec([1] * 9, k) for k in range(5)])
+    conn = connect(path)
+    conn.execute("DELETE FROM triage WHERE assessment_id > 2")
+    conn.commit()
+    assert backfill(conn) == 3
+    assert backfill(conn) == 0
+    assert conn.execute("SELECT count(*) FROM triage").fetchone()[0] == 5
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from phq_api import score_one, start_server
+from phq_core import score_answers
+from phq_instruments import load_instrument, parse_missing_policy
+from phq_vector import MISSING, as_answer_matrix, results_as_dicts, score_matrix
+
+
+def _random_rows(inst, n=400, seed=1):
+    rng = np.random.default_rng(seed)
+    mat = rng.integers(0, len(inst.labels), size=(n, inst.n_items))
+    mat[rng.random(mat.shape) < 0.08] = MISSING
+    return [[None if a < 0 else int(a) for a in row] for row in mat]
+
+
+@pytest.mark.parametrize("instrument_id", ["phq9", "gad7", "phq2"])
+@pytest.mark.parametrize("policy", [None, "zero", "prorate:1"])
+def test_matrix_matches_scalar(instrument_id, policy):
+    inst = load_instrument(instrument_id)
+    pol = parse_missing_policy(policy) if policy else None
+    rows = _random_rows(inst)
+    vector = results_as_dicts(score_matrix(as_answer_matrix(rows, inst), inst, pol), inst, pol)
+    for row, got in zip(rows, vector):
+        want = score_answers(row, inst, pol)
+        assert {k: got[k] for k in want} == want
+
+
+def test_prorated_total_with_raw_domain_sums():
+    got = score_one({"answers": [3, 3, 3, 3, 3, 3, 3, 3, None]})  # phq9 기본 규칙 prorate:2
+    assert got["total"] == 27 and got["prorated"] is True
+    assert sum(got["domains"].values()) == 24  # 영역 점수는 환산하지 않는다
+    assert score_one({"answers": [3] * 9})["prorated"] is False
+    assert score_answers([3] * 8 + [None], policy=parse_missing_policy("zero"))["prorated"] is False
+
+
+def test_as_answer_matrix_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        as_answer_matrix([[0] * 8 + [4]])
+    with pytest.raises(ValueError):
+        as_answer_matrix([[0] * 8])
+
+
+def test_score_one_matches_vector():
+    inst = load_instrument("phq9")
+    rows = _random_rows(inst, 50, seed=2)
+    vector = results_as_dicts(score_matrix(as_answer_matrix(rows, inst), inst), inst)
+    for i, (row, want) in enumerate(zip(rows, vector)):
+        got = score_one({"id": i, "answers": row})
+        assert got.pop("id") == i
+        assert got == want
+
+
+def test_score_one_errors():
+    assert "error" in score_one({"answers": [0] * 3})
+    assert "error" in score_one({"answers": [0] * 9, "instrument": "nope"})
+    assert "error" in score_one([1, 2])
+
+
+async def _request(port, body: bytes, content_type="application/json"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        b"POST /score HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+        + f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    return head.decode("latin-1"), payload
+
+
+def _dechunk(payload: bytes) -> bytes:
+    out = b""
+    while payload:
+        size, _, rest = payload.partition(b"\r\n")
+        n = int(size, 16)
+        if n == 0:
+            break
+        out += rest[:n]
+        payload = rest[n + 2:]
+    return out
+
+
+def test_server_single_and_batch():
+    async def run():
+        server = await start_server("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            head, body = await _request(port, json.dumps({"id": "a", "answers": [1] * 9}).encode())
+            assert head.startswith("HTTP/1.1 200")
+            assert json.loads(body)["total"] == 9
+
+            head, body = await _request(port, json.dumps({"id": "b", "answers": [9] * 9}).encode())
+            assert head.startswith("HTTP/1.1 422")
+
+            batch = [{"id": i, "answers": [i % 4] * 9} for i in range(1200)] + ["bad"]
+            head, body = await _request(port, json.dumps(batch).encode())
+            lines = [json.loads(x) for x in _dechunk(body).splitlines()]
+            assert [r["id"] for r in lines[:-1]] == list(range(1200))
+            assert "error" in lines[-1]
+
+            ndjson = b"\n".join(json.dumps({"id": i, "answers": [0] * 9}).encode() for i in range(3)) + b"\nnot json\n"
+            head, body = await _request(port, ndjson, "application/x-ndjson")
+            lines = [json.loads(x) for x in _dechunk(body).splitlines()]
+            assert [r.get("total") for r in lines] == [0, 0, 0, None]
+
+    asyncio.run(run())